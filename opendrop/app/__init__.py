@@ -1,3 +1,9 @@
-import gi
-gi.require_version('Gtk', '3.0')
-gi.require_version('Gdk', '3.0')
+try:
+    import gi
+except ImportError:
+    # Without PyGObject only the parts of the app that don't need GTK (e.g. the analyses, used by `opendrop.batch`)
+    # can be imported.
+    pass
+else:
+    gi.require_version('Gtk', '3.0')
+    gi.require_version('Gdk', '3.0')
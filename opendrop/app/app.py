@@ -27,4 +27,5 @@ class App(EntryPoint):
         self._loop.run_forever()
 
     def _do_stop(self) -> None:
+        self._model.destroy()
         self._loop.stop()
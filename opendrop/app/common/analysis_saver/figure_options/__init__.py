@@ -1,2 +1 @@
-from .component import figure_options_cs
 from .model import FigureOptions
@@ -4,6 +4,8 @@ from typing import Sequence, Optional, Tuple
 
 import numpy as np
 
+from opendrop.utility.timing import NOT_TIMED
+
 
 class ImageAcquirer(ABC):
     @abstractmethod
@@ -21,6 +23,8 @@ class ImageAcquirer(ABC):
 class InputImage(ABC):
     est_ready = math.nan
     is_replicated = False
+    # Time taken to get the image (e.g. decode it from disk, or capture it), once it has been read.
+    read_time = NOT_TIMED
 
     @abstractmethod
     async def read(self) -> Tuple[np.ndarray, float]:
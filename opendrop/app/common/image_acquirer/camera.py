@@ -7,6 +7,7 @@ from typing import Sequence, Tuple, Optional
 import numpy as np
 
 from opendrop.utility.bindable import Bindable, BoxBindable
+from opendrop.utility.timing import Stopwatch
 from .base import ImageAcquirer, InputImage
 
 
@@ -85,8 +86,11 @@ class _BaseCameraInputImage(InputImage):
         self.est_ready = time.time() + delay
 
     def _do_capture(self) -> None:
-        image = self._camera.capture()
+        stopwatch = Stopwatch()
+        with stopwatch:
+            image = self._camera.capture()
         self._capture_time = time.time()
+        self.read_time = stopwatch.elapsed
 
         if self._first_image is not None:
             timestamp = self._capture_time - self._first_image._capture_time
@@ -1,8 +1,11 @@
+import asyncio
+import operator
 from typing import Sequence, Tuple, Optional
 
 import numpy as np
 
 from opendrop.utility.bindable import Bindable, BoxBindable
+from opendrop.utility.timing import StageTime, Stopwatch
 from .base import ImageAcquirer, InputImage
 
 
@@ -10,7 +13,9 @@ class ImageSequenceAcquirer(ImageAcquirer):
     IS_REPLICATED = False
 
     def __init__(self) -> None:
-        self.bn_images = BoxBindable(tuple())  # type: Bindable[Sequence[np.ndarray]]
+        # Images may be decoded lazily (see LocalStorageAcquirer), so compare by identity to avoid loading every frame
+        # just to check whether the sequence changed.
+        self.bn_images = BoxBindable(tuple(), check_equals=operator.is_)  # type: Bindable[Sequence[np.ndarray]]
 
         self.bn_frame_interval = BoxBindable(None)  # type: Bindable[Optional[int]]
 
@@ -32,9 +37,10 @@ class ImageSequenceAcquirer(ImageAcquirer):
 
         input_images = []
 
-        for i, img in enumerate(images):
+        for i in range(len(images)):
             input_image = _BaseImageSequenceInputImage(
-                image=img,
+                images=images,
+                index=i,
                 timestamp=i * frame_interval
             )
             input_image.is_replicated = self.IS_REPLICATED
@@ -52,9 +58,21 @@ class ImageSequenceAcquirer(ImageAcquirer):
 
 
 class _BaseImageSequenceInputImage(InputImage):
-    def __init__(self, image: np.ndarray, timestamp: float) -> None:
-        self._image = image
+    def __init__(self, images: Sequence[np.ndarray], index: int, timestamp: float) -> None:
+        self._images = images
+        self._index = index
         self._timestamp = timestamp
 
     async def read(self) -> Tuple[np.ndarray, float]:
-        return self._image, self._timestamp
+        # Getting an image may involve decoding it from disk, do it on the default executor.
+        loop = asyncio.get_event_loop()
+        image, self.read_time = await loop.run_in_executor(None, self._get_image)
+
+        return image, self._timestamp
+
+    def _get_image(self) -> Tuple[np.ndarray, StageTime]:
+        stopwatch = Stopwatch()
+        with stopwatch:
+            image = self._images[self._index]
+
+        return image, stopwatch.elapsed
@@ -1,5 +1,8 @@
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import Union, Sequence, MutableSequence
+from typing import Union, Sequence, MutableMapping, Optional, overload
 
 import cv2
 import numpy as np
@@ -7,6 +10,13 @@ import numpy as np
 from opendrop.utility.bindable import BoxBindable
 from .image_sequence import ImageSequenceAcquirer
 
+# Memory budget for decoded frames kept around by each acquirer, in bytes. A 5 MP RGB frame takes up about 15 MB.
+FRAME_CACHE_BYTES = 512 * 1024**2
+
+# Number of frames after the one most recently requested to decode in the background.
+PREFETCH_FRAMES = 4
+PREFETCH_WORKERS = 2
+
 
 class LocalStorageAcquirer(ImageSequenceAcquirer):
     IS_REPLICATED = True
@@ -15,25 +25,191 @@ class LocalStorageAcquirer(ImageSequenceAcquirer):
         super().__init__()
         self.bn_last_loaded_paths = BoxBindable(tuple())  # type: BoxBindable[Sequence[Path]]
 
+        self._frame_cache = FrameCache(max_bytes=FRAME_CACHE_BYTES)
+        self._prefetch_executor = ThreadPoolExecutor(max_workers=PREFETCH_WORKERS)
+
     def load_image_paths(self, image_paths: Sequence[Union[Path, str]]) -> None:
         # Sort image paths in lexicographic order, and ignore paths to directories.
         image_paths = sorted([p for p in map(Path, image_paths) if not p.is_dir()])
 
-        images = []  # type: MutableSequence[np.ndarray]
+        # Images are decoded on demand, only check that OpenCV recognises the files for now.
         for image_path in image_paths:
-            image = cv2.imread(str(image_path))
-            if image is None:
+            if not cv2.haveImageReader(str(image_path)):
                 raise ValueError(
                     "Failed to load image from path '{}'"
                     .format(image_path)
                 )
 
-            # OpenCV loads images in BGR mode, but the rest of the app works with images in RGB, so convert the read
-            # image appropriately.
-            image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        self._frame_cache.clear()
 
-            images.append(image)
-
-        self.bn_images.set(images)
+        self.bn_images.set(LazyImageSequence(
+            paths=image_paths,
+            cache=self._frame_cache,
+            prefetch_executor=self._prefetch_executor,
+        ))
         self.bn_last_loaded_paths.set(tuple(image_paths))
 
+    def destroy(self) -> None:
+        self._prefetch_executor.shutdown(wait=False)
+        self._frame_cache.clear()
+
+
+class LazyImageSequence(Sequence[np.ndarray]):
+    """Sequence of the images stored at `paths`, decoded when they are first accessed. Accessing an image also starts
+    decoding the next few images in the background."""
+
+    def __init__(self, paths: Sequence[Path], cache: 'FrameCache', prefetch_executor: ThreadPoolExecutor,
+                 prefetch_frames: int = PREFETCH_FRAMES) -> None:
+        self._paths = tuple(paths)
+        self._cache = cache
+        self._prefetch_executor = prefetch_executor
+        self._prefetch_frames = prefetch_frames
+
+        self._pending = {}  # type: MutableMapping[Path, Future]
+        self._lock = threading.Lock()
+
+    @property
+    def paths(self) -> Sequence[Path]:
+        return self._paths
+
+    def __len__(self) -> int:
+        return len(self._paths)
+
+    @overload
+    def __getitem__(self, index: int) -> np.ndarray: ...
+    @overload
+    def __getitem__(self, index: slice) -> Sequence[np.ndarray]: ...
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+
+        path = self._paths[index]
+        image = self._load(path)
+
+        self._prefetch(index % len(self) + 1)
+
+        return image
+
+    # Loading the whole sequence into an array would defeat the point, make sure np.asarray() etc. fail quickly.
+    def __array__(self, *args, **kwargs):
+        raise TypeError('{} can not be converted to an array'.format(type(self).__name__))
+
+    # This method will be run on different threads, so make sure it stays thread-safe.
+    def _load(self, path: Path) -> np.ndarray:
+        image = self._cache.get(path)
+        if image is not None:
+            return image
+
+        with self._lock:
+            pending = self._pending.get(path)
+
+        if pending is not None:
+            # Already being decoded in the background.
+            return pending.result()
+
+        image = _read_image(path)
+        self._cache.put(path, image)
+
+        return image
+
+    def _prefetch(self, start: int) -> None:
+        for path in self._paths[start:start + self._prefetch_frames]:
+            if path in self._cache:
+                continue
+
+            with self._lock:
+                if path in self._pending:
+                    continue
+
+                try:
+                    future = self._prefetch_executor.submit(self._decode_pending, path)
+                except RuntimeError:
+                    # Executor has been shut down.
+                    return
+
+                self._pending[path] = future
+
+    def _decode_pending(self, path: Path) -> np.ndarray:
+        try:
+            image = _read_image(path)
+            self._cache.put(path, image)
+            return image
+        finally:
+            with self._lock:
+                self._pending.pop(path, None)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, LazyImageSequence):
+            return NotImplemented
+
+        return self._paths == other._paths
+
+    def __hash__(self) -> int:
+        return hash(self._paths)
+
+
+class FrameCache:
+    """Thread-safe LRU cache of decoded frames with a memory budget."""
+
+    def __init__(self, max_bytes: int) -> None:
+        self._max_bytes = max_bytes
+
+        self._entries = OrderedDict()  # type: OrderedDict[Path, np.ndarray]
+        self._nbytes = 0
+
+        self._lock = threading.Lock()
+
+    def get(self, path: Path) -> Optional[np.ndarray]:
+        with self._lock:
+            image = self._entries.get(path)
+            if image is not None:
+                self._entries.move_to_end(path)
+
+            return image
+
+    def put(self, path: Path, image: np.ndarray) -> None:
+        if image.nbytes > self._max_bytes:
+            return
+
+        with self._lock:
+            old = self._entries.pop(path, None)
+            if old is not None:
+                self._nbytes -= old.nbytes
+
+            self._entries[path] = image
+            self._nbytes += image.nbytes
+
+            while self._nbytes > self._max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._nbytes -= evicted.nbytes
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._nbytes = 0
+
+    def __contains__(self, path: Path) -> bool:
+        with self._lock:
+            return path in self._entries
+
+    @property
+    def nbytes(self) -> int:
+        return self._nbytes
+
+
+def _read_image(path: Path) -> np.ndarray:
+    image = cv2.imread(str(path))
+    if image is None:
+        raise ValueError(
+            "Failed to load image from path '{}'"
+            .format(path)
+        )
+
+    # OpenCV loads images in BGR mode, but the rest of the app works with images in RGB, so convert the read image
+    # appropriately.
+    image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+
+    # Frames are shared between everything that reads them, so don't let anyone modify them.
+    image.flags.writeable = False
+
+    return image
@@ -1,12 +1,24 @@
 import asyncio
-import itertools
-from typing import Optional, Hashable, Iterable, MutableSequence
+import functools
+from collections import OrderedDict
+from typing import Optional, Any, Callable, Hashable, MutableMapping, Sequence, Tuple
 
 import numpy as np
 
 from opendrop.app.common.image_acquirer import ImageSequenceAcquirer, CameraAcquirer
-from opendrop.utility.bindable import Bindable, AccessorBindable
+from opendrop.app.common.image_acquirer.local_storage import LazyImageSequence
+from opendrop.utility.bindable import Bindable, AccessorBindable, BoxBindable, array_equality_check
 from opendrop.utility.misc import clamp
+from opendrop.utility.scheduler import UpdateScheduler, update_scheduler, PRIORITY_BACKGROUND
+
+# Number of images either side of the image being shown to prepare in the background.
+PREFETCH_NEIGHBOURS = 1
+
+# Number of feature extractors kept around by the image sequence preview.
+FEATURE_EXTRACTOR_CACHE_SIZE = 8
+
+# Number of rows and columns of pixels sampled to identify in-memory images.
+ARRAY_ID_SAMPLES = 64
 
 
 class AcquirerController:
@@ -16,9 +28,8 @@ class AcquirerController:
 
 class ImageSequenceAcquirerController(AcquirerController):
     class _ImageRegistration:
-        def __init__(self, image_id: Hashable, image: np.ndarray) -> None:
+        def __init__(self, image_id: Hashable) -> None:
             self.image_id = image_id
-            self.image = image
 
     def __init__(
             self, *,
@@ -28,7 +39,8 @@ class ImageSequenceAcquirerController(AcquirerController):
         self._acquirer = acquirer
         self._source_image_out = source_image_out
 
-        self._image_registry = []  # type: MutableSequence[self._ImageRegistration]
+        self._image_registry = OrderedDict()  # type: MutableMapping[Hashable, self._ImageRegistration]
+        self._image_ids = ()  # type: Sequence[Hashable]
 
         self.bn_num_images = AccessorBindable(
             getter=self._get_num_images,
@@ -50,101 +62,80 @@ class ImageSequenceAcquirerController(AcquirerController):
         self._hdl_acquirer_images_changed()
 
     def _hdl_acquirer_images_changed(self) -> None:
+        self._image_ids = self._get_image_ids(self._acquirer.bn_images.get())
+
         self._update_image_registry()
         self._update_showing_image()
 
+    # Images are identified without loading them, so that only the image being shown needs to be decoded.
+    @staticmethod
+    def _get_image_ids(images: Sequence[np.ndarray]) -> Sequence[Hashable]:
+        if isinstance(images, LazyImageSequence):
+            return images.paths
+        else:
+            return [_get_array_id(image) for image in images]
+
     def _update_image_registry(self) -> None:
-        acquirer_images = list(self._acquirer.bn_images.get())
+        image_ids = set(self._image_ids)
+
+        for image_id in [image_id for image_id in self._image_registry if image_id not in image_ids]:
+            del self._image_registry[image_id]
+            self._on_image_deregistered(image_id)
 
-        for image_reg in tuple(self._get_unassociated_registered_images(acquirer_images)):
-            self._image_registry.remove(image_reg)
-            self._on_image_deregistered(image_reg.image_id)
+        for image_id in self._image_ids:
+            if image_id in self._image_registry:
+                continue
 
-        for image in self._filter_unregistered_images(acquirer_images):
-            new_image_reg = self._ImageRegistration(
-                image_id=id(image),
-                image=image,
+            self._image_registry[image_id] = self._ImageRegistration(
+                image_id=image_id,
             )
-            self._image_registry.append(new_image_reg)
             self._on_image_registered(
-                image_id=new_image_reg.image_id,
-                image=image,
+                image_id=image_id,
             )
 
         self.bn_num_images.poke()
 
-    def _filter_unregistered_images(self, images: Iterable[np.ndarray]) -> Iterable[np.ndarray]:
-        return itertools.filterfalse(self._is_image_registered, images)
-
-    def _is_image_registered(self, image: np.ndarray) -> bool:
-        try:
-            self._get_image_reg_by_image(image)
-        except ValueError:
-            return False
-        else:
-            return True
-
-    def _get_unassociated_registered_images(self, images: Iterable[np.ndarray]) -> Iterable[_ImageRegistration]:
-        return (
-            image_reg
-            for image_reg in self._image_registry
-            if not self._is_registered_image_associated(images, image_reg)
-        )
-
-    @staticmethod
-    def _is_registered_image_associated(images: Iterable[np.ndarray], image_reg: _ImageRegistration) -> bool:
-        for image in images:
-            if np.array_equal(image_reg.image, image):
-                return True
-        else:
-            return False
-
     def _update_showing_image(self) -> None:
-        acquirer_images = list(self._acquirer.bn_images.get())
-        if self._showing_image_index is None and len(acquirer_images) > 0:
+        images = self._acquirer.bn_images.get()
+        if self._showing_image_index is None and len(images) > 0:
             self._showing_image_index = 0
             self.bn_showing_image_index.poke()
+        elif self._showing_image_index is not None and self._showing_image_index >= len(images):
+            # Sequence got shorter.
+            self._showing_image_index = len(images) - 1 if len(images) > 0 else None
+            self.bn_showing_image_index.poke()
 
         if self._showing_image_index is None:
             return
 
-        new_showing_image_reg = self._get_image_reg_by_image(
-            image=acquirer_images[self._showing_image_index]
-        )
-
-        new_showing_image_id = new_showing_image_reg.image_id
+        new_showing_image_id = self._image_ids[self._showing_image_index]
 
         if new_showing_image_id == self._showing_image_id:
             return
 
+        image = images[self._showing_image_index]
+
         self._showing_image_id = new_showing_image_id
-        self._on_image_changed(new_showing_image_id)
-        self._update_source_image_out()
+        self._on_image_changed(new_showing_image_id, image)
+        self._source_image_out.set(image)
 
-    def _update_source_image_out(self) -> None:
-        image_reg = self._get_image_reg_by_image_id(
-            image_id=self._showing_image_id,
-        )
+        self._prefetch_neighbours()
 
-        image = image_reg.image
+    def _prefetch_neighbours(self) -> None:
+        images = self._acquirer.bn_images.get()
+        image_ids = self._image_ids
 
-        self._source_image_out.set(image)
+        for offset in range(1, PREFETCH_NEIGHBOURS + 1):
+            for index in (self._showing_image_index + offset, self._showing_image_index - offset):
+                if not 0 <= index < len(images):
+                    continue
 
-    def _get_image_reg_by_image(self, image: np.ndarray) -> _ImageRegistration:
-        for image_reg in self._image_registry:
-            if np.array_equal(image_reg.image, image):
-                return image_reg
-        else:
-            raise ValueError(
-                "No _ImageRegistration found for image '{}'"
-                .format(image)
-            )
+                self._on_image_prefetch(image_ids[index], functools.partial(images.__getitem__, index))
 
     def _get_image_reg_by_image_id(self, image_id: Hashable) -> _ImageRegistration:
-        for image_reg in self._image_registry:
-            if image_reg.image_id == image_id:
-                return image_reg
-        else:
+        try:
+            return self._image_registry[image_id]
+        except KeyError:
             raise ValueError(
                 "No _ImageRegistration found for image_id '{}'"
                 .format(image_id)
@@ -164,13 +155,18 @@ class ImageSequenceAcquirerController(AcquirerController):
     def _get_num_images(self) -> int:
         return len(self._acquirer.bn_images.get())
 
-    def _on_image_registered(self, image_id: Hashable, image: np.ndarray) -> None:
+    def _on_image_registered(self, image_id: Hashable) -> None:
         pass
 
     def _on_image_deregistered(self, image_id: Hashable) -> None:
         pass
 
-    def _on_image_changed(self, image_id: Hashable) -> None:
+    def _on_image_changed(self, image_id: Hashable, image: np.ndarray) -> None:
+        pass
+
+    # Called for the images next to the one being shown. `read_image()` returns the image, but may need to decode it,
+    # so it should be called on a background thread.
+    def _on_image_prefetch(self, image_id: Hashable, read_image: Callable[[], np.ndarray]) -> None:
         pass
 
     def destroy(self) -> None:
@@ -178,6 +174,97 @@ class ImageSequenceAcquirerController(AcquirerController):
             ec.disconnect()
 
 
+def _get_array_id(image: np.ndarray) -> Hashable:
+    """Return a key that identifies `image` among the images of a sequence, without looking at every pixel. The key is
+    made from the identity of the array and a digest of a sparse sample of its pixels, so an array that gets garbage
+    collected and another one allocated at the same address is very unlikely to get the same key."""
+    height, width = image.shape[:2]
+    sample = image[::max(height//ARRAY_ID_SAMPLES, 1), ::max(width//ARRAY_ID_SAMPLES, 1)]
+    digest = hash(np.ascontiguousarray(sample).tobytes())
+
+    return id(image), image.shape, digest
+
+
+class FeatureExtractorCache:
+    """LRU cache of the feature extractors created by an image sequence preview, keyed on the identity of the image.
+    Extractors are created on demand, so only the images being looked at (and their neighbours) have their features
+    extracted, and going back to an earlier image reuses its results."""
+
+    def __init__(self, create: Callable[[Bindable[Optional[np.ndarray]]], Any],
+                 max_size: int = FEATURE_EXTRACTOR_CACHE_SIZE, *,
+                 scheduler: Optional[UpdateScheduler] = None) -> None:
+        self._loop = asyncio.get_event_loop()
+        self._scheduler = scheduler if scheduler is not None else update_scheduler
+
+        self._create = create
+        self._max_size = max_size
+
+        self._entries = OrderedDict()  # type: OrderedDict[Hashable, Tuple[Any, Bindable]]
+
+    def get(self, image_id: Hashable, image: np.ndarray) -> Any:
+        """Return the extractor for `image`, creating it if needed."""
+        entry = self._entries.get(image_id)
+        if entry is None:
+            entry = self._create_entry(image_id)
+
+        extractor, image_box = entry
+        self._entries.move_to_end(image_id)
+
+        if image_box.get() is None:
+            # Image was still being read in the background.
+            image_box.set(image)
+
+        return extractor
+
+    def prefetch(self, image_id: Hashable, read_image: Callable[[], np.ndarray]) -> None:
+        """Create the extractor for the image returned by `read_image()` if there isn't one already, reading the image
+        in the background."""
+        if image_id in self._entries:
+            return
+
+        extractor, image_box = self._create_entry(image_id)
+
+        # Prefetched entries are the first to be evicted.
+        self._entries.move_to_end(image_id, last=False)
+
+        def hdl_image_read(image: np.ndarray) -> None:
+            if image_box.get() is None:
+                image_box.set(image)
+
+        # Read on the shared scheduler, behind the image being shown and any other work that is already waiting.
+        def do_read_image() -> None:
+            try:
+                image = read_image()
+            except Exception:
+                # Leave it to whoever shows the image to report it.
+                return
+
+            try:
+                self._loop.call_soon_threadsafe(hdl_image_read, image)
+            except RuntimeError:
+                # Event loop has been closed.
+                pass
+
+        self._scheduler.submit((self, image_id), do_read_image, priority=PRIORITY_BACKGROUND)
+
+    def _create_entry(self, image_id: Hashable) -> Tuple[Any, Bindable]:
+        image_box = BoxBindable(None, check_equals=array_equality_check)
+        extractor = self._create(image_box)
+
+        self._entries[image_id] = (extractor, image_box)
+
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+
+        return extractor, image_box
+
+    def discard(self, image_id: Hashable) -> None:
+        self._entries.pop(image_id, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
 class CameraAcquirerController(AcquirerController):
     PREVIEW_FRAME_RATE = 3
 
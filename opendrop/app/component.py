@@ -3,7 +3,8 @@ from gi.repository import Gtk, GdkPixbuf, Gio, GLib
 
 from opendrop.mvp import ComponentSymbol, View, Presenter
 from .conan import ConanSession, conan_root_cs
-from .ift import IFTSession, ift_root_cs
+from .ift.component import ift_root_cs
+from .ift.model import IFTSession
 from .main_menu import main_menu_cs
 from .model import AppRootModel, AppMode
 
@@ -1,6 +1,7 @@
 import asyncio
 import math
 import time
+import traceback
 from asyncio import Future
 from enum import Enum
 from typing import Callable, Optional
@@ -8,7 +9,7 @@ from typing import Callable, Optional
 import numpy as np
 
 from opendrop.app.common.image_acquirer import InputImage
-from opendrop.utility.bindable import AccessorBindable, BoxBindable, Bindable
+from opendrop.utility.bindable import AccessorBindable, BoxBindable, Bindable, array_equality_check
 from opendrop.utility.geometry import Vector2
 from .contact_angle import ContactAngleCalculator
 from .features import FeatureExtractor
@@ -74,7 +75,7 @@ class ConanAnalysis:
 
         # Attributes from FeatureExtractor
         self.bn_drop_region = BoxBindable(None)
-        self.bn_drop_profile_extract = BoxBindable(None)
+        self.bn_drop_profile_extract = BoxBindable(None, check_equals=array_equality_check)
 
         # Log
         self.bn_is_done = AccessorBindable(getter=self._get_is_done)
@@ -96,6 +97,14 @@ class ConanAnalysis:
         if self.bn_is_done.get():
             return
 
+        exc = read_task.exception()
+        if exc is not None:
+            # Images may only be decoded when they're read, so a corrupt file is only found out about now. Give up on
+            # this analysis instead of waiting for an image forever.
+            traceback.print_exception(type(exc), exc, exc.__traceback__)
+            self.cancel()
+            return
+
         image, image_timestamp = read_task.result()
         self._start_fit(image, image_timestamp)
 
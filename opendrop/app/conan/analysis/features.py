@@ -16,6 +16,17 @@ class FeatureExtractorParams:
         self.bn_drop_region_px = BoxBindable(None)
         self.bn_thresh = BoxBindable(30)
 
+    def copy(self) -> 'FeatureExtractorParams':
+        """Return a copy of these parameters that doesn't follow later changes to them."""
+        copy = FeatureExtractorParams()
+        copy.update(self)
+        return copy
+
+    def update(self, other: 'FeatureExtractorParams') -> None:
+        """Set these parameters to the values of `other`."""
+        self.bn_drop_region_px.set(other.bn_drop_region_px.get())
+        self.bn_thresh.set(other.bn_thresh.get())
+
 
 class FeatureExtractor:
     _Data = thread_safe_bindable_collection(
@@ -110,6 +121,15 @@ class FeatureExtractor:
 
         return drop_profile_px
 
+    # Priority of background updates relative to other objects, see opendrop.utility.scheduler.
+    @property
+    def priority(self) -> int:
+        return self._updater_worker.priority
+
+    @priority.setter
+    def priority(self, value: int) -> None:
+        self._updater_worker.priority = value
+
     def get_is_busy(self) -> bool:
         return self._updater_worker.is_busy
 
@@ -1,2 +1 @@
-from .component import conan_save_dialog_cs
 from .model import ConanAnalysisSaverOptions
@@ -1,5 +1,5 @@
 import asyncio
-from typing import Sequence, Callable, Any
+from typing import Sequence, Callable, Any, Optional
 
 import numpy as np
 
@@ -100,10 +100,11 @@ class ConanSession:
 
             return True
 
-    def extract_features(self, image: Bindable[np.ndarray]) -> FeatureExtractor:
+    def extract_features(self, image: Bindable[np.ndarray], params: Optional[FeatureExtractorParams] = None) \
+            -> FeatureExtractor:
         return FeatureExtractor(
             image=image,
-            params=self._feature_extractor_params,
+            params=params if params is not None else self._feature_extractor_params,
             loop=self._loop,
         )
 
@@ -6,7 +6,8 @@ from gi.repository import Gtk
 
 from opendrop.app.common.footer.results import results_footer_cs, ResultsFooterStatus
 from opendrop.app.common.wizard import WizardPageControls
-from opendrop.app.conan.analysis_saver import ConanAnalysisSaverOptions, conan_save_dialog_cs
+from opendrop.app.conan.analysis_saver import ConanAnalysisSaverOptions
+from opendrop.app.conan.analysis_saver.component import conan_save_dialog_cs
 from opendrop.app.conan.results.graphs import graphs_cs
 from opendrop.app.conan.results.individual.component import individual_cs
 from opendrop.mvp import ComponentSymbol, View, Presenter
@@ -1,16 +1,22 @@
 import math
-from typing import Sequence, Tuple
+import time
+from typing import Sequence, Tuple, Optional, MutableSet
 
-from gi.repository import Gtk
+import numpy as np
+from gi.repository import Gtk, GLib
 from matplotlib import ticker
 from matplotlib.backends.backend_gtk3agg import FigureCanvasGTK3Agg as FigureCanvas
 from matplotlib.figure import Figure
+from matplotlib.lines import Line2D
 
 from opendrop.mvp import ComponentSymbol, View, Presenter
 from .model import GraphsModel
 
 graphs_cs = ComponentSymbol()  # type: ComponentSymbol[Gtk.Widget]
 
+# Maximum number of times per second that the graphs are redrawn.
+MAX_REDRAW_RATE = 10
+
 
 @graphs_cs.view()
 class GraphsView(View['GraphsPresenter', Gtk.Widget]):
@@ -54,6 +60,11 @@ class GraphsView(View['GraphsPresenter', Gtk.Widget]):
         self._left_angle_line = self._left_angle_axes.plot([], marker='o', color='blue')[0]
         self._right_angle_line = right_angle_axes.plot([], marker='o', color='blue')[0]
 
+        # Changes are drawn together at most MAX_REDRAW_RATE times per second, see _queue_draw().
+        self._stale_lines = set()  # type: MutableSet[Line2D]
+        self._draw_source_id = None  # type: Optional[int]
+        self._last_draw_time = -math.inf
+
         self._widget.show_all()
 
         self.presenter.view_ready()
@@ -67,42 +78,54 @@ class GraphsView(View['GraphsPresenter', Gtk.Widget]):
         self._widget.set_visible_child(self._figure_canvas)
 
     def set_left_angle_data(self, data: Sequence[Tuple[float, float]]) -> None:
-        if len(data[0]) <= 1:
-            return
+        self._set_line_data(self._left_angle_line, data)
 
-        self._left_angle_line.set_data(data)
+    def set_right_angle_data(self, data: Sequence[Tuple[float, float]]) -> None:
+        self._set_line_data(self._right_angle_line, data)
 
-        self._update_xlim()
+    def _set_line_data(self, line: Line2D, data: Sequence[Tuple[float, float]]) -> None:
+        if len(data[0]) <= 1:
+            return
 
-        self._left_angle_axes.relim()
-        self._left_angle_axes.margins(y=0.1)
+        line.set_data(data)
 
-        self._figure_canvas.draw()
+        self._stale_lines.add(line)
+        self._queue_draw()
 
-    def set_right_angle_data(self, data: Sequence[Tuple[float, float]]) -> None:
-        if len(data[0]) <= 1:
+    def _queue_draw(self) -> None:
+        if self._draw_source_id is not None:
             return
 
-        self._right_angle_line.set_data(data)
+        delay = self._last_draw_time + 1/MAX_REDRAW_RATE - time.monotonic()
+        self._draw_source_id = GLib.timeout_add(max(int(delay*1000), 0), self._draw)
+
+    def _draw(self) -> bool:
+        self._draw_source_id = None
+        self._last_draw_time = time.monotonic()
 
         self._update_xlim()
 
-        self._right_angle_line.axes.relim()
-        self._right_angle_line.axes.margins(y=0.1)
+        for line in self._stale_lines:
+            line.axes.relim()
+            line.axes.margins(y=0.1)
+        self._stale_lines.clear()
+
+        self._figure_canvas.draw_idle()
 
-        self._figure_canvas.draw()
+        # Don't call again.
+        return False
 
     def _update_xlim(self) -> None:
-        all_xdata = (
-            *self._left_angle_line.get_xdata(),
-            *self._right_angle_line.get_xdata(),
-        )
+        all_xdata = np.concatenate((
+            self._left_angle_line.get_xdata(),
+            self._right_angle_line.get_xdata(),
+        ))
 
         if len(all_xdata) <= 1:
             return
 
-        xmin = min(all_xdata)
-        xmax = max(all_xdata)
+        xmin = all_xdata.min()
+        xmax = all_xdata.max()
 
         if xmin == xmax:
             return
@@ -110,6 +133,10 @@ class GraphsView(View['GraphsPresenter', Gtk.Widget]):
         self._left_angle_axes.set_xlim(xmin, xmax)
 
     def _do_destroy(self) -> None:
+        if self._draw_source_id is not None:
+            GLib.source_remove(self._draw_source_id)
+            self._draw_source_id = None
+
         self._widget.destroy()
 
 
@@ -122,16 +149,26 @@ class GraphsPresenter(Presenter['GraphsView']):
     def view_ready(self) -> None:
         self.__event_connections.extend([
             self._model.bn_left_angle_data.on_changed.connect(
-                self._hdl_model_data_changed
+                self._hdl_model_left_angle_data_changed
             ),
             self._model.bn_right_angle_data.on_changed.connect(
-                self._hdl_model_data_changed
+                self._hdl_model_right_angle_data_changed
             ),
         ])
 
-        self._hdl_model_data_changed()
+        self._hdl_model_left_angle_data_changed()
+        self._hdl_model_right_angle_data_changed()
+
+    # Only the series that changed is passed on to the view.
+    def _hdl_model_left_angle_data_changed(self) -> None:
+        self._update_waiting_placeholder()
+        self.view.set_left_angle_data(self._model.bn_left_angle_data.get())
 
-    def _hdl_model_data_changed(self) -> None:
+    def _hdl_model_right_angle_data_changed(self) -> None:
+        self._update_waiting_placeholder()
+        self.view.set_right_angle_data(self._model.bn_right_angle_data.get())
+
+    def _update_waiting_placeholder(self) -> None:
         left_angle_data = self._model.bn_left_angle_data.get()
         right_angle_data = self._model.bn_right_angle_data.get()
 
@@ -140,12 +177,8 @@ class GraphsPresenter(Presenter['GraphsView']):
                 len(right_angle_data[0]) <= 1
         ):
             self.view.show_waiting_placeholder()
-            return
-
-        self.view.hide_waiting_placeholder()
-
-        self.view.set_left_angle_data(left_angle_data)
-        self.view.set_right_angle_data(right_angle_data)
+        else:
+            self.view.hide_waiting_placeholder()
 
     def _do_destroy(self) -> None:
         for ec in self.__event_connections:
@@ -1,8 +1,9 @@
-import math
+import functools
 from typing import Sequence
 
 from opendrop.app.conan.analysis import ConanAnalysis
-from opendrop.utility.bindable import Bindable, BoxBindable
+from opendrop.utility.bindable import Bindable, AccessorBindable
+from opendrop.utility.timeseries import TimeSeries
 
 
 class GraphsModel:
@@ -12,8 +13,13 @@ class GraphsModel:
         self._tracked_analyses = []
         self._tracked_analysis_unbind_tasks = {}
 
-        self.bn_left_angle_data = BoxBindable((tuple(), tuple()))
-        self.bn_right_angle_data = BoxBindable((tuple(), tuple()))
+        # Each series is kept sorted and only the points of the analysis that changed are updated, instead of
+        # rebuilding every series from all the analyses whenever one of them changes.
+        self._left_angle_series = TimeSeries()
+        self._right_angle_series = TimeSeries()
+
+        self.bn_left_angle_data = AccessorBindable(getter=self._left_angle_series.get_data)
+        self.bn_right_angle_data = AccessorBindable(getter=self._right_angle_series.get_data)
 
         self._bn_analyses.on_changed.connect(
             self._hdl_analyses_changed
@@ -36,13 +42,12 @@ class GraphsModel:
     def _track_analysis(self, analysis: ConanAnalysis) -> None:
         unbind_tasks = []
 
+        hdl_data_changed = functools.partial(self._hdl_tracked_analysis_data_changed, analysis)
+
         event_connections = [
-            analysis.bn_left_angle.on_changed.connect(
-                self._hdl_tracked_analysis_data_changed
-            ),
-            analysis.bn_right_angle.on_changed.connect(
-                self._hdl_tracked_analysis_data_changed
-            ),
+            analysis.bn_image_timestamp.on_changed.connect(hdl_data_changed, weak_ref=False),
+            analysis.bn_left_angle.on_changed.connect(hdl_data_changed, weak_ref=False),
+            analysis.bn_right_angle.on_changed.connect(hdl_data_changed, weak_ref=False),
         ]
 
         unbind_tasks.extend(
@@ -52,7 +57,7 @@ class GraphsModel:
         self._tracked_analyses.append(analysis)
         self._tracked_analysis_unbind_tasks[analysis] = unbind_tasks
 
-        self._hdl_tracked_analysis_data_changed()
+        self._hdl_tracked_analysis_data_changed(analysis)
 
     def _untrack_analysis(self, analysis: ConanAnalysis) -> None:
         unbind_tasks = self._tracked_analysis_unbind_tasks[analysis]
@@ -62,38 +67,17 @@ class GraphsModel:
         del self._tracked_analysis_unbind_tasks[analysis]
         self._tracked_analyses.remove(analysis)
 
-    def _hdl_tracked_analysis_data_changed(self) -> None:
-        left_angle_data = []
-        right_angle_data = []
-
-        analyses = self._bn_analyses.get()
-
-        for analysis in analyses:
-            timestamp = analysis.bn_image_timestamp.get()
-            if timestamp is None or not math.isfinite(timestamp):
-                continue
-
-            left_angle_value = analysis.bn_left_angle.get()
-            right_angle_value = analysis.bn_right_angle.get()
-
-            if left_angle_value is not None and math.isfinite(left_angle_value):
-                left_angle_data.append((timestamp, left_angle_value))
-
-            if right_angle_value is not None and math.isfinite(right_angle_value):
-                right_angle_data.append((timestamp, right_angle_value))
-
-        # Sort in ascending order of timestamp
-        left_angle_data = sorted(left_angle_data, key=lambda x: x[0])
-        right_angle_data = sorted(right_angle_data, key=lambda x: x[0])
+        if self._left_angle_series.discard(analysis):
+            self.bn_left_angle_data.poke()
 
-        left_angle_data = tuple(zip(*left_angle_data))
-        right_angle_data = tuple(zip(*right_angle_data))
+        if self._right_angle_series.discard(analysis):
+            self.bn_right_angle_data.poke()
 
-        if len(left_angle_data) == 0:
-            left_angle_data = (tuple(), tuple())
+    def _hdl_tracked_analysis_data_changed(self, analysis: ConanAnalysis) -> None:
+        timestamp = analysis.bn_image_timestamp.get()
 
-        if len(right_angle_data) == 0:
-            right_angle_data = (tuple(), tuple())
+        if self._left_angle_series.set(analysis, timestamp, analysis.bn_left_angle.get()):
+            self.bn_left_angle_data.poke()
 
-        self.bn_left_angle_data.set(left_angle_data)
-        self.bn_right_angle_data.set(right_angle_data)
+        if self._right_angle_series.set(analysis, timestamp, analysis.bn_right_angle.get()):
+            self.bn_right_angle_data.poke()
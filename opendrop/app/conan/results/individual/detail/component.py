@@ -5,7 +5,7 @@ from gi.repository import Gtk
 
 from opendrop.app.conan.analysis import ConanAnalysis
 from opendrop.mvp import ComponentSymbol, View, Presenter
-from opendrop.utility.bindable import Bindable, BoxBindable
+from opendrop.utility.bindable import Bindable, BoxBindable, array_equality_check
 from opendrop.utility.geometry import Vector2
 from .info import info_cs
 
@@ -62,7 +62,7 @@ class DetailPresenter(Presenter['DetailView']):
         self._bn_analysis = in_analysis
         self._analysis_unbind_tasks = []
 
-        self.bn_image = BoxBindable(None)
+        self.bn_image = BoxBindable(None, check_equals=array_equality_check)
 
         self.bn_left_angle = BoxBindable(math.nan)
         self.bn_left_point = BoxBindable(Vector2(math.nan, math.nan))
@@ -1,2 +1,2 @@
-from .component import ift_root_cs
-from .model import IFTSession
+# The views and session model are not re-exported here, so that the analysis modules under this package can be imported
+# without a display (e.g. by `opendrop.batch`).
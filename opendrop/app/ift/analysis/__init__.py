@@ -1,4 +1,4 @@
 from .analysis import IFTDropAnalysis
 from .features import FeatureExtractor, FeatureExtractorParams
 from .physical_properties import PhysicalPropertiesCalculator, PhysicalPropertiesCalculatorParams
-from .young_laplace_fit import YoungLaplaceFitter
+from .young_laplace_fit import YoungLaplaceFitter, YoungLaplaceFitSequence
@@ -1,6 +1,7 @@
 import asyncio
 import math
 import time
+import traceback
 from asyncio import Future
 from enum import Enum
 from typing import Callable, Optional
@@ -8,8 +9,10 @@ from typing import Callable, Optional
 import numpy as np
 
 from opendrop.app.common.image_acquirer import InputImage
-from opendrop.utility.bindable import AccessorBindable, BoxBindable, Bindable
+from opendrop.utility.bindable import AccessorBindable, BoxBindable, Bindable, array_equality_check
 from opendrop.utility.geometry import Vector2
+from opendrop.utility.scheduler import PRIORITY_DEFAULT
+from opendrop.utility.timing import NOT_TIMED, StageTime
 from .features import FeatureExtractor
 from .physical_properties import PhysicalPropertiesCalculator
 from .young_laplace_fit import YoungLaplaceFitter
@@ -48,6 +51,9 @@ class IFTDropAnalysis:
         self._do_young_laplace_fit = do_young_laplace_fit
         self._do_calculate_physprops = do_calculate_physprops
 
+        self._priority = PRIORITY_DEFAULT
+        self._is_viewed = False
+
         self._status = self.Status.WAITING_FOR_IMAGE
         self.bn_status = AccessorBindable(
             getter=self._get_status,
@@ -64,14 +70,21 @@ class IFTDropAnalysis:
 
         self.bn_image = AccessorBindable(self._get_image)
         self.bn_image_timestamp = AccessorBindable(self._get_image_timestamp)
+        self.bn_image_read_time = AccessorBindable(self._get_image_read_time)
 
         # Attributes from YoungLaplaceFitter
         self.bn_bond_number = BoxBindable(math.nan)
         self.bn_apex_coords_px = BoxBindable(Vector2(math.nan, math.nan))
         self.bn_apex_radius_px = BoxBindable(math.nan)
         self.bn_rotation = BoxBindable(math.nan)
-        self.bn_drop_profile_fit = BoxBindable(None)
-        self.bn_residuals = BoxBindable(None)
+        self.bn_drop_profile_fit = BoxBindable(None, check_equals=array_equality_check)
+        self.bn_residuals = BoxBindable(None, check_equals=array_equality_check)
+        self.bn_num_iterations = BoxBindable(0)
+        self.bn_num_arclength_steps_exceeded = BoxBindable(0)
+        self.bn_num_solves = BoxBindable(0)
+        self.bn_stop_reason = BoxBindable('')
+        self.bn_optimise_time = BoxBindable(NOT_TIMED)
+        self.bn_projection_time = BoxBindable(NOT_TIMED)
 
         # Attributes from PhysicalPropertiesCalculator
         self.bn_interfacial_tension = BoxBindable(math.nan)
@@ -83,9 +96,12 @@ class IFTDropAnalysis:
         # Attributes from FeatureExtractor
         self.bn_drop_region = BoxBindable(None)
         self.bn_needle_region = BoxBindable(None)
-        self.bn_drop_profile_extract = BoxBindable(None)
-        self.bn_needle_profile_extract = BoxBindable(None)
+        self.bn_drop_profile_extract = BoxBindable(None, check_equals=array_equality_check)
+        self.bn_needle_profile_extract = BoxBindable(None, check_equals=array_equality_check)
         self.bn_needle_width_px = BoxBindable(math.nan)
+        self.bn_edge_detection_time = BoxBindable(NOT_TIMED)
+        self.bn_drop_profile_time = BoxBindable(NOT_TIMED)
+        self.bn_needle_time = BoxBindable(NOT_TIMED)
 
         # Log
         self.bn_log = BoxBindable('')
@@ -109,6 +125,14 @@ class IFTDropAnalysis:
         if self.bn_is_done.get():
             return
 
+        exc = read_task.exception()
+        if exc is not None:
+            # Images may only be decoded when they're read, so a corrupt file is only found out about now. Give up on
+            # this analysis instead of waiting for an image forever.
+            traceback.print_exception(type(exc), exc, exc.__traceback__)
+            self.cancel()
+            return
+
         image, image_timestamp = read_task.result()
         self._start_fit(image, image_timestamp)
 
@@ -129,10 +153,13 @@ class IFTDropAnalysis:
         self._young_laplace_fit = young_laplace_fit
         self._physical_properties = physical_properties
 
+        self._apply_priority()
+        self._apply_is_viewed()
         self._bind_fit()
 
         self.bn_image.poke()
         self.bn_image_timestamp.poke()
+        self.bn_image_read_time.poke()
 
         young_laplace_fit.bn_is_busy.on_changed.connect(
             self._hdl_young_laplace_fit_is_busy_changed
@@ -157,6 +184,15 @@ class IFTDropAnalysis:
         self._extracted_features.params.bn_needle_region_px.bind(
             self.bn_needle_region
         )
+        self._extracted_features.bn_edge_detection_time.bind(
+            self.bn_edge_detection_time
+        )
+        self._extracted_features.bn_drop_profile_time.bind(
+            self.bn_drop_profile_time
+        )
+        self._extracted_features.bn_needle_time.bind(
+            self.bn_needle_time
+        )
 
         # Bind Young-Laplace fit attributes
         self._young_laplace_fit.bn_bond_number.bind(
@@ -180,6 +216,24 @@ class IFTDropAnalysis:
         self._young_laplace_fit.bn_log.bind(
             self.bn_log
         )
+        self._young_laplace_fit.bn_num_iterations.bind(
+            self.bn_num_iterations
+        )
+        self._young_laplace_fit.bn_num_arclength_steps_exceeded.bind(
+            self.bn_num_arclength_steps_exceeded
+        )
+        self._young_laplace_fit.bn_num_solves.bind(
+            self.bn_num_solves
+        )
+        self._young_laplace_fit.bn_stop_reason.bind(
+            self.bn_stop_reason
+        )
+        self._young_laplace_fit.bn_optimise_time.bind(
+            self.bn_optimise_time
+        )
+        self._young_laplace_fit.bn_projection_time.bind(
+            self.bn_projection_time
+        )
 
         # Bind physical properties attributes
         self._physical_properties.bn_interfacial_tension.bind(
@@ -221,6 +275,38 @@ class IFTDropAnalysis:
 
         self.bn_status.set(self.Status.CANCELLED)
 
+    # Priority of this analysis' background work relative to other analyses, see opendrop.utility.scheduler.
+    @property
+    def priority(self) -> int:
+        return self._priority
+
+    @priority.setter
+    def priority(self, value: int) -> None:
+        self._priority = value
+        self._apply_priority()
+
+    def _apply_priority(self) -> None:
+        if self._extracted_features is not None:
+            self._extracted_features.priority = self._priority
+
+        if self._young_laplace_fit is not None:
+            self._young_laplace_fit.priority = self._priority
+
+    # Whether this analysis is being looked at, in which case the fitted profile and residuals are updated while the
+    # fit is still running, not just once it has finished.
+    @property
+    def is_viewed(self) -> bool:
+        return self._is_viewed
+
+    @is_viewed.setter
+    def is_viewed(self, value: bool) -> None:
+        self._is_viewed = value
+        self._apply_is_viewed()
+
+    def _apply_is_viewed(self) -> None:
+        if self._young_laplace_fit is not None:
+            self._young_laplace_fit.is_detailed = self._is_viewed
+
     def _get_status(self) -> Status:
         return self._status
 
@@ -237,6 +323,12 @@ class IFTDropAnalysis:
     def _get_image_timestamp(self) -> float:
         return self._image_timestamp
 
+    def _get_image_read_time(self) -> StageTime:
+        if self._image is None:
+            return NOT_TIMED
+
+        return self._input_image.read_time
+
     def _get_is_done(self) -> bool:
         return self.bn_status.get().is_terminal
 
@@ -6,13 +6,22 @@ import numpy as np
 
 from opendrop.processing.ift import (
     apply_edge_detection,
+    edge_detection_margin,
     extract_drop_profile,
     extract_needle_profile,
     calculate_width_from_needle_profile,
+    NeedleCache,
 )
+from opendrop.processing.ift.needle_width import needle_cache as shared_needle_cache
 from opendrop.utility.bindable import BoxBindable, AccessorBindable, thread_safe_bindable_collection, Bindable
+from opendrop.utility.geometry import Rect2
+from opendrop.utility.misc import clamp
+from opendrop.utility.timing import NOT_TIMED, StageTime, Stopwatch
 from opendrop.utility.updaterworker import UpdaterWorker
 
+# Size of the Gaussian blur applied to the image before edge detection.
+EDGE_DETECTION_GAUSSIAN_SIZE = 3
+
 
 class FeatureExtractorParams:
     def __init__(self) -> None:
@@ -21,6 +30,19 @@ class FeatureExtractorParams:
         self.bn_canny_min = BoxBindable(30)
         self.bn_canny_max = BoxBindable(60)
 
+    def copy(self) -> 'FeatureExtractorParams':
+        """Return a copy of these parameters that doesn't follow later changes to them."""
+        copy = FeatureExtractorParams()
+        copy.update(self)
+        return copy
+
+    def update(self, other: 'FeatureExtractorParams') -> None:
+        """Set these parameters to the values of `other`."""
+        self.bn_needle_region_px.set(other.bn_needle_region_px.get())
+        self.bn_drop_region_px.set(other.bn_drop_region_px.get())
+        self.bn_canny_min.set(other.bn_canny_min.get())
+        self.bn_canny_max.set(other.bn_canny_max.get())
+
 
 class FeatureExtractor:
     _Data = thread_safe_bindable_collection(
@@ -29,12 +51,17 @@ class FeatureExtractor:
             'bn_drop_profile_px',
             'bn_needle_profile_px',
             'bn_needle_width_px',
+            'bn_edge_detection_time',
+            'bn_drop_profile_time',
+            'bn_needle_time',
         ]
     )
 
     def __init__(self, image: Bindable[np.ndarray], params: 'FeatureExtractorParams', *,
+                 needle_cache: Optional[NeedleCache] = None,
                  loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
         self._loop = loop or asyncio.get_event_loop()
+        self._needle_cache = needle_cache if needle_cache is not None else shared_needle_cache
 
         self._bn_image = image
 
@@ -46,6 +73,9 @@ class FeatureExtractor:
             bn_drop_profile_px=None,
             bn_needle_profile_px=None,
             bn_needle_width_px=math.nan,
+            bn_edge_detection_time=NOT_TIMED,
+            bn_drop_profile_time=NOT_TIMED,
+            bn_needle_time=NOT_TIMED,
         )
 
         self.is_busy = AccessorBindable(getter=self.get_is_busy)
@@ -60,6 +90,11 @@ class FeatureExtractor:
         self.bn_needle_profile_px = self._data.bn_needle_profile_px  # type: Bindable[Optional[Tuple[np.ndarray, np.ndarray]]]
         self.bn_needle_width_px = self._data.bn_needle_width_px  # type: Bindable[float]
 
+        # Time taken by each stage of the last update.
+        self.bn_edge_detection_time = self._data.bn_edge_detection_time  # type: Bindable[StageTime]
+        self.bn_drop_profile_time = self._data.bn_drop_profile_time  # type: Bindable[StageTime]
+        self.bn_needle_time = self._data.bn_needle_time  # type: Bindable[StageTime]
+
         # Update extracted features whenever image or params change.
         self._bn_image.on_changed.connect(self._queue_update)
         self.params.bn_drop_region_px.on_changed.connect(self._queue_update)
@@ -83,15 +118,24 @@ class FeatureExtractor:
         assert editor is not None
 
         try:
-            new_edge_detection = self._apply_edge_detection()
-            new_drop_profile_px = self._extract_drop_profile_px(new_edge_detection)
-            new_needle_profile_px = self._extract_needle_profile_px(new_edge_detection)
-            new_needle_width_px = self._extract_needle_width_px(new_needle_profile_px)
+            edge_detection_stopwatch = Stopwatch()
+            drop_profile_stopwatch = Stopwatch()
+            needle_stopwatch = Stopwatch()
+
+            with edge_detection_stopwatch:
+                new_edge_detection = self._apply_edge_detection()
+            with drop_profile_stopwatch:
+                new_drop_profile_px = self._extract_drop_profile_px(new_edge_detection)
+            with needle_stopwatch:
+                new_needle_profile_px, new_needle_width_px = self._extract_needle_features_px(new_edge_detection)
 
             editor.set_value('bn_edge_detection', new_edge_detection)
             editor.set_value('bn_drop_profile_px', new_drop_profile_px)
             editor.set_value('bn_needle_profile_px', new_needle_profile_px)
             editor.set_value('bn_needle_width_px', new_needle_width_px)
+            editor.set_value('bn_edge_detection_time', edge_detection_stopwatch.elapsed)
+            editor.set_value('bn_drop_profile_time', drop_profile_stopwatch.elapsed)
+            editor.set_value('bn_needle_time', needle_stopwatch.elapsed)
         except Exception as exc:
             # If any exceptions occur, discard changes and re-raise the exception.
             editor.discard()
@@ -105,12 +149,53 @@ class FeatureExtractor:
         if image is None:
             return None
 
-        return apply_edge_detection(
-            image=image,
+        # Edge detection is only run on the part of the image covered by the drop and needle regions, padded by the
+        # margin that edge detection depends on. This makes the gradients inside the regions the same as for the whole
+        # image, but not necessarily the edges: Canny's hysteresis keeps weak edges that connect to strong ones, and
+        # the connecting chain may run outside of the padded area, so weak edges close to the region boundaries can be
+        # lost.
+        bounds = self._get_edge_detection_bounds(image, padding=edge_detection_margin(EDGE_DETECTION_GAUSSIAN_SIZE))
+        if bounds.w == 0 or bounds.h == 0:
+            # Regions are outside of the image.
+            return np.zeros(image.shape[:2], dtype=np.uint8)
+
+        edge_detection = apply_edge_detection(
+            image=image[bounds.y0:bounds.y1, bounds.x0:bounds.x1],
+            gaussian_size=EDGE_DETECTION_GAUSSIAN_SIZE,
             canny_min=self.params.bn_canny_min.get(),
             canny_max=self.params.bn_canny_max.get(),
         )
 
+        if tuple(bounds.size) == image.shape[1::-1]:
+            return edge_detection
+
+        # Map back to full image coordinates.
+        full_edge_detection = np.zeros(image.shape[:2], dtype=edge_detection.dtype)
+        full_edge_detection[bounds.y0:bounds.y1, bounds.x0:bounds.x1] = edge_detection
+
+        return full_edge_detection
+
+    def _get_edge_detection_bounds(self, image: np.ndarray, padding: int) -> Rect2[int]:
+        """Return the union of the drop and needle regions padded by `padding` pixels and clipped to `image`, or the
+        whole image if neither region is defined."""
+        height, width = image.shape[:2]
+
+        regions = [
+            region.as_type(int)
+            for region in (self.params.bn_drop_region_px.get(), self.params.bn_needle_region_px.get())
+            if region is not None
+        ]
+
+        if not regions:
+            return Rect2(x0=0, y0=0, x1=width, y1=height)
+
+        x0 = clamp(min(region.x0 for region in regions) - padding, 0, width)
+        y0 = clamp(min(region.y0 for region in regions) - padding, 0, height)
+        x1 = clamp(max(region.x1 for region in regions) + padding, x0, width)
+        y1 = clamp(max(region.y1 for region in regions) + padding, y0, height)
+
+        return Rect2(x0=x0, y0=y0, x1=x1, y1=y1)
+
     def _extract_drop_profile_px(self, binary_image: Optional[np.ndarray]) -> Optional[np.ndarray]:
         if binary_image is None:
             return None
@@ -128,28 +213,26 @@ class FeatureExtractor:
 
         return drop_profile_px
 
-    def _extract_needle_profile_px(self, binary_image: Optional[np.ndarray]) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    def _extract_needle_features_px(self, binary_image: Optional[np.ndarray]) \
+            -> Tuple[Optional[Tuple[np.ndarray, np.ndarray]], float]:
         if binary_image is None:
-            return None
+            return None, math.nan
 
         needle_region = self.params.bn_needle_region_px.get()
         if needle_region is None:
-            return None
+            return None, math.nan
 
         needle_region = needle_region.as_type(int)
 
         needle_image = binary_image[needle_region.y0:needle_region.y1, needle_region.x0:needle_region.x1]
 
-        needle_profile_px = extract_needle_profile(needle_image)
-        needle_profile_px = tuple(x + needle_region.pos for x in needle_profile_px)
-
-        return needle_profile_px
+        # The needle usually doesn't move between frames, so if the edges in the needle region are the same as in a
+        # previous frame (edges already depend on the Canny thresholds), reuse the profile and width found then.
+        needle_profile, needle_width_px = self._needle_cache.get_or_calculate(needle_image, _calculate_needle_features)
 
-    def _extract_needle_width_px(self, needle_profile: Optional[Tuple[np.ndarray, np.ndarray]]) -> float:
-        if needle_profile is None:
-            return math.nan
+        needle_profile_px = tuple(x + needle_region.pos for x in needle_profile)
 
-        return calculate_width_from_needle_profile(needle_profile)
+        return needle_profile_px, needle_width_px
 
     @property
     def is_sessile(self) -> bool:
@@ -164,9 +247,25 @@ class FeatureExtractor:
             # Needle region is below drop region, probably sessile drop.
             return True
 
+    # Priority of background updates relative to other objects, see opendrop.utility.scheduler.
+    @property
+    def priority(self) -> int:
+        return self._updater_worker.priority
+
+    @priority.setter
+    def priority(self, value: int) -> None:
+        self._updater_worker.priority = value
+
     def get_is_busy(self) -> bool:
         return self._updater_worker.is_busy
 
     async def wait_until_not_busy(self) -> None:
         while self.is_busy.get():
             await self.is_busy.on_changed.wait()
+
+
+def _calculate_needle_features(needle_image: np.ndarray) -> Tuple[Tuple[np.ndarray, np.ndarray], float]:
+    needle_profile = extract_needle_profile(needle_image)
+    needle_width = calculate_width_from_needle_profile(needle_profile)
+
+    return needle_profile, needle_width
@@ -1,17 +1,215 @@
 import asyncio
 import math
 import threading
-from typing import Optional
+from typing import Any, Callable, Optional, MutableMapping, MutableSequence, Tuple
 
 import numpy as np
 
 from opendrop.app.ift.analysis.features import FeatureExtractor
 from opendrop.processing.ift import YoungLaplaceFit
+from opendrop.processing.ift.young_laplace import YoungLaplaceFitJob, YoungLaplaceFitPool, YoungLaplaceFitProgress, \
+    YoungLaplaceFitSnapshot
 from opendrop.utility.bindable import thread_safe_bindable_collection, Bindable, AccessorBindable
+from opendrop.utility.bindable.util import change_notifier
 from opendrop.utility.geometry import Vector2
+from opendrop.utility.timing import NOT_TIMED, StageTime
 from opendrop.utility.updaterworker import UpdaterWorker
 
 
+# Seconds to wait for more fits to be requested before submitting a batch that isn't full.
+BATCH_DELAY = 0.1
+
+
+class YoungLaplaceFitRequest:
+    """A fit of frame `index` of a `YoungLaplaceFitSequence`, which waits to be submitted with the rest of its batch
+    (see `YoungLaplaceFitSequence.submit()`). Has the same interface as the `YoungLaplaceFitJob` it is submitted as."""
+
+    def __init__(self, index: int, drop_profile: np.ndarray, *, detailed: bool = False,
+                 on_update: Optional[Callable[[YoungLaplaceFitSnapshot], Any]] = None,
+                 logger: Optional[Callable[[str], Any]] = None) -> None:
+        self.index = index
+        self.drop_profile = drop_profile
+
+        self.on_update = on_update or (lambda x: None)
+        self.logger = logger or (lambda x: None)
+
+        self._detailed = detailed
+        self._is_cancelled = False
+
+        self._job = None  # type: Optional[YoungLaplaceFitJob]
+        self._is_finished = False
+        self._done_callbacks = []  # type: MutableSequence[Callable[[YoungLaplaceFitRequest], Any]]
+
+        self._lock = threading.Lock()
+
+    # This method will be run on different threads, so make sure it stays thread-safe.
+    def cancel(self) -> None:
+        with self._lock:
+            self._is_cancelled = True
+            job = self._job
+
+        if job is not None:
+            job.cancel()
+
+    # This method will be run on different threads, so make sure it stays thread-safe.
+    def set_detailed(self, detailed: bool) -> None:
+        with self._lock:
+            self._detailed = detailed
+            job = self._job
+
+        if job is not None:
+            job.set_detailed(detailed)
+
+    # This method will be run on different threads, so make sure it stays thread-safe.
+    def add_done_callback(self, fn: Callable[['YoungLaplaceFitRequest'], Any]) -> None:
+        """Call `fn` with the request once its job has finished, or once it is dropped from its batch if it's cancelled
+        or replaced before the batch is submitted. Called straight away if that has already happened."""
+        with self._lock:
+            if not self._is_finished:
+                self._done_callbacks.append(fn)
+                return
+
+        fn(self)
+
+    def result(self) -> Optional[YoungLaplaceFitSnapshot]:
+        """Return the final state of the fit, or None if it never ran. See `YoungLaplaceFitJob.result()`."""
+        if self._job is None:
+            return None
+
+        return self._job.result()
+
+    @property
+    def is_cancelled(self) -> bool:
+        return self._is_cancelled
+
+    # Called by the sequence once the request has been submitted as `job`.
+    def _set_job(self, job: YoungLaplaceFitJob) -> None:
+        with self._lock:
+            self._job = job
+            detailed = self._detailed
+            is_cancelled = self._is_cancelled
+
+        if detailed:
+            job.set_detailed(True)
+        if is_cancelled:
+            job.cancel()
+
+        job.add_done_callback(lambda _: self._set_finished())
+
+    def _set_finished(self) -> None:
+        with self._lock:
+            self._is_finished = True
+            callbacks = tuple(self._done_callbacks)
+            self._done_callbacks.clear()
+
+        for fn in callbacks:
+            fn(self)
+
+
+class YoungLaplaceFitSequence:
+    """Converged fit parameters of the frames of a time series, used to warm start the fits of neighbouring frames.
+
+    If `pool` is given, the fits of the frames can be requested from the sequence (see `request()`), which submits
+    them to the pool together as batches (see `YoungLaplaceFitPool.submit_batch()`), instead of one job per frame. A
+    batch is submitted once `batch_size` fits are waiting, or when no more have been requested for `BATCH_DELAY`
+    seconds."""
+
+    def __init__(self, *, pool: Optional[YoungLaplaceFitPool] = None, batch_size: Optional[int] = None) -> None:
+        self._params = {}  # type: MutableMapping[int, Tuple[float, ...]]
+        self._lock = threading.Lock()
+
+        self._pool = pool
+        self._batch_size = batch_size
+
+        self._pending = {}  # type: MutableMapping[int, YoungLaplaceFitRequest]
+        self._timer = None  # type: Optional[threading.Timer]
+
+    @property
+    def is_batched(self) -> bool:
+        return self._pool is not None
+
+    # This method will be run on different threads, so make sure it stays thread-safe.
+    def get_nearest(self, index: int) -> Optional[Tuple[float, ...]]:
+        """Return the parameters of the finished frame nearest to `index` (preferring earlier frames on ties), or None
+        if no frames have finished yet."""
+        with self._lock:
+            if not self._params:
+                return None
+
+            nearest = min(self._params, key=lambda i: (abs(i - index), i > index))
+            return self._params[nearest]
+
+    # This method will be run on different threads, so make sure it stays thread-safe.
+    def put(self, index: int, params: Tuple[float, ...]) -> None:
+        with self._lock:
+            self._params[index] = params
+
+    # This method will be run on different threads, so make sure it stays thread-safe.
+    def submit(self, request: YoungLaplaceFitRequest) -> None:
+        """Add `request` to the next batch. A request that is still waiting for the same frame is replaced (and
+        finished without running)."""
+        assert self._pool is not None
+
+        with self._lock:
+            replaced = self._pending.pop(request.index, None)
+            self._pending[request.index] = request
+
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+            if self._batch_size is not None and len(self._pending) >= self._batch_size:
+                batch = self._take_pending()
+            else:
+                batch = None
+                self._timer = threading.Timer(BATCH_DELAY, self._submit_pending)
+                self._timer.daemon = True
+                self._timer.start()
+
+        if replaced is not None:
+            replaced._set_finished()
+
+        if batch is not None:
+            self._submit(batch)
+
+    def _take_pending(self) -> MutableSequence[YoungLaplaceFitRequest]:
+        # Must be called with the lock held.
+        batch = sorted(self._pending.values(), key=lambda r: r.index)
+        self._pending.clear()
+
+        return batch
+
+    # This method will be run on the timer thread.
+    def _submit_pending(self) -> None:
+        with self._lock:
+            self._timer = None
+            batch = self._take_pending()
+
+        self._submit(batch)
+
+    def _submit(self, batch: MutableSequence[YoungLaplaceFitRequest]) -> None:
+        # Requests cancelled while waiting are dropped.
+        cancelled = [request for request in batch if request.is_cancelled]
+        batch = [request for request in batch if not request.is_cancelled]
+
+        for request in cancelled:
+            request._set_finished()
+
+        if not batch:
+            return
+
+        jobs = self._pool.submit_batch(
+            [request.drop_profile for request in batch],
+            initial_params=self.get_nearest(batch[0].index),
+            profile_samples=YoungLaplaceFitter.PROFILE_FIT_SAMPLES,
+            on_update=lambda i, snapshot: batch[i].on_update(snapshot),
+            logger=lambda i, message: batch[i].logger(message),
+        )
+
+        for request, job in zip(batch, jobs):
+            request._set_job(job)
+
+
 class YoungLaplaceFitter:
     PROFILE_FIT_SAMPLES = 500
 
@@ -25,16 +223,39 @@ class YoungLaplaceFitter:
             'residuals',
             'volume',
             'surface_area',
+            'num_iterations',
+            'num_arclength_steps_exceeded',
+            'num_solves',
+            'stop_reason',
+            'optimise_time',
+            'projection_time',
         ]
     )
 
     def __init__(self, features: FeatureExtractor, *,
+                 sequence: Optional[YoungLaplaceFitSequence] = None, sequence_index: int = 0,
+                 pool: Optional[YoungLaplaceFitPool] = None,
                  loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
         self._loop = loop or asyncio.get_event_loop()
 
+        # If `pool` is given, fits are run in its worker processes, otherwise they are run on the updater thread. If
+        # `sequence` is batched, fits are requested from it instead, and run in its pool.
+        self._pool = pool
+        self._job = None  # type: Optional[YoungLaplaceFitJob]
+        self._request = None  # type: Optional[YoungLaplaceFitRequest]
+        self._job_lock = threading.Lock()
+
+        # Progress of the fit running on the updater thread, if any.
+        self._progress = None  # type: Optional[YoungLaplaceFitProgress]
+        self._is_detailed = False
+
         self._features = features
         self._is_sessile = False
 
+        # If this fit is one frame of a time series, warm start from the nearest finished frame of `sequence`.
+        self._sequence = sequence
+        self._sequence_index = sequence_index
+
         self._data = self._Data(
             _loop=self._loop,
             apex_pos=Vector2(math.nan, math.nan),
@@ -45,6 +266,12 @@ class YoungLaplaceFitter:
             residuals=None,
             volume=math.nan,
             surface_area=math.nan,
+            num_iterations=0,
+            num_arclength_steps_exceeded=0,
+            num_solves=0,
+            stop_reason='',
+            optimise_time=NOT_TIMED,
+            projection_time=NOT_TIMED,
         )
 
         self._stop_flag = False
@@ -65,6 +292,14 @@ class YoungLaplaceFitter:
         self.bn_volume = self._data.volume  # type: Bindable[float]
         self.bn_surface_area = self._data.surface_area  # type: Bindable[float]
 
+        # Work done by the fit so far, see the properties of the same names of YoungLaplaceFit.
+        self.bn_num_iterations = self._data.num_iterations  # type: Bindable[int]
+        self.bn_num_arclength_steps_exceeded = self._data.num_arclength_steps_exceeded  # type: Bindable[int]
+        self.bn_num_solves = self._data.num_solves  # type: Bindable[int]
+        self.bn_stop_reason = self._data.stop_reason  # type: Bindable[str]
+        self.bn_optimise_time = self._data.optimise_time  # type: Bindable[StageTime]
+        self.bn_projection_time = self._data.projection_time  # type: Bindable[StageTime]
+
         self._log = ''
         self._log_lock = threading.Lock()
         self.bn_log = AccessorBindable(getter=self.get_log)
@@ -107,11 +342,137 @@ class YoungLaplaceFitter:
 
         self._clear_log()
 
-        fit = YoungLaplaceFit(
-            drop_profile=drop_profile_px,
-            on_update=self._ylfit_incremental_update,
-            logger=self._append_log
+        if self._sequence is not None and self._sequence.is_batched:
+            self._request_in_batch(drop_profile_px)
+            return
+
+        initial_params = None
+        if self._sequence is not None:
+            initial_params = self._sequence.get_nearest(self._sequence_index)
+
+        if self._pool is None:
+            with self._job_lock:
+                self._progress = YoungLaplaceFitProgress(self.PROFILE_FIT_SAMPLES, detailed=self._is_detailed)
+
+            fit = YoungLaplaceFit(
+                drop_profile=drop_profile_px,
+                initial_params=initial_params,
+                on_update=self._ylfit_incremental_update,
+                logger=self._append_log
+            )
+            result = YoungLaplaceFitSnapshot(fit)
+        else:
+            result = self._run_in_pool(drop_profile_px, initial_params)
+
+        if result is None:
+            return
+
+        if self._sequence is not None and not result.is_cancelled and math.isfinite(result.bond_number):
+            self._sequence.put(self._sequence_index, result.params)
+
+    # This method will be run on different threads (could be called by UpdaterWorker), so make sure it stays
+    # thread-safe.
+    def _run_in_pool(self, drop_profile_px: np.ndarray, initial_params: Optional[Tuple[float, ...]]) \
+            -> Optional[YoungLaplaceFitSnapshot]:
+        job = self._pool.submit(
+            drop_profile_px,
+            initial_params=initial_params,
+            profile_samples=self.PROFILE_FIT_SAMPLES,
+            detailed=self._is_detailed,
+            on_update=self._commit_snapshot,
+            logger=self._append_log,
+        )
+
+        with self._job_lock:
+            self._job = job
+
+            # stop() may have been called before the job was visible to it.
+            if self._stop_flag:
+                job.cancel()
+
+        # Block this updater thread until all updates from the worker have been committed, so that `bn_is_busy`
+        # only becomes False after the final result is in.
+        job.wait()
+
+        with self._job_lock:
+            self._job = None
+
+        try:
+            return job.result()
+        except Exception as exc:
+            self._append_log('\nFitting failed in worker process: {!r}\n'.format(exc))
+            return None
+
+    # This method will be run on different threads (could be called by UpdaterWorker), so make sure it stays
+    # thread-safe.
+    def _request_in_batch(self, drop_profile_px: np.ndarray) -> None:
+        # Unlike the other ways of fitting, don't block the updater thread until the fit is done, the batch is only
+        # submitted once the other frames have made their requests too, which needs the updater threads.
+        request = YoungLaplaceFitRequest(
+            self._sequence_index,
+            drop_profile_px,
+            detailed=self._is_detailed,
+            on_update=lambda snapshot: self._hdl_request_update(request, snapshot),
+            logger=lambda message: self._hdl_request_log(request, message),
         )
+        request.add_done_callback(self._hdl_request_done)
+
+        with self._job_lock:
+            replaced = self._request
+            self._request = request
+
+            # stop() may have been called before the request was visible to it.
+            if self._stop_flag:
+                request.cancel()
+
+        if replaced is not None:
+            replaced.cancel()
+
+        self._sequence.submit(request)
+
+    # This method will be run on the pool's listener thread.
+    def _hdl_request_update(self, request: YoungLaplaceFitRequest, snapshot: YoungLaplaceFitSnapshot) -> None:
+        # Ignore a replaced request that hasn't stopped yet.
+        if request is not self._request:
+            return
+
+        self._commit_snapshot(snapshot)
+
+    # This method will be run on the pool's listener thread.
+    def _hdl_request_log(self, request: YoungLaplaceFitRequest, message: str) -> None:
+        if request is not self._request:
+            return
+
+        self._append_log(message)
+
+    # This method will be run on different threads (the pool's listener thread, or the thread that replaced or
+    # cancelled the request), so make sure it stays thread-safe.
+    def _hdl_request_done(self, request: YoungLaplaceFitRequest) -> None:
+        with self._job_lock:
+            if request is not self._request:
+                return
+
+            self._request = None
+
+        try:
+            result = request.result()
+        except Exception as exc:
+            self._append_log('\nFitting failed in worker process: {!r}\n'.format(exc))
+            result = None
+
+        if result is not None and not result.is_cancelled and math.isfinite(result.bond_number):
+            self._sequence.put(self._sequence_index, result.params)
+
+        try:
+            self._loop.call_soon_threadsafe(self._hdl_request_idle)
+        except RuntimeError:
+            # Event loop has been closed.
+            pass
+
+    def _hdl_request_idle(self) -> None:
+        # Like UpdaterWorker, don't let held back changes arrive after the fitter is seen as idle.
+        change_notifier.flush(self._loop)
+        self.bn_is_busy.poke()
 
     # This method will be run on different threads (could be called by UpdaterWorker), so make sure it stays
     # thread-safe.
@@ -120,27 +481,52 @@ class YoungLaplaceFitter:
             ylfit.cancel()
             return
 
+        if not self._progress.is_due(ylfit):
+            return
+
+        self._commit_snapshot(self._progress.snapshot(ylfit))
+
+    # This method will be run on different threads (could be called by UpdaterWorker or the pool's listener thread),
+    # so make sure it stays thread-safe.
+    def _commit_snapshot(self, snapshot: YoungLaplaceFitSnapshot) -> None:
+        if self._stop_flag:
+            return
+
         editor = self._data.edit(timeout=1)
         assert editor is not None
 
         try:
-            apex_pos = Vector2(ylfit.apex_x, ylfit.apex_y)
-            rotation = ylfit.rotation
-            profile_fit = ylfit(np.linspace(0, 1, num=self.PROFILE_FIT_SAMPLES))
+            apex_pos = Vector2(snapshot.apex_x, snapshot.apex_y)
+            rotation = snapshot.rotation
 
             if not self._is_sessile:
                 apex_pos = Vector2(apex_pos.x, -apex_pos.y)
                 rotation *= -1
-                profile_fit[:, 1] *= -1
 
             editor.set_value('apex_pos', apex_pos)
-            editor.set_value('apex_radius', ylfit.apex_radius)
-            editor.set_value('bond_number', ylfit.bond_number)
+            editor.set_value('apex_radius', snapshot.apex_radius)
+            editor.set_value('bond_number', snapshot.bond_number)
             editor.set_value('rotation', rotation)
-            editor.set_value('profile_fit', profile_fit)
-            editor.set_value('residuals', ylfit.residuals)
-            editor.set_value('volume', ylfit.volume)
-            editor.set_value('surface_area', ylfit.surface_area)
+
+            # Intermediate updates may only carry scalars, keep the last profile and residuals until the next update
+            # that has them.
+            if snapshot.profile_fit is not None:
+                profile_fit = snapshot.profile_fit.copy()
+                if not self._is_sessile:
+                    profile_fit[:, 1] *= -1
+
+                editor.set_value('profile_fit', profile_fit)
+                editor.set_value('residuals', snapshot.residuals)
+
+            editor.set_value('volume', snapshot.volume)
+            editor.set_value('surface_area', snapshot.surface_area)
+
+            editor.set_value('num_iterations', snapshot.num_iterations)
+            editor.set_value('num_arclength_steps_exceeded', snapshot.num_arclength_steps_exceeded)
+            editor.set_value('num_solves', snapshot.num_solves)
+            editor.set_value('stop_reason', snapshot.stop_reason)
+            editor.set_value('optimise_time', snapshot.optimise_time)
+            editor.set_value('projection_time', snapshot.projection_time)
         except Exception as exc:
             # If any exceptions occur, discard changes and re-raise the exception.
             editor.discard()
@@ -152,8 +538,41 @@ class YoungLaplaceFitter:
     def stop(self) -> None:
         self._stop_flag = True
 
+        with self._job_lock:
+            if self._job is not None:
+                self._job.cancel()
+            if self._request is not None:
+                self._request.cancel()
+
+    # Whether progress updates of a running fit should carry the fitted profile and residuals, e.g. while the fit is
+    # being looked at. Otherwise they're only computed once the fit finishes.
+    @property
+    def is_detailed(self) -> bool:
+        return self._is_detailed
+
+    @is_detailed.setter
+    def is_detailed(self, value: bool) -> None:
+        with self._job_lock:
+            self._is_detailed = value
+
+            if self._progress is not None:
+                self._progress.detailed = value
+            if self._job is not None:
+                self._job.set_detailed(value)
+            if self._request is not None:
+                self._request.set_detailed(value)
+
+    # Priority of background updates relative to other objects, see opendrop.utility.scheduler.
+    @property
+    def priority(self) -> int:
+        return self._updater_worker.priority
+
+    @priority.setter
+    def priority(self, value: int) -> None:
+        self._updater_worker.priority = value
+
     def get_is_busy(self) -> bool:
-        return self._updater_worker.is_busy
+        return self._updater_worker.is_busy or self._request is not None
 
     async def wait_until_not_busy(self) -> None:
         while self.bn_is_busy.get():
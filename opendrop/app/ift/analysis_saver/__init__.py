@@ -1,2 +1 @@
-from .component import ift_save_dialog_cs
 from .model import IFTAnalysisSaverOptions
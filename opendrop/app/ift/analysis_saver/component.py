@@ -3,7 +3,7 @@ from typing import Optional, Callable, Any
 
 from gi.repository import Gtk, Gdk
 
-from opendrop.app.common.analysis_saver.figure_options import figure_options_cs
+from opendrop.app.common.analysis_saver.figure_options.component import figure_options_cs
 from opendrop.mvp import ComponentSymbol, View, Presenter
 from opendrop.utility.bindable import AccessorBindable
 from opendrop.utility.bindablegext import GObjectPropertyBindable
@@ -11,8 +11,20 @@ import numpy as np
 from opendrop.app.common.analysis_saver.misc import simple_grapher
 from opendrop.app.ift.analysis import IFTDropAnalysis
 from opendrop.utility.misc import clear_directory_contents
+from opendrop.utility.timing import StageTime
 from .model import IFTAnalysisSaverOptions
 
+# Timed stages of an analysis in the order they're run, as (key in params.ini, label in timeline.csv, name of the
+# IFTDropAnalysis bindable with the time).
+_TIMED_STAGES = (
+    ('image_read', 'Image read', 'bn_image_read_time'),
+    ('edge_detection', 'Edge detection', 'bn_edge_detection_time'),
+    ('drop_profile', 'Drop profile extraction', 'bn_drop_profile_time'),
+    ('needle', 'Needle width', 'bn_needle_time'),
+    ('optimise', 'Levenberg-Marquardt', 'bn_optimise_time'),
+    ('projection', 'Arclength projections', 'bn_projection_time'),
+)
+
 
 def save_drops(drops: Iterable[IFTDropAnalysis], options: IFTAnalysisSaverOptions) -> None:
     drops = list(drops)
@@ -178,6 +190,10 @@ def _save_drop_image_annotated(drop: IFTDropAnalysis, out_file_path: Path) -> No
 
 
 def _save_drop_params(drop: IFTDropAnalysis, out_file) -> None:
+    # Analyses that never got an image (e.g. cancelled, or the image couldn't be read) have no regions.
+    drop_region = drop.bn_drop_region.get()
+    needle_region = drop.bn_needle_region.get()
+
     root = configparser.ConfigParser(allow_no_value=True)
     root.read_dict(OrderedDict((
         ('Physical', OrderedDict((
@@ -192,19 +208,42 @@ def _save_drop_params(drop: IFTDropAnalysis, out_file) -> None:
         ))),
         ('Image', OrderedDict((
             ('; regions are defined by (left, top, right, bottom) tuples', None),
-            ('drop_region', tuple(drop.bn_drop_region.get())),
-            ('needle_region', tuple(drop.bn_needle_region.get())),
+            ('drop_region', tuple(drop_region) if drop_region is not None else None),
+            ('needle_region', tuple(needle_region) if needle_region is not None else None),
             ('apex_coordinates', '({0.x:.1f}, {0.y:.1f})'.format(drop.bn_apex_coords_px.get())),
             ('; needle width in pixels', None),
             ('needle_width', format(drop.bn_needle_width_px.get(), '.3g')),
             ('; angle is in degrees (positive is counter-clockwise)', None),
             ('image_angle', format(math.degrees(drop.bn_rotation.get()), '.3g')),
         ))),
+        ('Telemetry', OrderedDict((
+            ('; times are in seconds, cpu times are of the thread that did the work', None),
+            *(
+                item
+                for key, _, stage_time in _stage_times(drop)
+                for item in (
+                    (key + '_wall_time', format(stage_time.wall, '.3g')),
+                    (key + '_cpu_time', format(stage_time.cpu, '.3g')),
+                )
+            ),
+            ('num_iterations', drop.bn_num_iterations.get()),
+            ('num_arclength_steps_exceeded', drop.bn_num_arclength_steps_exceeded.get()),
+            ('num_solves', drop.bn_num_solves.get()),
+            ('stop_reason', drop.bn_stop_reason.get()),
+        ))),
     )))
 
     root.write(out_file)
 
 
+def _stage_times(drop: IFTDropAnalysis) -> Sequence[Tuple[str, str, StageTime]]:
+    """Return the (key, label, time) of each of the _TIMED_STAGES of the analysis of `drop`."""
+    return tuple(
+        (key, label, getattr(drop, bindable_name).get())
+        for key, label, bindable_name in _TIMED_STAGES
+    )
+
+
 def _save_drop_contour(drop: IFTDropAnalysis, out_file) -> None:
     drop_profile_extract = drop.bn_drop_profile_extract.get()
     if drop_profile_extract is None:
@@ -353,6 +392,15 @@ def _save_timeline_data(drops: Sequence[IFTDropAnalysis], out_file) -> None:
         'Apex x-coordinate (px)',
         'Apex y-coordinate (px)',
         'Needle width (px)',
+        *(
+            '{} {} time (s)'.format(label, clock)
+            for _, label, _ in _TIMED_STAGES
+            for clock in ('wall', 'CPU')
+        ),
+        'Levenberg-Marquardt iterations',
+        'Arclength steps exceeded',
+        'ODE solves',
+        'Stop reason',
     ])
 
     for drop in drops:
@@ -368,4 +416,13 @@ def _save_timeline_data(drops: Sequence[IFTDropAnalysis], out_file) -> None:
             format(drop.bn_apex_coords_px.get()[0], '.1f'),
             format(drop.bn_apex_coords_px.get()[1], '.1f'),
             format(drop.bn_needle_width_px.get(), '.1f'),
+            *(
+                format(t, '.3g')
+                for _, _, stage_time in _stage_times(drop)
+                for t in stage_time
+            ),
+            drop.bn_num_iterations.get(),
+            drop.bn_num_arclength_steps_exceeded.get(),
+            drop.bn_num_solves.get(),
+            drop.bn_stop_reason.get(),
         ])
@@ -7,9 +7,11 @@ from opendrop.app.common.image_acquisition import ImageAcquisitionModel
 from opendrop.app.common.image_processing.plugins.preview.model import (
     AcquirerController,
     ImageSequenceAcquirerController,
-    CameraAcquirerController)
+    CameraAcquirerController,
+    FeatureExtractorCache)
 from opendrop.app.ift.analysis import FeatureExtractorParams, FeatureExtractor
-from opendrop.utility.bindable import BoxBindable, Bindable, AccessorBindable
+from opendrop.utility.bindable import BoxBindable, Bindable, AccessorBindable, array_equality_check
+from opendrop.utility.scheduler import PRIORITY_DEFAULT, PRIORITY_FOREGROUND
 
 
 class IFTPreviewPluginModel:
@@ -17,7 +19,7 @@ class IFTPreviewPluginModel:
             self, *,
             image_acquisition: ImageAcquisitionModel,
             feature_extractor_params: FeatureExtractorParams,
-            do_extract_features: Callable[[Bindable[np.ndarray]], FeatureExtractor]
+            do_extract_features: Callable[[Bindable[np.ndarray], Optional[FeatureExtractorParams]], FeatureExtractor]
     ) -> None:
         self._image_acquisition = image_acquisition
         self._feature_extractor_params = feature_extractor_params
@@ -31,10 +33,10 @@ class IFTPreviewPluginModel:
             getter=lambda: self._acquirer_controller
         )
 
-        self.bn_source_image = BoxBindable(None)  # type: Bindable[Optional[np.ndarray]]
-        self.bn_edge_detection = BoxBindable(None)  # type: Bindable[Optional[np.ndarray]]
-        self.bn_drop_profile = BoxBindable(None)  # type: Bindable[Optional[np.ndarray]]
-        self.bn_needle_profile = BoxBindable(None)  # type: Bindable[Optional[Tuple[np.ndarray, np.ndarray]]]
+        self.bn_source_image = BoxBindable(None, check_equals=array_equality_check)  # type: Bindable[Optional[np.ndarray]]
+        self.bn_edge_detection = BoxBindable(None, check_equals=array_equality_check)  # type: Bindable[Optional[np.ndarray]]
+        self.bn_drop_profile = BoxBindable(None, check_equals=array_equality_check)  # type: Bindable[Optional[np.ndarray]]
+        self.bn_needle_profile = BoxBindable(None, check_equals=array_equality_check)  # type: Bindable[Optional[Tuple[np.ndarray, np.ndarray]]]
 
         self._image_acquisition.bn_acquirer.on_changed.connect(
             self._update_acquirer_controller,
@@ -59,6 +61,7 @@ class IFTPreviewPluginModel:
         if isinstance(new_acquirer, ImageSequenceAcquirer):
             new_acquirer_controller = IFTImageSequenceAcquirerController(
                 acquirer=new_acquirer,
+                feature_extractor_params=self._feature_extractor_params,
                 do_extract_features=self._do_extract_features,
                 source_image_out=self.bn_source_image,
                 edge_detection_out=self.bn_edge_detection,
@@ -99,42 +102,77 @@ class IFTImageSequenceAcquirerController(ImageSequenceAcquirerController):
     def __init__(
             self, *,
             acquirer: ImageSequenceAcquirer,
-            do_extract_features: Callable[[Bindable[np.ndarray]], FeatureExtractor],
+            feature_extractor_params: FeatureExtractorParams,
+            do_extract_features: Callable[[Bindable[np.ndarray], Optional[FeatureExtractorParams]], FeatureExtractor],
             source_image_out: Bindable[Optional[np.ndarray]],
             edge_detection_out: Bindable[Optional[np.ndarray]],
             drop_profile_out: Bindable[Optional[np.ndarray]],
             needle_profile_out: Bindable[Optional[Tuple[np.ndarray, np.ndarray]]]
     ) -> None:
+        self._feature_extractor_params = feature_extractor_params
         self._do_extract_features = do_extract_features
 
         self._edge_detection_out = edge_detection_out
         self._drop_profile_out = drop_profile_out
         self._needle_profile_out = needle_profile_out
 
-        self._extracted_features = {}
+        # Extractors are given their own copy of the parameters, which is only kept up to date for the image being
+        # shown. Changing the parameters then only reruns extraction for that image, and other images are brought up
+        # to date when they are shown again.
+        self._extracted_features = FeatureExtractorCache(
+            create=lambda image: self._do_extract_features(image, self._feature_extractor_params.copy()),
+        )
 
+        self._showing_image = None  # type: Optional[np.ndarray]
         self._showing_extracted_feature = None  # type: Optional[FeatureExtractor]
         self._sef_cleanup_tasks = []
 
+        self.__event_connections = [
+            bn.on_changed.connect(self._update_showing_extracted_feature)
+            for bn in (
+                feature_extractor_params.bn_drop_region_px,
+                feature_extractor_params.bn_needle_region_px,
+                feature_extractor_params.bn_canny_min,
+                feature_extractor_params.bn_canny_max,
+            )
+        ]
+
         super().__init__(
             acquirer=acquirer,
             source_image_out=source_image_out,
         )
 
-    def _on_image_registered(self, image_id: Hashable, image: np.ndarray) -> None:
-        extracted_feature = self._do_extract_features(BoxBindable(image))
-        self._extracted_features[image_id] = extracted_feature
-
     def _on_image_deregistered(self, image_id: Hashable) -> None:
-        del self._extracted_features[image_id]
+        self._extracted_features.discard(image_id)
+
+    def _on_image_changed(self, image_id: Hashable, image: np.ndarray) -> None:
+        self._showing_image = image
+        self._update_showing_extracted_feature()
+
+    def _on_image_prefetch(self, image_id: Hashable, read_image: Callable[[], np.ndarray]) -> None:
+        self._extracted_features.prefetch(image_id, read_image)
+
+    def _update_showing_extracted_feature(self) -> None:
+        if self._showing_image is None:
+            return
+
+        extracted_feature = self._extracted_features.get(self._showing_image_id, self._showing_image)
+        extracted_feature.params.update(self._feature_extractor_params)
+
+        if extracted_feature is self._showing_extracted_feature:
+            return
 
-    def _on_image_changed(self, image_id: Hashable) -> None:
-        extracted_feature = self._extracted_features[image_id]
         self._set_showing_extracted_feature(extracted_feature)
 
     def _set_showing_extracted_feature(self, extracted_feature: Optional[FeatureExtractor]) -> None:
         self._unbind_showing_extracted_feature()
 
+        # Extract features of the image being shown before any others.
+        if self._showing_extracted_feature is not None:
+            self._showing_extracted_feature.priority = PRIORITY_DEFAULT
+        if extracted_feature is not None:
+            extracted_feature.priority = PRIORITY_FOREGROUND
+
         self._showing_extracted_feature = extracted_feature
 
         if extracted_feature is None:
@@ -169,9 +207,13 @@ class IFTImageSequenceAcquirerController(ImageSequenceAcquirerController):
         self._sef_cleanup_tasks.clear()
 
     def destroy(self) -> None:
+        for ec in self.__event_connections:
+            ec.disconnect()
+
         super().destroy()
         self._set_showing_extracted_feature(None)
         self._extracted_features.clear()
+        self._showing_image = None
 
 
 class IFTCameraAcquirerController(CameraAcquirerController):
@@ -202,6 +244,8 @@ class IFTCameraAcquirerController(CameraAcquirerController):
         self._unbind_extracted_feature()
 
         new_extracted_feature = self._do_extract_features(self._source_image_out)
+        # The live preview is always being shown.
+        new_extracted_feature.priority = PRIORITY_FOREGROUND
         self._extracted_feature = new_extracted_feature
 
         self._bind_extracted_feature()
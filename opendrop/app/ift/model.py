@@ -1,17 +1,20 @@
 import asyncio
-from typing import Sequence, Callable, Any
+import functools
+from typing import Sequence, Callable, Any, Optional
 
 import numpy as np
 
 from opendrop.app.common.image_acquisition import ImageAcquisitionModel, AcquirerType
 from opendrop.app.ift.analysis_saver import IFTAnalysisSaverOptions
 from opendrop.app.ift.analysis_saver.save_functions import save_drops
+from opendrop.processing.ift.young_laplace import YoungLaplaceFitPool
 from opendrop.utility.bindable import Bindable, BoxBindable
 from .analysis import (
     IFTDropAnalysis,
     FeatureExtractor,
     FeatureExtractorParams,
     YoungLaplaceFitter,
+    YoungLaplaceFitSequence,
     PhysicalPropertiesCalculator,
     PhysicalPropertiesCalculatorParams,
 )
@@ -21,11 +24,15 @@ from .results import IFTResultsModel
 
 
 class IFTSession:
-    def __init__(self, do_exit: Callable[[], Any], *, loop: asyncio.AbstractEventLoop) -> None:
+    def __init__(self, do_exit: Callable[[], Any], *, fit_pool: Optional[YoungLaplaceFitPool] = None,
+                 loop: asyncio.AbstractEventLoop) -> None:
         self._loop = loop
 
         self._do_exit = do_exit
 
+        # Young-Laplace fits are run in the worker processes of `fit_pool` if given, otherwise on threads.
+        self._fit_pool = fit_pool
+
         self._feature_extractor_params = FeatureExtractorParams()
         self._physprops_calculator_params = PhysicalPropertiesCalculatorParams()
 
@@ -59,11 +66,20 @@ class IFTSession:
         new_analyses = []
 
         input_images = self.image_acquisition.acquire_images()
-        for input_image in input_images:
+
+        # Consecutive frames are fitted as a sequence, each fit is warm started from the nearest finished frame. With a
+        # pool, the frames are submitted to it together as one batch, instead of one job each.
+        fit_sequence = YoungLaplaceFitSequence(pool=self._fit_pool, batch_size=len(input_images))
+
+        for i, input_image in enumerate(input_images):
             new_analysis = IFTDropAnalysis(
                 input_image=input_image,
                 do_extract_features=self.extract_features,
-                do_young_laplace_fit=self.young_laplace_fit,
+                do_young_laplace_fit=functools.partial(
+                    self.young_laplace_fit,
+                    sequence=fit_sequence,
+                    sequence_index=i,
+                ),
                 do_calculate_physprops=self.calculate_physprops
             )
 
@@ -111,16 +127,25 @@ class IFTSession:
 
             return True
 
-    def extract_features(self, image: Bindable[np.ndarray]) -> FeatureExtractor:
+    def extract_features(self, image: Bindable[np.ndarray], params: Optional[FeatureExtractorParams] = None) \
+            -> FeatureExtractor:
         return FeatureExtractor(
             image=image,
-            params=self._feature_extractor_params,
+            params=params if params is not None else self._feature_extractor_params,
             loop=self._loop,
         )
 
-    def young_laplace_fit(self, extracted_features: FeatureExtractor) -> YoungLaplaceFitter:
+    def young_laplace_fit(
+            self,
+            extracted_features: FeatureExtractor,
+            sequence: Optional[YoungLaplaceFitSequence] = None,
+            sequence_index: int = 0,
+    ) -> YoungLaplaceFitter:
         return YoungLaplaceFitter(
             features=extracted_features,
+            sequence=sequence,
+            sequence_index=sequence_index,
+            pool=self._fit_pool,
             loop=self._loop
         )
 
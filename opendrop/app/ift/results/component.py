@@ -6,7 +6,8 @@ from gi.repository import Gtk
 
 from opendrop.app.common.footer.results import results_footer_cs, ResultsFooterStatus
 from opendrop.app.common.wizard import WizardPageControls
-from opendrop.app.ift.analysis_saver import IFTAnalysisSaverOptions, ift_save_dialog_cs
+from opendrop.app.ift.analysis_saver import IFTAnalysisSaverOptions
+from opendrop.app.ift.analysis_saver.component import ift_save_dialog_cs
 from opendrop.app.ift.results.graphs import graphs_cs
 from opendrop.app.ift.results.individual.component import individual_cs
 from opendrop.mvp import ComponentSymbol, View, Presenter
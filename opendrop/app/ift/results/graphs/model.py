@@ -1,8 +1,9 @@
-import math
+import functools
 from typing import Sequence
 
 from opendrop.app.ift.analysis import IFTDropAnalysis
-from opendrop.utility.bindable import Bindable, BoxBindable
+from opendrop.utility.bindable import Bindable, AccessorBindable
+from opendrop.utility.timeseries import TimeSeries
 
 
 class GraphsModel:
@@ -12,9 +13,15 @@ class GraphsModel:
         self._tracked_analyses = []
         self._tracked_analysis_unbind_tasks = {}
 
-        self.bn_ift_data = BoxBindable((tuple(), tuple()))
-        self.bn_volume_data = BoxBindable((tuple(), tuple()))
-        self.bn_surface_area_data = BoxBindable((tuple(), tuple()))
+        # Each series is kept sorted and only the points of the analysis that changed are updated, instead of
+        # rebuilding every series from all the analyses whenever one of them changes.
+        self._ift_series = TimeSeries()
+        self._volume_series = TimeSeries()
+        self._surface_area_series = TimeSeries()
+
+        self.bn_ift_data = AccessorBindable(getter=self._ift_series.get_data)
+        self.bn_volume_data = AccessorBindable(getter=self._volume_series.get_data)
+        self.bn_surface_area_data = AccessorBindable(getter=self._surface_area_series.get_data)
 
         self._bn_analyses.on_changed.connect(
             self._hdl_analyses_changed
@@ -37,16 +44,13 @@ class GraphsModel:
     def _track_analysis(self, analysis: IFTDropAnalysis) -> None:
         unbind_tasks = []
 
+        hdl_data_changed = functools.partial(self._hdl_tracked_analysis_data_changed, analysis)
+
         event_connections = [
-            analysis.bn_interfacial_tension.on_changed.connect(
-                self._hdl_tracked_analysis_data_changed
-            ),
-            analysis.bn_volume.on_changed.connect(
-                self._hdl_tracked_analysis_data_changed
-            ),
-            analysis.bn_surface_area.on_changed.connect(
-                self._hdl_tracked_analysis_data_changed
-            ),
+            analysis.bn_image_timestamp.on_changed.connect(hdl_data_changed, weak_ref=False),
+            analysis.bn_interfacial_tension.on_changed.connect(hdl_data_changed, weak_ref=False),
+            analysis.bn_volume.on_changed.connect(hdl_data_changed, weak_ref=False),
+            analysis.bn_surface_area.on_changed.connect(hdl_data_changed, weak_ref=False),
         ]
 
         unbind_tasks.extend(
@@ -56,7 +60,7 @@ class GraphsModel:
         self._tracked_analyses.append(analysis)
         self._tracked_analysis_unbind_tasks[analysis] = unbind_tasks
 
-        self._hdl_tracked_analysis_data_changed()
+        self._hdl_tracked_analysis_data_changed(analysis)
 
     def _untrack_analysis(self, analysis: IFTDropAnalysis) -> None:
         unbind_tasks = self._tracked_analysis_unbind_tasks[analysis]
@@ -66,49 +70,23 @@ class GraphsModel:
         del self._tracked_analysis_unbind_tasks[analysis]
         self._tracked_analyses.remove(analysis)
 
-    def _hdl_tracked_analysis_data_changed(self) -> None:
-        ift_data = []
-        vol_data = []
-        sur_data = []
-
-        analyses = self._bn_analyses.get()
-
-        for analysis in analyses:
-            timestamp = analysis.bn_image_timestamp.get()
-            if timestamp is None or not math.isfinite(timestamp):
-                continue
-
-            ift_value = analysis.bn_interfacial_tension.get()
-            vol_value = analysis.bn_volume.get()
-            sur_value = analysis.bn_surface_area.get()
-
-            if ift_value is not None and math.isfinite(ift_value):
-                ift_data.append((timestamp, ift_value))
-
-            if vol_value is not None and math.isfinite(vol_value):
-                vol_data.append((timestamp, vol_value))
-
-            if sur_value is not None and math.isfinite(sur_value):
-                sur_data.append((timestamp, sur_value))
+        if self._ift_series.discard(analysis):
+            self.bn_ift_data.poke()
 
-        # Sort in ascending order of timestamp
-        ift_data = sorted(ift_data, key=lambda x: x[0])
-        vol_data = sorted(vol_data, key=lambda x: x[0])
-        sur_data = sorted(sur_data, key=lambda x: x[0])
+        if self._volume_series.discard(analysis):
+            self.bn_volume_data.poke()
 
-        ift_data = tuple(zip(*ift_data))
-        vol_data = tuple(zip(*vol_data))
-        sur_data = tuple(zip(*sur_data))
+        if self._surface_area_series.discard(analysis):
+            self.bn_surface_area_data.poke()
 
-        if len(ift_data) == 0:
-            ift_data = (tuple(), tuple())
+    def _hdl_tracked_analysis_data_changed(self, analysis: IFTDropAnalysis) -> None:
+        timestamp = analysis.bn_image_timestamp.get()
 
-        if len(vol_data) == 0:
-            vol_data = (tuple(), tuple())
+        if self._ift_series.set(analysis, timestamp, analysis.bn_interfacial_tension.get()):
+            self.bn_ift_data.poke()
 
-        if len(sur_data) == 0:
-            sur_data = (tuple(), tuple())
+        if self._volume_series.set(analysis, timestamp, analysis.bn_volume.get()):
+            self.bn_volume_data.poke()
 
-        self.bn_ift_data.set(ift_data)
-        self.bn_volume_data.set(vol_data)
-        self.bn_surface_area_data.set(sur_data)
+        if self._surface_area_series.set(analysis, timestamp, analysis.bn_surface_area.get()):
+            self.bn_surface_area_data.poke()
@@ -7,7 +7,7 @@ from opendrop.app.ift.analysis import IFTDropAnalysis
 from opendrop.app.ift.results.individual.detail.log_view import log_cs
 from opendrop.app.ift.results.individual.detail.residuals import residuals_plot_cs
 from opendrop.mvp import ComponentSymbol, View, Presenter
-from opendrop.utility.bindable import Bindable, BoxBindable
+from opendrop.utility.bindable import Bindable, BoxBindable, array_equality_check
 from .parameters import parameters_cs
 from .profile_fit import drop_fit_cs
 
@@ -103,11 +103,11 @@ class DetailPresenter(Presenter['DetailView']):
         self.bn_apex_coords = BoxBindable((math.nan, math.nan))
         self.bn_image_angle = BoxBindable(math.nan)
 
-        self.bn_drop_image = BoxBindable(None)
-        self.bn_drop_profile_extract = BoxBindable(None)
-        self.bn_drop_profile_fit = BoxBindable(None)
+        self.bn_drop_image = BoxBindable(None, check_equals=array_equality_check)
+        self.bn_drop_profile_extract = BoxBindable(None, check_equals=array_equality_check)
+        self.bn_drop_profile_fit = BoxBindable(None, check_equals=array_equality_check)
 
-        self.bn_residuals = BoxBindable(None)
+        self.bn_residuals = BoxBindable(None, check_equals=array_equality_check)
 
         self.bn_log_text = BoxBindable('')
 
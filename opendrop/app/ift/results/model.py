@@ -5,6 +5,7 @@ from typing import Optional, Sequence, Callable, Any
 from opendrop.app.ift.analysis import IFTDropAnalysis
 from opendrop.app.ift.analysis_saver import IFTAnalysisSaverOptions
 from opendrop.utility.bindable import Bindable, BoxBindable, AccessorBindable
+from opendrop.utility.scheduler import PRIORITY_DEFAULT, PRIORITY_FOREGROUND
 from .graphs import GraphsModel
 from .individual.model import IndividualModel
 
@@ -32,6 +33,7 @@ class IFTResultsModel:
         self._check_if_safe_to_discard = check_if_safe_to_discard
 
         self.bn_selection = BoxBindable(None)  # type: Bindable[Optional[IFTDropAnalysis]]
+        self._prioritised_selection = None  # type: Optional[IFTDropAnalysis]
 
         self.individual = IndividualModel(
             in_analyses=self.bn_analyses,
@@ -51,6 +53,20 @@ class IFTResultsModel:
         self.bn_analyses_completion_progress = AccessorBindable(getter=self._get_analyses_completion_progress)
 
         self.bn_analyses.on_changed.connect(self._hdl_analyses_changed)
+        self.bn_selection.on_changed.connect(self._hdl_selection_changed)
+
+    def _hdl_selection_changed(self) -> None:
+        # Finish the drop being looked at before the others, and show its progress in detail.
+        if self._prioritised_selection is not None:
+            self._prioritised_selection.priority = PRIORITY_DEFAULT
+            self._prioritised_selection.is_viewed = False
+
+        selection = self.bn_selection.get()
+        if selection is not None:
+            selection.priority = PRIORITY_FOREGROUND
+            selection.is_viewed = True
+
+        self._prioritised_selection = selection
 
     def _hdl_analyses_changed(self) -> None:
         analyses = self.bn_analyses.get()
@@ -1,9 +1,10 @@
 import asyncio
 from enum import Enum
 
+from opendrop.processing.ift.young_laplace import YoungLaplaceFitPool
 from opendrop.utility.bindable import BoxBindable
 from .conan import ConanSession
-from .ift import IFTSession
+from .ift.model import IFTSession
 from .main_menu import MainMenuModel
 
 
@@ -11,6 +12,10 @@ class AppRootModel:
     def __init__(self, *, loop: asyncio.AbstractEventLoop) -> None:
         self._loop = loop
 
+        # Worker processes for Young-Laplace fitting, shared by all IFT sessions. Processes are only started once the
+        # first fit is submitted.
+        self._ift_fit_pool = YoungLaplaceFitPool()
+
         self.bn_mode = BoxBindable(AppMode.MAIN_MENU)
 
         self.main_menu = MainMenuModel(
@@ -30,6 +35,7 @@ class AppRootModel:
             do_exit=(
                 lambda: self.bn_mode.set(AppMode.MAIN_MENU)
             ),
+            fit_pool=self._ift_fit_pool,
             loop=self._loop,
         )
 
@@ -45,6 +51,9 @@ class AppRootModel:
 
         return session
 
+    def destroy(self) -> None:
+        self._ift_fit_pool.shutdown()
+
 
 class AppMode(Enum):
     QUIT = -1
@@ -0,0 +1,25 @@
+"""Command line entry point for analysing images without the user interface, e.g. on servers with no display.
+
+    opendrop-batch ift --help
+"""
+
+import argparse
+from typing import Optional, Sequence
+
+from . import ift
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog='opendrop-batch',
+        description='Analyse images without the user interface.',
+    )
+
+    subparsers = parser.add_subparsers(dest='command', metavar='COMMAND')
+    subparsers.required = True
+
+    ift.add_parser(subparsers)
+
+    args = parser.parse_args(argv)
+
+    return args.func(args)
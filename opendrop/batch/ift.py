@@ -0,0 +1,297 @@
+"""Batch pendant drop analysis, runs the same feature extraction, Young-Laplace fitting and physical properties
+calculation as the IFT wizard and saves the results in the same format, e.g.
+
+    opendrop-batch ift 'frames/*.png' --drop-region 100,50,500,400 --needle-region 250,0,350,40 \\
+        --inner-density 1000 --outer-density 1.2 --needle-width 0.00072 --frame-interval 5 --output results/drop
+"""
+
+import argparse
+import asyncio
+import functools
+import glob
+import math
+import sys
+from pathlib import Path
+from typing import Any, Callable, List, MutableSequence, Optional, Sequence, Union
+
+from opendrop.app.common.image_acquirer import InputImage, LocalStorageAcquirer
+from opendrop.app.ift.analysis import (
+    IFTDropAnalysis,
+    FeatureExtractor,
+    FeatureExtractorParams,
+    YoungLaplaceFitter,
+    YoungLaplaceFitSequence,
+    PhysicalPropertiesCalculator,
+    PhysicalPropertiesCalculatorParams,
+)
+from opendrop.app.ift.analysis_saver.model import IFTAnalysisSaverOptions
+from opendrop.app.ift.analysis_saver.save_functions import save_drops
+from opendrop.processing.ift.young_laplace import YoungLaplaceFitPool
+from opendrop.utility.bindable import Bindable
+from opendrop.utility.geometry import Rect2
+
+STANDARD_GRAVITY = 9.80665
+
+# Number of drops analysed at once per fitting process. Analyses keep their images in memory, so drops are started in
+# batches rather than all at once.
+DROPS_PER_WORKER = 4
+
+
+def add_parser(subparsers) -> None:
+    parser = subparsers.add_parser(
+        'ift',
+        help='Interfacial tension analysis of pendant drop images.',
+        description='Interfacial tension analysis of pendant drop images.',
+    )
+
+    parser.add_argument('inputs', nargs='+', metavar='INPUT',
+                        help='image file, directory of images or glob pattern (images are analysed in lexicographic '
+                             'order of their paths)')
+    parser.add_argument('-o', '--output', type=Path, required=True,
+                        help='directory to save results to, the name of the directory is also used as the prefix of '
+                             'the individual drop directories')
+    parser.add_argument('--overwrite', action='store_true',
+                        help='clear the output directory if it is not empty')
+
+    group = parser.add_argument_group('image processing')
+    group.add_argument('--drop-region', type=parse_region, required=True, metavar='X0,Y0,X1,Y1',
+                       help='drop region in pixels')
+    group.add_argument('--needle-region', type=parse_region, required=True, metavar='X0,Y0,X1,Y1',
+                       help='needle region in pixels')
+    group.add_argument('--canny-min', type=int, default=30, help='lower Canny edge detection threshold')
+    group.add_argument('--canny-max', type=int, default=60, help='upper Canny edge detection threshold')
+
+    group = parser.add_argument_group('physical parameters (SI units)')
+    group.add_argument('--inner-density', type=float, required=True, help='density of the drop (kg/m³)')
+    group.add_argument('--outer-density', type=float, required=True, help='density of the continuous phase (kg/m³)')
+    group.add_argument('--needle-width', type=float, required=True, help='needle diameter (m)')
+    group.add_argument('--gravity', type=float, default=STANDARD_GRAVITY, help='gravitational acceleration (m/s²)')
+    group.add_argument('--frame-interval', type=float, default=None,
+                       help='time between frames (s), required if there is more than one image')
+
+    group = parser.add_argument_group('execution')
+    group.add_argument('-j', '--workers', type=int, default=None,
+                       help='number of fitting processes (default: number of CPUs)')
+    group.add_argument('--no-figures', action='store_true', help="don't save plots")
+
+    parser.set_defaults(func=run)
+
+
+def parse_region(text: str) -> Rect2[int]:
+    try:
+        x0, y0, x1, y1 = map(int, text.split(','))
+    except ValueError:
+        raise argparse.ArgumentTypeError("Expected 'X0,Y0,X1,Y1', got '{}'".format(text))
+
+    return Rect2(x0=x0, y0=y0, x1=x1, y1=y1)
+
+
+def resolve_inputs(inputs: Sequence[str]) -> List[Path]:
+    """Return the image paths given by `inputs` (files, directories or glob patterns), sorted and without
+    duplicates."""
+    paths = set()
+
+    for pattern in inputs:
+        path = Path(pattern)
+        if path.is_dir():
+            paths.update(p for p in path.iterdir() if p.is_file())
+        elif glob.has_magic(pattern):
+            paths.update(Path(p) for p in glob.glob(pattern) if Path(p).is_file())
+        elif path.is_file():
+            paths.add(path)
+        else:
+            raise FileNotFoundError("No such file or directory: '{}'".format(pattern))
+
+    return sorted(paths)
+
+
+def run(args: argparse.Namespace) -> int:
+    try:
+        image_paths = resolve_inputs(args.inputs)
+    except FileNotFoundError as exc:
+        print(exc, file=sys.stderr)
+        return 2
+
+    if not image_paths:
+        print('No images found.', file=sys.stderr)
+        return 2
+
+    if len(image_paths) > 1 and not (args.frame_interval is not None and args.frame_interval > 0):
+        print('--frame-interval must be given and positive when analysing more than one image.', file=sys.stderr)
+        return 2
+
+    output = args.output.resolve()
+    if output.exists() and (not output.is_dir() or (any(output.iterdir()) and not args.overwrite)):
+        print("Output directory '{}' is not empty, use --overwrite to clear it.".format(output), file=sys.stderr)
+        return 2
+
+    analyses = analyse(
+        image_paths,
+        drop_region=args.drop_region,
+        needle_region=args.needle_region,
+        canny_min=args.canny_min,
+        canny_max=args.canny_max,
+        inner_density=args.inner_density,
+        outer_density=args.outer_density,
+        needle_width=args.needle_width,
+        gravity=args.gravity,
+        frame_interval=args.frame_interval,
+        max_workers=args.workers,
+        on_progress=_print_progress,
+    )
+
+    save(analyses, output, save_figures=not args.no_figures)
+
+    num_failed = sum(not math.isfinite(analysis.bn_interfacial_tension.get()) for analysis in analyses)
+    if num_failed:
+        print('{} of {} drops could not be analysed.'.format(num_failed, len(analyses)), file=sys.stderr)
+        return 1
+
+    return 0
+
+
+def _print_progress(num_done: int, num_total: int) -> None:
+    print('Analysed {}/{} drops'.format(num_done, num_total), file=sys.stderr)
+
+
+def analyse(image_paths: Sequence[Union[Path, str]], *, drop_region: Rect2[int], needle_region: Rect2[int],
+            canny_min: int, canny_max: int, inner_density: float, outer_density: float, needle_width: float,
+            gravity: float = STANDARD_GRAVITY, frame_interval: Optional[float] = None,
+            max_workers: Optional[int] = None,
+            on_progress: Optional[Callable[[int, int], Any]] = None) -> Sequence[IFTDropAnalysis]:
+    """Analyse the images at `image_paths` and return the finished analyses, in the same order as the (sorted)
+    paths."""
+    feature_extractor_params = FeatureExtractorParams()
+    feature_extractor_params.bn_drop_region_px.set(drop_region)
+    feature_extractor_params.bn_needle_region_px.set(needle_region)
+    feature_extractor_params.bn_canny_min.set(canny_min)
+    feature_extractor_params.bn_canny_max.set(canny_max)
+
+    physprops_calculator_params = PhysicalPropertiesCalculatorParams()
+    physprops_calculator_params.bn_inner_density.set(inner_density)
+    physprops_calculator_params.bn_outer_density.set(outer_density)
+    physprops_calculator_params.bn_needle_width.set(needle_width)
+    physprops_calculator_params.bn_gravity.set(gravity)
+
+    acquirer = LocalStorageAcquirer()
+    acquirer.load_image_paths(image_paths)
+    acquirer.bn_frame_interval.set(frame_interval)
+    input_images = acquirer.acquire_images()
+
+    fit_pool = YoungLaplaceFitPool(max_workers=max_workers)
+    batch_size = DROPS_PER_WORKER * fit_pool.max_workers
+
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+
+    try:
+        pipeline = _Pipeline(
+            feature_extractor_params=feature_extractor_params,
+            physprops_calculator_params=physprops_calculator_params,
+            fit_pool=fit_pool,
+            fit_sequence=YoungLaplaceFitSequence(pool=fit_pool, batch_size=batch_size),
+            loop=loop,
+        )
+
+        analyses = []  # type: MutableSequence[IFTDropAnalysis]
+        for start in range(0, len(input_images), batch_size):
+            batch = loop.run_until_complete(
+                pipeline.analyse(input_images[start:start + batch_size], first_index=start)
+            )
+            analyses.extend(batch)
+
+            if on_progress is not None:
+                on_progress(len(analyses), len(input_images))
+    finally:
+        fit_pool.shutdown()
+        asyncio.set_event_loop(None)
+        loop.close()
+
+    return analyses
+
+
+def save(analyses: Sequence[IFTDropAnalysis], output: Path, *, save_figures: bool = True) -> None:
+    options = IFTAnalysisSaverOptions()
+    options.bn_save_dir_parent.set(output.parent)
+    options.bn_save_dir_name.set(output.name)
+
+    for figure_opts in (options.drop_residuals_figure_opts, options.ift_figure_opts, options.volume_figure_opts,
+                        options.surface_area_figure_opts):
+        figure_opts.bn_should_save.set(save_figures)
+
+    save_drops(analyses, options)
+
+
+class _Pipeline:
+    """Creates analyses the same way as `IFTSession`, and keeps track of their stages so they can be waited on."""
+
+    def __init__(self, *, feature_extractor_params: FeatureExtractorParams,
+                 physprops_calculator_params: PhysicalPropertiesCalculatorParams, fit_pool: YoungLaplaceFitPool,
+                 fit_sequence: YoungLaplaceFitSequence, loop: asyncio.AbstractEventLoop) -> None:
+        self._feature_extractor_params = feature_extractor_params
+        self._physprops_calculator_params = physprops_calculator_params
+        self._fit_pool = fit_pool
+        self._fit_sequence = fit_sequence
+        self._loop = loop
+
+    async def analyse(self, input_images: Sequence[InputImage], first_index: int) -> Sequence[IFTDropAnalysis]:
+        feature_extractors = []  # type: MutableSequence[FeatureExtractor]
+        young_laplace_fitters = []  # type: MutableSequence[YoungLaplaceFitter]
+
+        def extract_features(image: Bindable) -> FeatureExtractor:
+            feature_extractor = self._extract_features(image)
+            feature_extractors.append(feature_extractor)
+            return feature_extractor
+
+        def young_laplace_fit(features: FeatureExtractor, sequence_index: int) -> YoungLaplaceFitter:
+            young_laplace_fitter = self._young_laplace_fit(features, sequence_index)
+            young_laplace_fitters.append(young_laplace_fitter)
+            return young_laplace_fitter
+
+        analyses = [
+            IFTDropAnalysis(
+                input_image=input_image,
+                do_extract_features=extract_features,
+                do_young_laplace_fit=functools.partial(young_laplace_fit, sequence_index=first_index + i),
+                do_calculate_physprops=self._calculate_physprops,
+            )
+            for i, input_image in enumerate(input_images)
+        ]
+
+        # Wait for the images to be read, the rest of the pipeline is created once an analysis has its image.
+        for analysis in analyses:
+            while analysis.bn_status.get() is IFTDropAnalysis.Status.WAITING_FOR_IMAGE:
+                await analysis.bn_status.on_changed.wait()
+
+        # A fitter starts working once features have been extracted, so wait for extraction to finish first.
+        for feature_extractor in feature_extractors:
+            await feature_extractor.wait_until_not_busy()
+
+        for young_laplace_fitter in young_laplace_fitters:
+            await young_laplace_fitter.wait_until_not_busy()
+
+        return analyses
+
+    def _extract_features(self, image: Bindable) -> FeatureExtractor:
+        return FeatureExtractor(
+            image=image,
+            params=self._feature_extractor_params,
+            loop=self._loop,
+        )
+
+    def _young_laplace_fit(self, extracted_features: FeatureExtractor, sequence_index: int) -> YoungLaplaceFitter:
+        return YoungLaplaceFitter(
+            features=extracted_features,
+            sequence=self._fit_sequence,
+            sequence_index=sequence_index,
+            pool=self._fit_pool,
+            loop=self._loop,
+        )
+
+    def _calculate_physprops(self, extracted_features: FeatureExtractor, young_laplace_fit: YoungLaplaceFitter) \
+            -> PhysicalPropertiesCalculator:
+        return PhysicalPropertiesCalculator(
+            features=extracted_features,
+            young_laplace_fit=young_laplace_fit,
+            params=self._physprops_calculator_params,
+        )
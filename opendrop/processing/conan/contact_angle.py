@@ -1,5 +1,5 @@
 import math
-from typing import Sequence, Tuple
+from typing import Optional, Sequence, Tuple
 
 import cv2
 import numpy as np
@@ -97,10 +97,11 @@ class ContactAngle:
         if len(drop_profile) == 0:
             raise self.NotEnoughDropPoints('Insufficient drop profile points')
 
-        drop_contour_length = cv2.arcLength(drop_profile, closed=False)
+        arclength = _cumulative_arclength(drop_profile)
+        drop_contour_length = arclength[-1]
 
         # Extract two halves of the contour.
-        half_mask = _subarc_of_curve_mask(drop_profile, length=0.5 * drop_contour_length)
+        half_mask = _subarc_of_curve_mask(drop_profile, length=0.5 * drop_contour_length, arclength=arclength)
         half0 = drop_profile[half_mask]
         half1 = drop_profile[~half_mask]
 
@@ -141,7 +142,19 @@ class ContactAngle:
 
 # Helper functions
 
-def _subarc_of_curve_mask(curve: np.ndarray, length: float) -> np.ndarray:
+def _cumulative_arclength(curve: np.ndarray) -> np.ndarray:
+    """Return the arc length of `curve` from its first point up to each of its points."""
+    arclength = np.zeros(len(curve))
+    if len(curve) > 1:
+        np.cumsum(np.hypot(*np.diff(curve, axis=0).T), out=arclength[1:])
+
+    return arclength
+
+
+def _subarc_of_curve_mask(curve: np.ndarray, length: float, arclength: Optional[np.ndarray] = None) -> np.ndarray:
+    """Return a mask of the shortest subarc from the start of `curve` (at least two points long) that is at least
+    `length` long, or the whole curve if it is shorter than `length`. `arclength` is the cumulative arc length of
+    `curve`, if already known."""
     mask = np.zeros(len(curve), dtype=bool)
     if len(curve) == 0:
         return mask
@@ -149,15 +162,11 @@ def _subarc_of_curve_mask(curve: np.ndarray, length: float) -> np.ndarray:
         mask[0] = True
         return mask
 
-    idx = [0, 1]
-
-    while cv2.arcLength(curve[idx], closed=False) < length:
-        if len(idx) >= len(curve):
-            break
-
-        idx.append(len(idx))
+    if arclength is None:
+        arclength = _cumulative_arclength(curve)
 
-    mask[idx] = True
+    end = max(np.searchsorted(arclength, length, side='left'), 1)
+    mask[:end + 1] = True
 
     return mask
 
@@ -1,4 +1,4 @@
-from .extract import apply_edge_detection, extract_drop_profile, extract_needle_profile
-from .needle_width import calculate_width_from_needle_profile
+from .extract import apply_edge_detection, edge_detection_margin, extract_drop_profile, extract_needle_profile
+from .needle_width import calculate_width_from_needle_profile, NeedleCache, needle_cache
 from .physprops import calculate_ift, calculate_worthington
 from .young_laplace import YoungLaplaceFit
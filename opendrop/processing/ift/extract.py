@@ -8,8 +8,6 @@ from opendrop.utility import mycv
 
 def apply_edge_detection(image: np.ndarray, gaussian_size: int = 3, canny_min: int = 30, canny_max: int = 60) \
         -> np.ndarray:
-    image = image.copy()
-
     if len(image.shape) == 2:
         pass  # Do nothing, we need the image to be grayscale
     elif len(image.shape) == 3 and image.shape[-1] == 3:
@@ -23,9 +21,14 @@ def apply_edge_detection(image: np.ndarray, gaussian_size: int = 3, canny_min: i
     return image
 
 
-def extract_drop_profile(image: np.ndarray) -> np.ndarray:
-    image = image.copy()
+def edge_detection_margin(gaussian_size: int = 3) -> int:
+    """Return how far, in pixels, the result of `apply_edge_detection()` at a pixel depends on the image around it:
+    the radius of the Gaussian blur, plus one pixel for the Sobel operator and one for non-maximum suppression in
+    Canny. Canny's hysteresis can still link up edges from further away."""
+    return gaussian_size//2 + 2
+
 
+def extract_drop_profile(image: np.ndarray) -> np.ndarray:
     if len(image.shape) == 2:
         pass  # Do nothing, we need the image to be grayscale
     elif len(image.shape) == 3 and image.shape[-1] == 3:
@@ -47,8 +50,6 @@ def extract_drop_profile(image: np.ndarray) -> np.ndarray:
 
 
 def extract_needle_profile(image: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
-    image = image.copy()
-
     if len(image.shape) == 2:
         pass  # Do nothing, we need the image to be grayscale
     elif len(image.shape) == 3 and image.shape[-1] == 3:
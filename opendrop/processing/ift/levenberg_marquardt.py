@@ -0,0 +1,263 @@
+"""Levenberg-Marquardt minimisation of a sum of squared residuals, shared by the Young-Laplace and needle fits.
+
+The damped normal equations are never formed. Each accepted Jacobian is QR factorised once, and the step for any value
+of the damping parameter is then found from a small (2n x n) least squares problem, which is both more stable than
+inverting J.T @ J and lets rejected steps be retried with more damping without evaluating anything again.
+
+Both factorisations are done in place, with the right hand side appended to the matrix as an extra column, so that
+only R is needed (the last column of R is then Q.T times the right hand side) and Q is never formed.
+"""
+
+import math
+from typing import Any, Callable, Optional, Tuple
+
+import numpy as np
+from scipy import linalg as sp_linalg
+
+# Thresholds on the ratio of the actual to the predicted reduction of the objective.
+SLOW_CONVERGENCE_THRESHOLD = 0.25
+FAST_CONVERGENCE_THRESHOLD = 0.75
+
+
+class LevenbergMarquardt:
+    """Minimises the sum of squared residuals r(x), one step at a time so that the caller can report progress, check
+    for cancellation and decide when to stop in between.
+
+    `evaluate(x, residuals_out, jacobian_out)` must fill `residuals_out` (shape (m,)) and `jacobian_out` (shape
+    (m, n)) with r(x) and its Jacobian, and may return anything else worth keeping about x (e.g. the model evaluated
+    at x), which is available as `aux` once x is accepted. If r(x) can't be evaluated it should raise an exception or
+    return with non-finite residuals, and the step is rejected.
+
+    The residual and Jacobian arrays, and the other work arrays, are allocated once, for the lifetime of the minimiser.
+    Each step still allocates a few small arrays (of the order of n x n, where n is the number of parameters), but
+    nothing whose size depends on the number of residuals."""
+
+    def __init__(self, evaluate: Callable[[np.ndarray, np.ndarray, np.ndarray], Any], x0: np.ndarray,
+                 num_residuals: int) -> None:
+        self._evaluate = evaluate
+
+        n = len(x0)
+        m = num_residuals
+
+        if m < n:
+            raise ValueError(
+                "Need at least as many residuals as parameters, got {} residuals for {} parameters"
+                .format(m, n)
+            )
+
+        self._x = np.array(x0, dtype=float)
+        self._x_trial = np.empty(n)
+
+        # Double buffered, evaluating a trial point doesn't overwrite the residuals of the current point. The Jacobian
+        # is the first n columns of an (m, n + 1) array, the last column is for the residuals when it is factorised.
+        self._residuals = np.empty(m)
+        self._jacobian_work = np.empty((m, n + 1), order='F')
+        self._residuals_trial = np.empty(m)
+        self._jacobian_work_trial = np.empty((m, n + 1), order='F')
+
+        # QR factorisation of the current Jacobian, J = QR, and Q.T @ r.
+        self._r_factor = np.empty((n, n))
+        self._qtr = np.empty(n)
+
+        # Gradient of the objective (halved), J.T @ r.
+        self._gradient = np.empty(n)
+
+        # Scaling of the parameters, the norms of the columns of the current Jacobian (so that the damping term is
+        # λ diag(J.T @ J)).
+        self._scale = np.empty(n)
+
+        # Work array for solving the damped least squares problem, [R, Q.T @ r; √λ D, 0].
+        self._augmented = np.empty((2*n, n + 1), order='F')
+
+        # The step from the current point for the current damping, solved for when it is first needed.
+        self._next_delta = None  # type: Optional[np.ndarray]
+
+        self._damping = 0.0
+        self._damping_cutoff = 0.0
+
+        self._ssr = math.inf
+        self._aux = None  # type: Any
+        self._num_evaluations = 0
+
+        self._aux = self._try_evaluate(self._x, self._residuals, self._jacobian_work[:, :n])
+        self._ssr = self._residuals @ self._residuals
+        if not math.isfinite(self._ssr):
+            raise ValueError('Residuals at the initial point are not finite')
+
+        self._factorise()
+
+    def _try_evaluate(self, x: np.ndarray, residuals_out: np.ndarray, jacobian_out: np.ndarray) -> Any:
+        self._num_evaluations += 1
+        return self._evaluate(x, residuals_out, jacobian_out)
+
+    def _factorise(self) -> None:
+        """Factorise [J, r] in place (destroying the Jacobian), keeping R and Q.T @ r."""
+        n = len(self._x)
+
+        work = self._jacobian_work
+        work[:, n] = self._residuals
+        _, r_factor = sp_linalg.qr(work, overwrite_a=True, mode='raw', check_finite=False)
+
+        self._r_factor[:] = r_factor[:n, :n]
+        self._qtr[:] = r_factor[:n, n]
+
+        # J.T @ r = R.T @ Q.T @ r, and Q doesn't change the norms of the columns of J.
+        np.dot(self._r_factor.T, self._qtr, out=self._gradient)
+        self._scale[:] = np.linalg.norm(self._r_factor, axis=0)
+
+    def step(self) -> bool:
+        """Take a step from the current point. Return True if the step was accepted, otherwise the damping is
+        increased and the current point is kept, along with its Jacobian, for the next step. Raises
+        `np.linalg.LinAlgError` if no step can be found (e.g. the Jacobian is rank deficient and there's no damping)."""
+        delta = self.next_delta
+        self._next_delta = None
+
+        np.add(self._x, delta, out=self._x_trial)
+
+        try:
+            aux = self._try_evaluate(self._x_trial, self._residuals_trial, self._jacobian_work_trial[:, :len(delta)])
+            ssr_trial = self._residuals_trial @ self._residuals_trial
+        except (ArithmeticError, ValueError, np.linalg.LinAlgError):
+            aux = None
+            ssr_trial = math.inf
+
+        if not math.isfinite(ssr_trial):
+            ssr_trial = math.inf
+
+        # Reduction in the objective predicted by the linear model, -(2 g.δ + |Jδ|²).
+        r_delta = self._r_factor @ delta
+        predicted = -(2*(self._gradient @ delta) + r_delta @ r_delta)
+        actual = self._ssr - ssr_trial
+
+        self._update_damping(actual, predicted, delta)
+
+        if not ssr_trial < self._ssr:
+            return False
+
+        self._x, self._x_trial = self._x_trial, self._x
+        self._residuals, self._residuals_trial = self._residuals_trial, self._residuals
+        self._jacobian_work, self._jacobian_work_trial = self._jacobian_work_trial, self._jacobian_work
+        self._ssr = ssr_trial
+        self._aux = aux
+
+        self._factorise()
+
+        return True
+
+    @property
+    def next_delta(self) -> np.ndarray:
+        """The step that will be tried next. Available before it is taken (e.g. to tell that the minimiser has
+        converged, once it is small enough), without evaluating anything."""
+        if self._next_delta is None:
+            self._next_delta = self._solve_step()
+
+        return self._next_delta
+
+    def _solve_step(self) -> np.ndarray:
+        """Return the step δ minimising |J δ + r|² + λ|D δ|², where λ is the damping and D the parameter scaling."""
+        n = len(self._x)
+
+        if self._damping == 0:
+            return -sp_linalg.solve_triangular(self._r_factor, self._qtr, check_finite=False)
+
+        # |R δ + Q.T r|² + λ|D δ|² is the least squares problem [R; √λ D] δ = -[Q.T r; 0].
+        augmented = self._augmented
+        augmented[:n, :n] = self._r_factor
+        augmented[:n, n] = self._qtr
+        augmented[n:] = 0
+        augmented[n:, :n][np.diag_indices(n)] = math.sqrt(self._damping) * self._scale
+
+        _, r = sp_linalg.qr(augmented, overwrite_a=True, mode='raw', check_finite=False)
+        return -sp_linalg.solve_triangular(r[:n, :n], r[:n, n], check_finite=False)
+
+    def _update_damping(self, actual: float, predicted: float, delta: np.ndarray) -> None:
+        if predicted > 0:
+            ratio = actual/predicted
+        else:
+            ratio = -math.inf
+
+        if ratio < SLOW_CONVERGENCE_THRESHOLD:
+            directional = delta @ self._gradient
+            if math.isfinite(actual) and directional != 0:
+                nu = 2 - (-actual)/directional
+                nu = min(max(nu, 2), 10)
+            else:
+                nu = 10
+
+            if self._damping == 0:
+                self._damping_cutoff = self._calculate_damping_cutoff()
+                self._damping = self._damping_cutoff
+                nu /= 2
+
+            self._damping *= nu
+        elif ratio > FAST_CONVERGENCE_THRESHOLD:
+            self._damping /= 2
+
+            if 0 < self._damping < self._damping_cutoff:
+                self._damping = 0
+
+    def _calculate_damping_cutoff(self) -> float:
+        """Return 1/|(J.T J)^-1|, the smallest nonzero damping worth using."""
+        n = len(self._x)
+
+        try:
+            r_inv = sp_linalg.solve_triangular(self._r_factor, np.identity(n), check_finite=False)
+        except np.linalg.LinAlgError:
+            return 1.0
+
+        norm = np.linalg.norm(r_inv @ r_inv.T, np.inf)
+        if not (math.isfinite(norm) and norm > 0):
+            return 1.0
+
+        return 1/norm
+
+    @property
+    def x(self) -> np.ndarray:
+        """The current (best) point."""
+        return self._x
+
+    @property
+    def residuals(self) -> np.ndarray:
+        """The residuals at the current point."""
+        return self._residuals
+
+    @property
+    def ssr(self) -> float:
+        """The sum of squared residuals at the current point."""
+        return self._ssr
+
+    @property
+    def gradient(self) -> np.ndarray:
+        """J.T @ r at the current point, half the gradient of the sum of squared residuals."""
+        return self._gradient
+
+    @property
+    def aux(self) -> Any:
+        """Whatever `evaluate` returned for the current point."""
+        return self._aux
+
+    @property
+    def num_evaluations(self) -> int:
+        return self._num_evaluations
+
+
+def minimise(evaluate: Callable[[np.ndarray, np.ndarray, np.ndarray], Any], x0: np.ndarray, num_residuals: int, *,
+             max_steps: int, xtol: float, on_step: Optional[Callable[[LevenbergMarquardt, bool], Any]] = None) \
+        -> Tuple[np.ndarray, int]:
+    """Minimise the sum of squared residuals with `LevenbergMarquardt`, until the next step would change no parameter by
+    more than `xtol` relative to its value, or `max_steps` steps have been taken. Return the best point found and the
+    number of steps taken. Stops early if no step can be found."""
+    lm = LevenbergMarquardt(evaluate, x0, num_residuals)
+
+    step = 0
+    try:
+        while step < max_steps and not (abs(lm.next_delta) <= xtol*abs(lm.x)).all():
+            accepted = lm.step()
+            step += 1
+
+            if on_step is not None:
+                on_step(lm, accepted)
+    except np.linalg.LinAlgError:
+        pass
+
+    return lm.x.copy(), step
@@ -1,12 +1,19 @@
-import itertools
+import hashlib
 import math
-from typing import Tuple
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Tuple
 
 import numpy as np
 
+from .levenberg_marquardt import minimise
+
 NEEDLE_TOL = 1.e-4
 NEEDLE_STEPS = 20
 
+# Number of needle regions remembered by the shared cache.
+NEEDLE_CACHE_SIZE = 64
+
 
 def calculate_width_from_needle_profile(needle_profile: Tuple[np.ndarray, np.ndarray]) -> float:
     """Return the width of the needle defined by `needle_profile`
@@ -53,28 +60,53 @@ def _optimise_needle(needle_profile: Tuple[np.ndarray, np.ndarray]) -> Tuple[flo
 
     assert len(edge0) > 0 and len(edge1) > 0
 
-    # First guess: needle is perfectly vertical and edges are perfectly straight.
-    x0 = edge0[0][0]
-    x1 = edge1[0][0]
+    params = np.array(_initial_needle_guess(edge0, edge1), dtype=float)
 
-    theta = np.pi/2
+    if len(edge0) + len(edge1) < len(params):
+        # Not enough points to determine the edges any better.
+        return tuple(params)
 
-    params = np.array([x0, x1, theta])
+    def evaluate(x: np.ndarray, residuals_out: np.ndarray, jacobian_out: np.ndarray) -> None:
+        residuals_out[:], jacobian_out[:] = _build_resids_jac(needle_profile, *x)
 
-    for step in itertools.count():
-        residuals, jac = _build_resids_jac(needle_profile, *params)
+    params, _ = minimise(evaluate, params, len(edge0) + len(edge1), max_steps=NEEDLE_STEPS, xtol=NEEDLE_TOL)
 
-        jtj = np.dot(jac.T, jac)
-        jte = np.dot(jac.T, residuals)
+    return tuple(params)
 
-        delta = -np.dot(np.linalg.inv(jtj), jte).T
 
-        params += delta
+def _initial_needle_guess(edge0: np.ndarray, edge1: np.ndarray) -> Tuple[float, float, float]:
+    """Return the total least squares fit of two parallel lines through `edge0` and `edge1`, as (x0, x1, theta)."""
+    edge0 = edge0.astype(float)
+    edge1 = edge1.astype(float)
 
-        if (abs(delta/params) < NEEDLE_TOL).all() or step > NEEDLE_STEPS:
-            break
+    centroid0 = edge0.mean(axis=0)
+    centroid1 = edge1.mean(axis=0)
 
-    return tuple(params)
+    # The common direction of the lines is the principal axis of the pooled scatter of the two edges about their own
+    # centroids.
+    centered = np.concatenate((edge0 - centroid0, edge1 - centroid1))
+    scatter = centered.T @ centered
+
+    eigvals, eigvecs = np.linalg.eigh(scatter)
+    if eigvals[-1] <= 0 or eigvals[-1] == eigvals[0]:
+        # Direction is undetermined, guess that the needle is vertical.
+        theta = np.pi/2
+    else:
+        direction = eigvecs[:, -1]
+        theta = math.atan2(direction[1], direction[0]) % np.pi
+
+    sin_theta = math.sin(theta)
+    cos_theta = math.cos(theta)
+
+    if abs(sin_theta) < 1e-12:
+        # Edges are horizontal, so they don't cross y = 0. Fall back to guessing a vertical needle.
+        return centroid0[0], centroid1[0], np.pi/2
+
+    # Each line passes through the centroid of its edge, find where it crosses y = 0.
+    x0 = centroid0[0] - centroid0[1] * cos_theta/sin_theta
+    x1 = centroid1[0] - centroid1[1] * cos_theta/sin_theta
+
+    return x0, x1, theta
 
 
 def _build_resids_jac(needle_profile, x0, x1, theta):
@@ -89,8 +121,10 @@ def _build_resids_jac(needle_profile, x0, x1, theta):
 
     jac = np.zeros((num_points, 3))
 
-    jac[:len(edge0_jac), :2] = edge0_jac
-    jac[len(edge0_jac):, 0] = edge1_jac[:, 0]
+    # Columns are the derivatives with respect to (x0, x1, theta).
+    jac[:len(edge0_jac), 0] = edge0_jac[:, 0]
+    jac[:len(edge0_jac), 2] = edge0_jac[:, 1]
+    jac[len(edge0_jac):, 1] = edge1_jac[:, 0]
     jac[len(edge0_jac):, 2] = edge1_jac[:, 1]
 
     return [residuals, jac]
@@ -100,10 +134,82 @@ def _edge_resids_jac(edge, x0, theta):
     sin_theta = np.sin(theta)
     cos_theta = np.cos(theta)
 
-    residuals = np.array([(point[0] - x0) * sin_theta - point[1] * cos_theta for point in edge])
+    x = edge[:, 0] - x0
+    y = edge[:, 1]
+
+    residuals = x * sin_theta - y * cos_theta
 
-    jac = np.array([
-        [-sin_theta, (point[0] - x0) * cos_theta + point[1] * sin_theta] for point in edge
-    ])
+    jac = np.empty((len(edge), 2))
+    jac[:, 0] = -sin_theta
+    jac[:, 1] = x * cos_theta + y * sin_theta
 
     return [residuals, jac]
+
+
+class NeedleCache:
+    """Thread-safe LRU cache of values calculated from the edge detected needle region of an image (e.g. the needle
+    profile and width), keyed on the content of the region. In a fixed setup the needle doesn't move between frames,
+    so a series of images only needs to calculate these once."""
+
+    def __init__(self, max_entries: int = NEEDLE_CACHE_SIZE) -> None:
+        self._max_entries = max_entries
+
+        self._entries = OrderedDict()  # type: OrderedDict[Hashable, Any]
+
+        self._hits = 0
+        self._misses = 0
+
+        self._lock = threading.Lock()
+
+    def get_or_calculate(self, needle_image: np.ndarray, calculate: Callable[[np.ndarray], Any]) -> Any:
+        """Return the cached value for `needle_image`, or calculate it with `calculate(needle_image)` and insert it
+        into the cache."""
+        key = _image_key(needle_image)
+
+        with self._lock:
+            try:
+                value = self._entries[key]
+            except KeyError:
+                self._misses += 1
+            else:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return value
+
+        # Calculate outside of the lock so other threads aren't held up.
+        value = calculate(needle_image)
+
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._hits = 0
+            self._misses = 0
+
+    @property
+    def hits(self) -> int:
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        return self._misses
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def _image_key(image: np.ndarray) -> Hashable:
+    digest = hashlib.sha1(np.ascontiguousarray(image).data).hexdigest()
+    return image.shape, image.dtype.str, digest
+
+
+# Cache shared by all FeatureExtractor's by default.
+needle_cache = NeedleCache()
@@ -1 +1,4 @@
-from .fit import YoungLaplaceFit
+from .cache import SolutionCache, solution_cache
+from .fit import YoungLaplaceFit, YoungLaplaceFitProgress, YoungLaplaceFitSnapshot
+from .pool import YoungLaplaceFitJob, YoungLaplaceFitPool
+from .sequential import YoungLaplaceSequentialFit
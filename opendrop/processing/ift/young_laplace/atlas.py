@@ -0,0 +1,214 @@
+"""Precomputed table of dimensionless Young-Laplace solutions on a grid of Bond numbers.
+
+The atlas is optional and isn't built or shipped by setup.py (it takes up about 15 MB). Without it, profiles are
+integrated as they're needed. It is generated with:
+
+    python -m opendrop.processing.ift.young_laplace.atlas [--output PATH]
+
+which writes it to `DEFAULT_PATH` next to this module by default, either in a source tree before it's installed (it's
+then included as package data) or in an installed copy. It is loaded lazily with `np.load(..., mmap_mode='r')`, so processes that use it share the same pages. Profiles for
+Bond numbers in between grid points are interpolated with cubic Hermite polynomials, using the Bond number sensitivity
+columns as the derivatives.
+"""
+
+import argparse
+import json
+import math
+import threading
+import warnings
+from pathlib import Path
+from typing import Optional, Union
+
+import numpy as np
+from scipy import (
+    integrate as sp_integrate,
+    interpolate as sp_interpolate
+)
+
+from .equation import ylderiv
+
+DEFAULT_PATH = Path(__file__).parent/'atlas.npy'
+
+# Solutions with smaller Bond numbers close up on themselves and vary too quickly with Bond number to interpolate
+# accurately, these are left to be integrated.
+BOND_NUMBER_START = 0.05
+BOND_NUMBER_STOP = 0.8
+BOND_NUMBER_STEP = 0.005
+
+ARCLENGTH_STOP = 8.0
+ARCLENGTH_STEP = 0.004
+
+
+class Atlas:
+    def __init__(self, values: np.ndarray, bond_number_start: float, bond_number_step: float,
+                 arclength_step: float, valid_sizes: np.ndarray) -> None:
+        # Array of shape (num_bond_numbers, num_arclengths, 6), the last axis is the same as the solution of ylderiv().
+        self._values = values
+
+        self._bond_number_start = bond_number_start
+        self._bond_number_step = bond_number_step
+        self._arclength_step = arclength_step
+
+        # The arclength that each row of `values` is finite and has positive radius up to.
+        self._valid_sizes = valid_sizes
+
+    @classmethod
+    def load(cls, path: Union[Path, str]) -> 'Atlas':
+        path = Path(path)
+
+        with path.with_suffix('.json').open() as f:
+            meta = json.load(f)
+
+        values = np.load(str(path), mmap_mode='r')
+
+        return cls(
+            values=values,
+            bond_number_start=meta['bond_number_start'],
+            bond_number_step=meta['bond_number_step'],
+            arclength_step=meta['arclength_step'],
+            valid_sizes=np.array(meta['valid_sizes']),
+        )
+
+    def save(self, path: Union[Path, str]) -> None:
+        path = Path(path)
+
+        np.save(str(path), self._values)
+
+        with path.with_suffix('.json').open('w') as f:
+            json.dump(
+                dict(
+                    bond_number_start=self._bond_number_start,
+                    bond_number_step=self._bond_number_step,
+                    arclength_step=self._arclength_step,
+                    valid_sizes=self._valid_sizes.tolist(),
+                ),
+                f
+            )
+
+    def covers(self, bond_number: float, size: float) -> bool:
+        """Return True if the solution for `bond_number` can be interpolated over [0, `size`]."""
+        if not math.isfinite(bond_number):
+            return False
+
+        i = math.floor((bond_number - self._bond_number_start) / self._bond_number_step)
+        if not 0 <= i < len(self._values) - 1:
+            return False
+
+        return size <= min(self._valid_sizes[i], self._valid_sizes[i + 1])
+
+    def interpolate(self, bond_number: float, size: float) -> Optional[sp_interpolate.PPoly]:
+        """Return the solution for `bond_number` over [0, `size`] (or slightly larger, rounded up to the next grid
+        point), or None if the atlas does not cover `bond_number` and `size`."""
+        if not self.covers(bond_number, size):
+            return None
+
+        h = self._bond_number_step
+        i = math.floor((bond_number - self._bond_number_start) / h)
+        t = (bond_number - self._bond_number_start) / h - i
+
+        num_arclengths = min(math.ceil(size / self._arclength_step) + 1, self._values.shape[1])
+        y0 = self._values[i, :num_arclengths]
+        y1 = self._values[i + 1, :num_arclengths]
+
+        # Cubic Hermite basis functions and their derivatives.
+        h00, h10, h01, h11 = 2*t**3 - 3*t**2 + 1, t**3 - 2*t**2 + t, -2*t**3 + 3*t**2, t**3 - t**2
+        dh00, dh10, dh01, dh11 = 6*t**2 - 6*t, 3*t**2 - 4*t + 1, -6*t**2 + 6*t, 3*t**2 - 2*t
+
+        values = np.empty((num_arclengths, 6))
+        values[:, :3] = h00*y0[:, :3] + h10*h*y0[:, 3:] + h01*y1[:, :3] + h11*h*y1[:, 3:]
+        values[:, 3:] = (dh00*y0[:, :3] + dh10*h*y0[:, 3:] + dh01*y1[:, :3] + dh11*h*y1[:, 3:]) / h
+
+        domain = np.arange(num_arclengths) * self._arclength_step
+
+        # Boundary conditions for the spline, the derivative given by ylderiv() at the apex is inaccurate (the radius
+        # is not exactly zero), which matters with the coarser spacing of the atlas, so leave that end free.
+        bc = ('not-a-knot',
+              (1, ylderiv(values[-1], 0, bond_number)))
+
+        return sp_interpolate.CubicSpline(
+            x=domain, y=values, bc_type=bc, extrapolate=False
+        )
+
+
+def build_atlas(
+        bond_number_start: float = BOND_NUMBER_START,
+        bond_number_stop: float = BOND_NUMBER_STOP,
+        bond_number_step: float = BOND_NUMBER_STEP,
+        arclength_stop: float = ARCLENGTH_STOP,
+        arclength_step: float = ARCLENGTH_STEP,
+) -> Atlas:
+    bond_numbers = np.arange(
+        bond_number_start,
+        bond_number_stop + bond_number_step/2,
+        bond_number_step
+    )
+    domain = np.arange(0, arclength_stop + arclength_step/2, arclength_step)
+
+    # EPS = .000001 # need to use Bessel function Taylor expansion below
+    initial = [.000001, 0., 0., 0., 0., 0.]
+
+    values = np.empty((len(bond_numbers), len(domain), 6))
+    valid_sizes = np.empty(len(bond_numbers))
+
+    for i, bond_number in enumerate(bond_numbers):
+        with warnings.catch_warnings(), np.errstate(all='ignore'):
+            warnings.simplefilter('ignore')
+            values[i] = sp_integrate.odeint(ylderiv, initial, domain, args=(bond_number,))
+
+        # Profiles may close up on themselves, the solution is singular past that point.
+        invalid = ~np.isfinite(values[i]).all(axis=1) | (values[i, :, 0] <= 0)
+        num_valid = invalid.argmax() if invalid.any() else len(domain)
+        valid_sizes[i] = domain[num_valid - 1]
+
+    return Atlas(
+        values=values,
+        bond_number_start=bond_number_start,
+        bond_number_step=bond_number_step,
+        arclength_step=arclength_step,
+        valid_sizes=valid_sizes,
+    )
+
+
+_default_atlas = None  # type: Optional[Atlas]
+_default_atlas_loaded = False
+_default_atlas_lock = threading.Lock()
+
+
+def default_atlas() -> Optional[Atlas]:
+    """Return the atlas at `DEFAULT_PATH`, loading it on first use, or None if it hasn't been built."""
+    global _default_atlas, _default_atlas_loaded
+
+    with _default_atlas_lock:
+        if not _default_atlas_loaded:
+            _default_atlas_loaded = True
+
+            if DEFAULT_PATH.exists():
+                _default_atlas = Atlas.load(DEFAULT_PATH)
+
+    return _default_atlas
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Build the Young-Laplace solution atlas.')
+    parser.add_argument('--output', type=Path, default=DEFAULT_PATH)
+    parser.add_argument('--bond-number-start', type=float, default=BOND_NUMBER_START)
+    parser.add_argument('--bond-number-stop', type=float, default=BOND_NUMBER_STOP)
+    parser.add_argument('--bond-number-step', type=float, default=BOND_NUMBER_STEP)
+    parser.add_argument('--arclength-stop', type=float, default=ARCLENGTH_STOP)
+    parser.add_argument('--arclength-step', type=float, default=ARCLENGTH_STEP)
+    args = parser.parse_args()
+
+    atlas = build_atlas(
+        bond_number_start=args.bond_number_start,
+        bond_number_stop=args.bond_number_stop,
+        bond_number_step=args.bond_number_step,
+        arclength_stop=args.arclength_stop,
+        arclength_step=args.arclength_step,
+    )
+    atlas.save(args.output)
+
+    print('Wrote atlas to {}'.format(args.output))
+
+
+if __name__ == '__main__':
+    main()
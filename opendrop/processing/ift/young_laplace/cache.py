@@ -0,0 +1,131 @@
+import math
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Tuple
+
+# Default memory budget of the shared cache, in bytes. One solution with the default number of breakpoints takes up
+# a little under 1 MB.
+MAX_BYTES = 64 * 1024**2
+
+# Bond numbers are rounded to a multiple of this value before being solved, so that nearby Bond numbers share the same
+# solution. YoungLaplaceSolution corrects for the rounding to first order using the Bond number sensitivities.
+BOND_NUMBER_QUANTUM = 5.e-4
+
+
+class SolutionCache:
+    """Thread-safe LRU cache of dimensionless Young-Laplace solutions, keyed on the quantised Bond number, the size of
+    the solved region and where the solution comes from (e.g. the atlas it may be interpolated from). A cached
+    solution is a `PPoly` or a tuple of `PPoly`'s."""
+
+    def __init__(self, max_bytes: int = MAX_BYTES, bond_number_quantum: float = BOND_NUMBER_QUANTUM) -> None:
+        self._max_bytes = max_bytes
+        self._bond_number_quantum = bond_number_quantum
+
+        self._entries = OrderedDict()  # type: OrderedDict[Hashable, Any]
+        self._nbytes = 0
+
+        self._hits = 0
+        self._misses = 0
+
+        self._lock = threading.Lock()
+
+    def quantise(self, bond_number: float) -> float:
+        """Return the Bond number that `bond_number` is solved at."""
+        if not math.isfinite(bond_number) or self._bond_number_quantum <= 0:
+            return bond_number
+
+        return round(bond_number / self._bond_number_quantum) * self._bond_number_quantum
+
+    def get_or_solve(self, bond_number: float, size: float, solve: Callable[[float, float], Any], *,
+                     source: Hashable = None) -> Tuple[float, Any]:
+        """Return the quantised Bond number and the solution for it over [0, `size`]. If the solution is not cached,
+        it is computed with `solve(bond_number, size)` and inserted into the cache. Solutions are only shared between
+        callers that give the same `source`, the way `solve` computes them."""
+        bond_number = self.quantise(bond_number)
+
+        if not math.isfinite(bond_number):
+            # Don't bother caching nonsense.
+            return bond_number, solve(bond_number, size)
+
+        key = (source, bond_number, size)
+
+        with self._lock:
+            solution = self._entries.get(key)
+            if solution is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return bond_number, solution
+
+            self._misses += 1
+
+        # Solve outside of the lock so other threads aren't held up. Two threads may end up solving the same key, in
+        # which case the second insert just replaces the first.
+        solution = solve(bond_number, size)
+
+        self._insert(key, solution)
+
+        return bond_number, solution
+
+    def _insert(self, key: Hashable, solution: Any) -> None:
+        nbytes = _solution_nbytes(solution)
+        if nbytes > self._max_bytes:
+            return
+
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._nbytes -= _solution_nbytes(old)
+
+            self._entries[key] = solution
+            self._nbytes += nbytes
+
+            self._evict()
+
+    # Evict least recently used entries until under budget. Must be called with the lock held.
+    def _evict(self) -> None:
+        while self._entries and self._nbytes > self._max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._nbytes -= _solution_nbytes(evicted)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._nbytes = 0
+            self._hits = 0
+            self._misses = 0
+
+    @property
+    def max_bytes(self) -> int:
+        return self._max_bytes
+
+    @max_bytes.setter
+    def max_bytes(self, value: int) -> None:
+        with self._lock:
+            self._max_bytes = value
+            self._evict()
+
+    @property
+    def nbytes(self) -> int:
+        return self._nbytes
+
+    @property
+    def hits(self) -> int:
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        return self._misses
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def _solution_nbytes(solution: Any) -> int:
+    if isinstance(solution, tuple):
+        return sum(map(_solution_nbytes, solution))
+
+    return solution.c.nbytes + solution.x.nbytes
+
+
+# Cache shared by all YoungLaplaceSolution's by default.
+solution_cache = SolutionCache()
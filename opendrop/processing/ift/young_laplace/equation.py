@@ -1,5 +1,6 @@
+import math
 from math import sin, cos, pi
-from typing import Union, Iterable, Tuple
+from typing import Union, Iterable, Tuple, Optional, Callable
 
 import numpy as np
 from scipy import (
@@ -7,25 +8,79 @@ from scipy import (
     interpolate as sp_interpolate
 )
 
+from .cache import SolutionCache, solution_cache
+
 
 # noinspection NonAsciiCharacters
 class YoungLaplaceSolution:
     INITIAL_SIZE = 4.0
     NUM_BREAKPOINTS = 5000
+    NUM_GUESS_SAMPLES = 200
 
-    def __init__(self, bond_number: float, apex_radius: float) -> None:
+    # If `atlas` is True, profiles are interpolated from the default atlas (if it has been built) instead of being
+    # integrated, if False, profiles are always integrated. An `Atlas` object can also be given to use instead.
+    def __init__(self, bond_number: float, apex_radius: float, *, cache: Optional[SolutionCache] = None,
+                 atlas: Union['Atlas', bool] = True) -> None:
         self._bond_number = bond_number
         self._apex_radius = apex_radius
 
-        self._solution_cache = self._solve(bond_number=bond_number, size=self.INITIAL_SIZE)
+        self._cache = cache if cache is not None else solution_cache
 
-    @staticmethod
-    def _solve(bond_number: float, size: float, num_breakpoints: int = NUM_BREAKPOINTS) -> sp_interpolate.PPoly:
-        domain = np.linspace(start=0, stop=size, num=num_breakpoints)
+        if atlas is True:
+            from .atlas import default_atlas
+            atlas = default_atlas()
+
+        self._atlas = atlas or None  # type: Optional[Atlas]
+
+        # The Bond number that the cached solution was actually solved at, see SolutionCache.quantise().
+        self._solved_bond_number = math.nan
+        self._solution = None  # type: Optional[sp_interpolate.PPoly]
+        # Cumulative volume and surface area (and their Bond number sensitivities) along the solution.
+        self._volsur = None  # type: Optional[sp_interpolate.PPoly]
+
+        self._num_solves = 0
+
+        self._load_solution(size=self.INITIAL_SIZE)
+
+    def _load_solution(
+            self,
+            size: float,
+            solve: Optional[Callable[[float, float], Tuple[sp_interpolate.PPoly, sp_interpolate.PPoly]]] = None
+    ) -> None:
+        self._solved_bond_number, (self._solution, self._volsur) = \
+            self._cache.get_or_solve(
+                self._bond_number, size, solve=solve or self._interpolate_or_solve,
+                # Solutions interpolated from an atlas aren't the same as integrated ones.
+                source=self._atlas,
+            )
+
+    def _interpolate_or_solve(self, bond_number: float, size: float) \
+            -> Tuple[sp_interpolate.PPoly, sp_interpolate.PPoly]:
+        solution = self._interpolate(bond_number, size)
+        if solution is None:
+            solution = self._solve(bond_number, size)
+            self._num_solves += 1
+
+        return solution, self._integrate_volsur(solution)
+
+    def _interpolate(self, bond_number: float, size: float) -> Optional[sp_interpolate.PPoly]:
+        if self._atlas is None:
+            return None
 
+        return self._atlas.interpolate(bond_number, size)
+
+    @classmethod
+    def _solve(cls, bond_number: float, size: float, num_breakpoints: int = NUM_BREAKPOINTS) -> sp_interpolate.PPoly:
         # EPS = .000001 # need to use Bessel function Taylor expansion below
         initial = [.000001, 0., 0., 0., 0., 0.]
 
+        return cls._solve_segment(bond_number, initial, start=0, stop=size, num_breakpoints=num_breakpoints)
+
+    @staticmethod
+    def _solve_segment(bond_number: float, initial: Iterable[float], start: float, stop: float,
+                       num_breakpoints: int) -> sp_interpolate.PPoly:
+        domain = np.linspace(start=start, stop=stop, num=num_breakpoints)
+
         calculated = sp_integrate.odeint(ylderiv, initial, domain, args=(bond_number,))
 
         # Boundary conditions for the spline
@@ -38,6 +93,25 @@ class YoungLaplaceSolution:
             x=domain, y=calculated, bc_type=bc, extrapolate=False
         )
 
+    # Return `solution` extended to [0, `size`], only the new segment is integrated, starting from the last state of
+    # `solution`. The new segment has the same breakpoint spacing as `solution`.
+    @classmethod
+    def _extend(cls, solution: sp_interpolate.PPoly, bond_number: float, size: float) -> sp_interpolate.PPoly:
+        start = solution.x[-1]
+        spacing = solution.x[1] - solution.x[0]
+        num_breakpoints = max(math.ceil((size - start) / spacing), 1) + 1
+
+        segment = cls._solve_segment(bond_number, solution(start), start, size, num_breakpoints)
+
+        # Both pieces are clamped to the derivative given by ylderiv() at the join, so the result is still C1.
+        return _concatenate_ppolys(solution, segment)
+
+    # Number of times the equation has been integrated for this profile, solutions taken from the cache or interpolated
+    # from the atlas aren't counted.
+    @property
+    def num_solves(self) -> int:
+        return self._num_solves
+
     def __call__(self, s: Union[float, Iterable[float]]) -> np.ndarray:
         return self.evaluate(s)
 
@@ -53,11 +127,12 @@ class YoungLaplaceSolution:
         if len(s) == 0:
             return np.empty((0, 6))
 
-        # If the profile is evaluated outside of the interpolated region, expand it by 20%.
-        if max(s) > self._solved_region_size:
-            self._expand_solved_region(factor=1.2)
+        self._cover(abs(s).max())
+
+        data = self._solution(abs(s))
 
-        data = self._solution_cache(abs(s))
+        # Correct to first order for the difference between the requested and the solved Bond number.
+        data[:, :3] += (self._bond_number - self._solved_bond_number) * data[:, 3:]
 
         # Flip signs of appropriate quantities for negative `s` values queried.
         data[np.argwhere(s < 0), [0, 2, 3, 5]] *= -1
@@ -65,13 +140,80 @@ class YoungLaplaceSolution:
 
         return data
 
+    # Expand the solved region by 20% at a time until it covers [0, `size`]. Growing by the same factor every time keeps
+    # the sizes that are solved (and cached) the same from one profile to the next.
+    def _cover(self, size: float) -> None:
+        if not math.isfinite(size):
+            return
+
+        while size > self._solved_region_size:
+            self._expand_solved_region(factor=1.2)
+
     def _expand_solved_region(self, factor: float) -> None:
         new_size = self._solved_region_size * factor
-        self._solution_cache = self._solve(self._bond_number, size=new_size)
+        solution = self._solution
+        volsur = self._volsur
+
+        def interpolate_or_extend(bond_number: float, size: float) \
+                -> Tuple[sp_interpolate.PPoly, sp_interpolate.PPoly]:
+            new_solution = self._interpolate(bond_number, size)
+            if new_solution is not None:
+                return new_solution, self._integrate_volsur(new_solution)
+
+            new_solution = self._extend(solution, bond_number, size)
+            self._num_solves += 1
+
+            # Only integrate volume and surface area over the new segment.
+            start = len(solution.x) - 1
+            new_volsur = _concatenate_ppolys(
+                volsur,
+                self._integrate_volsur(new_solution, start=start, initial=volsur(solution.x[-1]))
+            )
+
+            return new_solution, new_volsur
+
+        self._load_solution(size=new_size, solve=interpolate_or_extend)
+
+    # Return the volume and surface area of the drop between the apex and arclength `s`.
+    def volsur(self, s: float) -> Tuple[float, float]:
+        s = abs(s)
+
+        self._cover(s)
+
+        vol, sur, vol_B, sur_B = self._volsur(s)
+
+        # Correct to first order for the difference between the requested and the solved Bond number.
+        vol += (self._bond_number - self._solved_bond_number) * vol_B
+        sur += (self._bond_number - self._solved_bond_number) * sur_B
+
+        return vol * self._apex_radius**3, sur * self._apex_radius**2
+
+    # Integrate volume and surface area along `solution` by Gauss-Legendre quadrature over each interval, starting
+    # from the breakpoint at index `start` with the values `initial`. The result is a cubic Hermite spline through the
+    # cumulative values, with the integrands as derivatives.
+    @staticmethod
+    def _integrate_volsur(solution: sp_interpolate.PPoly, start: int = 0,
+                          initial: Iterable[float] = (0., 0., 0., 0.)) -> sp_interpolate.PPoly:
+        x = solution.x[start:]
+        h = np.diff(x)
+
+        nodes, weights = np.polynomial.legendre.leggauss(3)
+        quadrature_points = (x[:-1] + h/2)[:, np.newaxis] + np.outer(h/2, nodes)
+
+        integrand = _volsur_integrand(solution(quadrature_points.ravel())).reshape(len(h), len(nodes), 4)
+        increments = (integrand * weights[:, np.newaxis]).sum(axis=1) * (h/2)[:, np.newaxis]
+
+        values = np.empty((len(x), 4))
+        values[0] = initial
+        values[1:] = np.cumsum(increments, axis=0) + values[0]
+
+        return sp_interpolate.CubicHermiteSpline(
+            x=x, y=values, dydx=_volsur_integrand(solution(x)), extrapolate=False
+        )
 
     @property
     def _solved_region_size(self) -> float:
-        return self._solution_cache.x.max()
+        return self._solution.x.max()
 
     def closest(self, p: Tuple[float, float], s_0: float, max_steps: int, tol: float) \
             -> Tuple[float, Tuple[float, float], bool]:
@@ -110,20 +252,99 @@ class YoungLaplaceSolution:
 
         return s, (e_r, e_z), steps_exceeded
 
+    # Vectorised version of `closest()`, runs the Newton iteration for every point in `points` at once. `s_0` is
+    # the initial guess, either one value for all points or one value per point. If `s_0` is None, each point starts
+    # from the nearest of a coarse sampling of the solved profile. Returns the arclengths, the residual vectors
+    # (e_r, e_z) and a mask of the points that did not converge in `max_steps` steps.
+    def closest_many(self, points: np.ndarray, s_0: Union[float, np.ndarray, None], max_steps: int, tol: float) \
+            -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        points = np.reshape(points, (-1, 2))
+        r, z = points.T
+
+        apex_radius = self._apex_radius
+        bond_number = self._bond_number
+
+        if s_0 is None:
+            s_0 = self._nearest_sample_arclengths(points)
+
+        s = np.array(np.broadcast_to(s_0, r.shape), dtype=float)
+        e = np.zeros_like(points, dtype=float)
+
+        bumps = np.zeros(r.shape, dtype=int)
+        # Points still being iterated on, a point drops out once it converges or is aborted.
+        active = np.ones(r.shape, dtype=bool)
+
+        for step in range(max_steps):
+            idx = np.flatnonzero(active)
+            if len(idx) == 0:
+                break
+
+            s_i, r_i, z_i = s[idx], r[idx], z[idx]
+            r_s, z_s, φ_s = self.evaluate(s_i)[:, :3].T
+
+            e_r = r_i - r_s
+            e_z = z_i - z_s
+            e[idx] = np.stack((e_r, e_z), axis=1)
+
+            dφ_ds = 2 - bond_number * (z_s/apex_radius) - np.sin(φ_s) / (r_s/apex_radius)
+
+            s_next = s_i - self._f_Newton(e_r, e_z, φ_s, dφ_ds, apex_radius)
+
+            # Don't let a step run further than one expansion of the solved region.
+            s_limit = 1.2 * self._solved_region_size
+            s_next = np.clip(s_next, -s_limit, s_limit)
+
+            # Next parameter is on wrong side of profile
+            wrong_side = ((s_next < 0) & (0 < r_i)) | ((r_i < 0) & (0 < s_next))
+            s_next[wrong_side] = 0
+            bumps[idx] += wrong_side
+
+            # Points that have already been pushed back twice are aborted.
+            stopped = (bumps[idx] >= 2) | (abs(s_next - s_i) < tol)
+
+            s[idx[~stopped]] = s_next[~stopped]
+            active[idx[stopped]] = False
+
+        steps_exceeded = active
+
+        return s, e, steps_exceeded
+
+    def _nearest_sample_arclengths(self, points: np.ndarray) -> np.ndarray:
+        samples_s = np.linspace(0, self._solved_region_size, num=self.NUM_GUESS_SAMPLES)
+        samples_rz = self.evaluate(samples_s)[:, :2]
+
+        # The profile is symmetric about r = 0, so only compare against the right side and copy the sign of r.
+        points_rz = np.column_stack((abs(points[:, 0]), points[:, 1]))
+        dists = np.linalg.norm(points_rz[:, np.newaxis] - samples_rz[np.newaxis], axis=2)
+
+        return np.copysign(samples_s[dists.argmin(axis=1)], points[:, 0])
+
     # the function g(s) used in finding the arc length for the minimal distance
     @staticmethod
     def _f_Newton(e_r, e_z, φ, dφ_ds, apex_radius):
-        f = - (e_r * cos(φ) + e_z * sin(φ)) / (apex_radius + dφ_ds * (e_r * sin(φ) - e_z * cos(φ)))
+        f = - (e_r * np.cos(φ) + e_z * np.sin(φ)) / (apex_radius + dφ_ds * (e_r * np.sin(φ) - e_z * np.cos(φ)))
         return f
 
 
-def calculate_volsur(bond_number: float, profile_size: float) -> Tuple[float, float]:
-    # EPS = .000001 # need to use Bessel function Taylor expansion below
-    x_vec_initial = [.000001, 0., 0., 0., 0.]
+def _concatenate_ppolys(a: sp_interpolate.PPoly, b: sp_interpolate.PPoly) -> sp_interpolate.PPoly:
+    """Return the piecewise polynomial that is `a` followed by `b`, `b` must start where `a` ends."""
+    return sp_interpolate.PPoly(
+        c=np.concatenate((a.c, b.c), axis=1),
+        x=np.concatenate((a.x, b.x[1:])),
+        extrapolate=False
+    )
 
-    return sp_integrate.odeint(
-        dataderiv, x_vec_initial, t=[0, profile_size], args=(bond_number,)
-    )[-1][-2:]
+
+# Integrands of volume, surface area and their Bond number sensitivities, given rows of the solution of ylderiv().
+def _volsur_integrand(data: np.ndarray) -> np.ndarray:
+    r, z, φ, r_B, z_B, φ_B = data.T
+
+    vol_s = pi * r**2 * np.sin(φ)
+    sur_s = 2 * pi * r
+    vol_B_s = pi * (2 * r * r_B * np.sin(φ) + r**2 * np.cos(φ) * φ_B)
+    sur_B_s = 2 * pi * r_B
+
+    return np.stack((vol_s, sur_s, vol_B_s, sur_B_s), axis=1)
 
 
 # minimise calls to sin() and cos()
@@ -142,15 +363,3 @@ def ylderiv(x_vec, t, bond_number):
 
     return [x_s, y_s, phi_s, x_Bond_s, y_Bond_s, phi_Bond_s]
 
-
-# defines the Young--Laplace system of differential equations to be solved
-def dataderiv(x_vec, t, bond_number):
-    x, y, phi, vol, sur = x_vec
-
-    x_s = cos(phi)
-    y_s = sin(phi)
-    phi_s = 2 - bond_number * y - sin(phi)/x
-    vol_s = pi * x**2 * y_s
-    sur_s = 2 * pi * x
-
-    return [x_s, y_s, phi_s, vol_s, sur_s]
@@ -1,20 +1,26 @@
+import functools
 import io
 import itertools
 import math
+import time
 import traceback
 from collections import namedtuple
 from enum import IntEnum
 from math import cos, sin
-from typing import Optional, Tuple, Union, Iterable, overload, Any, Callable
+from typing import Optional, Tuple, Union, Iterable, Iterator, overload, Any, Callable
 
 import numpy as np
+from scipy import spatial as sp_spatial
+
+from opendrop.utility.timing import StageTime, Stopwatch
 
 from . import best_guess
 from . import equation
 from . import tolerances
+from ..levenberg_marquardt import LevenbergMarquardt
 
-SLOW_CONVERGENCE_THRESHOLD = 0.25
-FAST_CONVERGENCE_THRESHOLD = 0.75
+# Maximum number of progress updates per second reported by a running fit (see YoungLaplaceFitProgress).
+PROGRESS_RATE = 10
 
 
 # noinspection NonAsciiCharacters
@@ -24,12 +30,32 @@ class YoungLaplaceFit:
     class _Cancelled(Exception):
         pass
 
+    # If `initial_params` is given (e.g. the result of fitting a previous frame of a time series), the fit is warm
+    # started from it instead of the usual initial guess, unless it fits the drop profile worse than the initial guess.
     def __init__(self, drop_profile: np.ndarray, *,
+                 initial_params: Optional[Iterable[float]] = None,
                  on_update: Optional[Callable[['YoungLaplaceFit'], Any]] = None,
                  logger: Optional[Callable[[str], Any]] = None) -> None:
 
+        self._drop_profile = drop_profile
         self._src_profile = drop_profile[drop_profile[:, 1].argsort()]
 
+        # Indices of the points of `drop_profile` fitted at each resolution of the coarse-to-fine schedule, ending with
+        # the full profile.
+        self._resolutions = [
+            *(_arclength_subsample(drop_profile, num_points) for num_points in tolerances.RESOLUTION_SCHEDULE
+              if 2*num_points <= len(drop_profile)),
+            drop_profile[:, 1].argsort(),
+        ]
+
+        # Arclengths of the closest points on the profile to some of the points of `drop_profile` (indices, arclengths)
+        # at the last accepted step, to start the search for the closest points from, and a k-d tree of those points
+        # (built when first needed) to look up the nearest of them.
+        self._known_arclengths = None  # type: Optional[Tuple[np.ndarray, np.ndarray]]
+        self._known_points_tree = None  # type: Optional[sp_spatial.cKDTree]
+
+        self._warm_start = self._Params(*initial_params) if initial_params is not None else None
+
         self._on_update = on_update or (lambda x: None)
         self._logger = logger or (lambda x: None)
 
@@ -50,6 +76,14 @@ class YoungLaplaceFit:
         self._profile_size = 0.0
         self._residuals = np.empty((0, 2))
 
+        # Counters and timers of the work done by the fit, see the properties of the same names.
+        self._num_iterations = 0
+        self._num_arclength_steps_exceeded = 0
+        self._num_solves = 0
+        self._stop_reason = ''
+        self._optimise_stopwatch = Stopwatch()
+        self._projection_stopwatch = Stopwatch()
+
         self._fit()
 
     def _fit(self) -> None:
@@ -58,51 +92,128 @@ class YoungLaplaceFit:
 
         # Optimise
         try:
-            stop_reason = self._optimise()
+            with self._optimise_stopwatch:
+                stop_reason = self._optimise()
         except self._Cancelled:
             self._is_cancelled = True
+            self._stop_reason = 'CANCELLED'
             self._logger('\nCancelled.\n')
         except Exception as exc:
             # Unexpected error occurred in the fitting routine.
+            self._stop_reason = 'FAILED'
             buffer = io.StringIO()
             traceback.print_exception(type(exc), exc, tb=exc.__traceback__, file=buffer)
             self._logger('\n{}'.format(buffer.getvalue()))
         else:
-            self._logger('\nFitting finished ({})\n'.format(_StopReason.str_from_num(stop_reason)))
+            self._stop_reason = _StopReason.str_from_num(stop_reason)
+            self._logger('\nFitting finished ({})\n'.format(self._stop_reason))
 
         self._is_done = True
 
         self._on_update(self)
 
     def _initial_guess(self) -> None:
-        """Initialises parameters to a first best guess.
+        """Initialises parameters to a first best guess, or to the warm start if there is one and it is better.
         """
         apex_x, apex_y, apex_radius = best_guess.fit_circle(self._src_profile)
 
         bond_number = best_guess.bond_number(self._src_profile, apex_x, apex_y, apex_radius)
         rotation = 0.0
 
-        self._params = self._Params(apex_x, apex_y, apex_radius, bond_number, rotation)
+        cold_guess = self._Params(apex_x, apex_y, apex_radius, bond_number, rotation)
+
+        if self._warm_start is None:
+            self._params = cold_guess
+            return
+
+        # Compare them at the coarsest resolution.
+        warm_ssr = self._calculate_ssr(self._warm_start, indices=self._resolutions[0])
+        cold_ssr = self._calculate_ssr(cold_guess, indices=self._resolutions[0])
+
+        if warm_ssr <= cold_ssr:
+            self._logger('Warm started from previous fit.\n')
+            self._params = self._warm_start
+        else:
+            self._logger('Warm start rejected, fitting from initial guess.\n')
+            self._params = cold_guess
+
+    def _calculate_ssr(self, params: Iterable[float], indices: np.ndarray) -> float:
+        """Return the sum of squared residuals of `params` fitted to the points of the drop profile at `indices`, or
+        infinity if it can't be calculated."""
+        residuals = np.empty(len(indices))
+        jacobian = np.empty((len(indices), len(self._Params._fields)))
+
+        try:
+            self._evaluate(params, residuals, jacobian, indices=indices, log_warnings=False)
+        except Exception:
+            return math.inf
+
+        ssr = residuals @ residuals
+        if not math.isfinite(ssr):
+            return math.inf
+
+        return ssr
 
     def _optimise(self) -> '_StopReason':
-        self._logger('{: >4}  {: >10}  {: >10}  {: >10}  {: >11}  {: >10}  {:>11}\n'.format(
-            'Step', 'Objective', 'x-centre', 'z-centre', 'Apex radius', 'Bond', 'Image angle'
+        self._logger('{: >4}  {: >6}  {: >10}  {: >10}  {: >10}  {: >11}  {: >10}  {:>11}\n'.format(
+            'Step', 'Points', 'Objective', 'x-centre', 'z-centre', 'Apex radius', 'Bond', 'Image angle'
         ))
 
-        λ = 0
-        λ_cutoff = 0
+        # Steps are counted over all resolutions, for the maximum number of steps.
+        step = itertools.count()
+        out_of_steps = False
+
+        for level, indices in enumerate(self._resolutions):
+            is_final = level == len(self._resolutions) - 1
+
+            if out_of_steps and not is_final:
+                continue
+
+            if self._cancel_flag:
+                raise self._Cancelled()
+
+            lm = LevenbergMarquardt(
+                functools.partial(self._evaluate, indices=indices),
+                np.array(self._params),
+                len(indices),
+            )
+            self._accept(lm, indices)
+
+            if out_of_steps:
+                # Only evaluated at the full resolution, for the residuals of all of the points.
+                return _StopReason.MAXIMUM_STEPS_EXCEEDED
+
+            if is_final:
+                return self._optimise_resolution(lm, indices, step, delta_tol=tolerances.DELTA_TOL)
 
-        # Initialise sum of squared residuals to be arbitrarily large.
-        ssr = math.inf
+            # Coarser resolutions only need to get close, for the next one to start from.
+            stop_reason = self._optimise_resolution(lm, indices, step, delta_tol=tolerances.RESOLUTION_DELTA_TOL)
+            out_of_steps = bool(stop_reason & _StopReason.MAXIMUM_STEPS_EXCEEDED)
 
-        for step in itertools.count():
-            λ, λ_cutoff, ssr, stop_reason = self._optimise_step(λ, λ_cutoff, ssr)
+    def _optimise_resolution(self, lm: LevenbergMarquardt, indices: np.ndarray, step: Iterator[int],
+                             delta_tol: float) -> '_StopReason':
+        num_points = len(indices)
+        degrees_of_freedom = num_points - len(self._Params._fields) + 1
 
-            objective = ssr/self.degrees_of_freedom
+        for step_num in step:
+            stop_reason = 0
+
+            # Rejected steps leave the parameters (and the profile) as they are.
+            self._num_iterations += 1
+            if lm.step():
+                self._accept(lm, indices)
+                stop_reason |= _convergence_in_gradient(lm.gradient)
+
+            # Converged if the next step would hardly change anything, no need to take it. Steps are relative to the
+            # parameters, except for those close to zero (e.g. the rotation), which could otherwise never converge.
+            stop_reason |= _convergence_in_parameters(lm.next_delta / np.maximum(abs(lm.x), 1), delta_tol)
+
+            objective = lm.ssr/degrees_of_freedom
 
             # Log the fitting progress
             self._logger(
                 '{step: >4d} '
+                '{num_points: >7d} '
                 '{objective: >11.4g} '
                 '{apex_x: >11.4g} '
                 '{apex_y: >11.4g} '
@@ -110,7 +221,8 @@ class YoungLaplaceFit:
                 '{bond_number: >11.4g} '
                 '{rotation: >11.4g}°\n'
                 .format(
-                    step=step,
+                    step=step_num,
+                    num_points=num_points,
                     objective=objective,
                     apex_x=self._params.apex_x,
                     apex_y=self._params.apex_y,
@@ -121,7 +233,7 @@ class YoungLaplaceFit:
             )
 
             stop_reason |= _convergence_in_objective(objective)
-            stop_reason |= _maximum_steps_exceeded(step)
+            stop_reason |= _maximum_steps_exceeded(step_num)
 
             if stop_reason:
                 return stop_reason
@@ -129,116 +241,83 @@ class YoungLaplaceFit:
             if self._cancel_flag:
                 raise self._Cancelled()
 
-    def _optimise_step(self, λ: float, λ_cutoff: float, ssr: float) -> Tuple[float, float, float, '_StopReason']:
-        J, residuals = self._calculate_jacobian()
-        A = J.T @ J
-        v = J.T @ residuals[:, 1]
-        δ = -np.linalg.inv(A + λ * np.diag(np.diag(A))) @ v
+    def _accept(self, lm: LevenbergMarquardt, indices: np.ndarray) -> None:
+        """Move to the current point of `lm` (fitting the points of the drop profile at `indices`), reusing the profile
+        it was evaluated with."""
+        profile, residuals = lm.aux
 
-        λ_next = λ
-        λ_cutoff_next = λ_cutoff
-        ssr_next = np.sum(residuals[:, 1]**2)
+        self._known_arclengths = (indices, residuals[:, 0])
+        self._known_points_tree = None
 
-        stop_reason = 0
+        self._profile_size = abs(residuals[:, 0]).max()
+        self._residuals = residuals
+        self._set_params(lm.x, profile)
 
-        if not math.isinf(ssr):
-            R = (ssr - ssr_next) / (δ @ (-2*v - A@δ))
+    def _evaluate(self, params: Iterable[float], residuals_out: np.ndarray, jacobian_out: np.ndarray, *,
+                  indices: np.ndarray, log_warnings: bool = True) -> Tuple[equation.YoungLaplaceSolution, np.ndarray]:
+        """Fill `residuals_out` and `jacobian_out` with the residuals of the points of the drop profile at `indices`
+        from the profile of `params`, and their Jacobian. Return the profile and the residuals, paired with the
+        arclengths of the closest points on the profile."""
+        apex_x, apex_y, apex_radius, bond_number, rotation = params
 
-            if R < SLOW_CONVERGENCE_THRESHOLD:  # Slow convergence
-                ν = 2 - (ssr_next - ssr) / (δ @ v)
-                ν = np.clip(ν, 2, 10)
+        points = self._drop_profile[indices]
 
-                if λ_next == 0:
-                    λ_cutoff_next = 1 / (np.linalg.norm(np.linalg.inv(A), np.inf))
-                    λ_next = λ_cutoff_next
-                    ν /= 2
+        profile = equation.YoungLaplaceSolution(bond_number, apex_radius)
+        rot_matrix = _rotation_matrix(rotation)
 
-                λ_next *= ν
-            elif R > FAST_CONVERGENCE_THRESHOLD:  # Fast convergence
-                λ_next /= 2
+        src_profile_rz = (points - (apex_x, apex_y)) @ rot_matrix.T
 
-                if 0 < λ_next < λ_cutoff:
-                    λ_next = 0
-
-        if ssr_next < ssr:
-            self._profile_size = abs(residuals[:, 0]).max()
-            self._residuals = residuals
-            self._params += δ
+        with self._projection_stopwatch:
+            s, e, steps_exceeded = profile.closest_many(
+                points=src_profile_rz,
+                s_0=self._guess_arclengths(indices),
+                max_steps=tolerances.MAXIMUM_ARCLENGTH_STEPS,
+                tol=tolerances.ARCLENGTH_TOL,
+            )
 
-            stop_reason |= _convergence_in_parameters(δ / self._params)
-            stop_reason |= _convergence_in_gradient(v)
-        else:
-            # If error is worse, don't update parameters.
-            ssr_next = ssr
-
-        return λ_next, λ_cutoff_next, ssr_next, stop_reason
-
-    def _calculate_jacobian(self) -> Tuple[np.ndarray, np.ndarray]:
-        src_profile_xy = self._src_profile - (self.apex_x, self.apex_y)
-        src_profile_rz = self._rz_from_xy(*src_profile_xy.T).T
-
-        minimum_arclengths = np.empty((len(self._src_profile), 3))
-
-        # [Initial guess for left side, Initial guess for right side]
-        s_initial_guess = [-0.05 * max(self._profile_size, 4), 0.05 * max(self._profile_size, 4)]
-        for i, (r, z) in enumerate(src_profile_rz):
-            s, (e_r, e_z), steps_exceeded = \
-                self._profile.closest(
-                    p=(r, z),
-                    s_0=s_initial_guess[r > 0],
-                    max_steps=tolerances.MAXIMUM_ARCLENGTH_STEPS,
-                    tol=tolerances.ARCLENGTH_TOL,
-                )
+        self._num_arclength_steps_exceeded += int(steps_exceeded.sum())
 
-            if steps_exceeded:
+        if log_warnings:
+            for s_i in s[steps_exceeded]:
                 self._logger(
                     'Warning: `minimum_arclength()` failed to converge in {} steps... (s_i = {:.4g})\n'
-                    .format(tolerances.MAXIMUM_ARCLENGTH_STEPS, s)
+                    .format(tolerances.MAXIMUM_ARCLENGTH_STEPS, s_i)
                 )
 
-            minimum_arclengths[i] = s, e_r, e_z
+        e_r, e_z = e.T
+        e_i = np.copysign(np.hypot(e_r, e_z), e_r)  # actual residual
 
-            # Set initial guess of next point to result of current point
-            s_initial_guess[r > 0] = s
+        r_s, z_s, φ_s, dr_dB_s, dz_dB_s, dφ_dB_s = profile(s).T
 
-        J = self._calculate_jacobian_row(*minimum_arclengths.T)
-        residuals = np.stack(
-            arrays=(
-                minimum_arclengths[:, 0],
-                np.copysign(np.linalg.norm(minimum_arclengths[:, (1, 2)], axis=1), minimum_arclengths[:, 1])
-            ),
-            axis=1)
+        self._num_solves += profile.num_solves
 
-        return J, residuals
+        r = r_s + e_r
+        z = z_s + e_z
 
-    @overload
-    def _calculate_jacobian_row(self, s: float, e_r: float, e_z: float) -> np.ndarray:
-        """Calculate and return one row of the Jacobian"""
+        jacobian_out[:, :2] = -(e / e_i[:, np.newaxis]) @ rot_matrix  # derivative w.r.t X_0 and Y_0 (apex coordinates)
+        jacobian_out[:, 2] = -(e_r*r_s + e_z*z_s) / (apex_radius * e_i)   # derivative w.r.t. RP (apex radius)
+        jacobian_out[:, 3] = -(e_r*dr_dB_s + e_z*dz_dB_s) / e_i            # derivative w.r.t. Bo  (Bond number)
+        jacobian_out[:, 4] = (e_r*-z + e_z*r) / e_i                        # derivative w.r.t ω (rotational angle)
 
-    @overload
-    def _calculate_jacobian_row(self, s: Iterable[float], e_r: Iterable[float], e_z: Iterable[float]) -> np.ndarray:
-        """Calculate and return many rows of the Jacobian"""
+        residuals_out[:] = e_i
 
-    def _calculate_jacobian_row(self, s, e_r, e_z):
-        try:
-            iter(s)
-        except TypeError:
-            return self._calculate_jacobian_row([s], [e_r], [e_z])[0]
+        return profile, np.column_stack((s, e_i))
 
-        s, e_r, e_z = np.array((s, e_r, e_z))
-        e_i = np.copysign(np.linalg.norm((e_r, e_z), axis=0), e_r)  # actual residual
+    def _guess_arclengths(self, indices: np.ndarray) -> Optional[np.ndarray]:
+        """Return a first guess of the arclengths of the closest points on the profile to the points at `indices`, the
+        known arclength of the nearest point whose arclength is known (the parameters change little between steps), or
+        None if none are known yet. Points are matched by position, so `drop_profile` can be in any order."""
+        if self._known_arclengths is None:
+            return None
 
-        r_s, z_s, φ_s, dr_dB_s, dz_dB_s, dφ_dB_s = self._profile(s).T
+        known_indices, known_arclengths = self._known_arclengths
 
-        r = r_s + e_r
-        z = z_s + e_z
+        if self._known_points_tree is None:
+            self._known_points_tree = sp_spatial.cKDTree(self._drop_profile[known_indices])
 
-        ddei_dxP, ddei_dyP = -self._xy_from_rz(e_r, e_z) / e_i      # derivative w.r.t X_0 and Y_0 (apex coordinates)
-        ddei_dRP = -(e_r*r_s + e_z*z_s) / (self.apex_radius * e_i)  # derivative w.r.t. RP (apex radius)
-        ddei_dBP = -(e_r*dr_dB_s + e_z*dz_dB_s) / e_i               # derivative w.r.t. Bo  (Bond number)
-        ddei_dwP = (e_r*-z + e_z*r) / e_i                           # derivative w.r.t ω (rotational angle)
+        _, nearest = self._known_points_tree.query(self._drop_profile[indices])
 
-        return np.stack((ddei_dxP, ddei_dyP, ddei_dRP, ddei_dBP, ddei_dwP), axis=1)
+        return known_arclengths[nearest]
 
     def _rz_from_xy(self, x: Union[float, Iterable[float]], y: Union[float, Iterable[float]]) -> np.ndarray:
         return self._apex_rot_matrix @ [x, y]
@@ -252,37 +331,40 @@ class YoungLaplaceFit:
 
     @_params.setter
     def _params(self, new_params: Iterable[float]) -> None:
+        self._set_params(new_params)
+
+    def _set_params(self, new_params: Iterable[float],
+                    profile: Optional[equation.YoungLaplaceSolution] = None) -> None:
+        """Set the parameters, and the profile if it has already been generated for them."""
         new_params = self._Params(*new_params)
 
         self._params_ = new_params
 
-        self._update_apex_rot_matrix()
+        self._apex_rot_matrix = _rotation_matrix(self.rotation)
 
         # Generate a new profile when parameters change
-        self._update_profile()
+        if profile is None:
+            profile = equation.YoungLaplaceSolution(self.bond_number, self.apex_radius)
+            num_solves_counted = 0
+        else:
+            num_solves_counted = profile.num_solves
+        self._profile = profile
 
         self._update_volsur()
 
-        self._on_update(self)
-
-    def _update_apex_rot_matrix(self) -> None:
-        ω = self.rotation
-
-        m = np.array([[cos(ω), -sin(ω)],
-                      [sin(ω),  cos(ω)]])
+        self._num_solves += profile.num_solves - num_solves_counted
 
-        self._apex_rot_matrix = m
-
-    def _update_profile(self) -> None:
-        self._profile = equation.YoungLaplaceSolution(self.bond_number, self.apex_radius)
+        self._on_update(self)
 
     def _update_volsur(self) -> None:
         """Update volume and surface area
         """
-        self._volume, self._surface_area = equation.calculate_volsur(self.bond_number, self._profile_size)
+        self._volume, self._surface_area = self._profile.volsur(self._profile_size)
 
-        self._volume *= self.apex_radius**3
-        self._surface_area *= self.apex_radius**2
+    @property
+    def params(self) -> Tuple[float, float, float, float, float]:
+        """The current parameters as (apex_x, apex_y, apex_radius, bond_number, rotation)."""
+        return tuple(self._params)
 
     @property
     def degrees_of_freedom(self) -> int:
@@ -350,6 +432,37 @@ class YoungLaplaceFit:
 
         return normalized
 
+    @property
+    def num_iterations(self) -> int:
+        """Number of Levenberg-Marquardt steps taken (accepted or rejected), over all resolutions."""
+        return self._num_iterations
+
+    @property
+    def num_arclength_steps_exceeded(self) -> int:
+        """Number of closest point searches that gave up after `tolerances.MAXIMUM_ARCLENGTH_STEPS` Newton steps."""
+        return self._num_arclength_steps_exceeded
+
+    @property
+    def num_solves(self) -> int:
+        """Number of times the Young-Laplace equation was integrated, see `YoungLaplaceSolution.num_solves`."""
+        return self._num_solves
+
+    @property
+    def stop_reason(self) -> str:
+        """Why the fit stopped, e.g. 'CONVERGENCE_IN_PARAMETERS', or 'CANCELLED' or 'FAILED'. Empty while it's
+        running."""
+        return self._stop_reason
+
+    @property
+    def optimise_time(self) -> StageTime:
+        """Time spent in the Levenberg-Marquardt iterations (which includes `projection_time`)."""
+        return self._optimise_stopwatch.elapsed
+
+    @property
+    def projection_time(self) -> StageTime:
+        """Time spent finding the closest points on the profile to the points of the drop profile."""
+        return self._projection_stopwatch.elapsed
+
     @property
     def is_done(self) -> bool:
         return self._is_done
@@ -363,6 +476,77 @@ class YoungLaplaceFit:
         self._cancel_flag = True
 
 
+class YoungLaplaceFitSnapshot:
+    """Picklable copy of the state of a `YoungLaplaceFit`, so that progress can be sent back from a worker process.
+    If `profile_samples` is given, `profile_fit` is the fitted profile sampled at `profile_samples` evenly spaced
+    points and `residuals` is a copy of the fit's residuals, otherwise both are None and only the scalars are copied.
+    """
+
+    def __init__(self, fit: YoungLaplaceFit, profile_samples: Optional[int] = None) -> None:
+        self.params = fit.params
+
+        self.apex_x = fit.apex_x
+        self.apex_y = fit.apex_y
+        self.apex_radius = fit.apex_radius
+        self.bond_number = fit.bond_number
+        self.rotation = fit.rotation
+
+        self.profile_fit = None  # type: Optional[np.ndarray]
+        self.residuals = None  # type: Optional[np.ndarray]
+
+        if profile_samples is not None:
+            self.profile_fit = fit(np.linspace(0, 1, num=profile_samples))
+
+            residuals = fit.residuals
+            self.residuals = residuals.copy() if residuals is not None else None
+
+        self.volume = fit.volume
+        self.surface_area = fit.surface_area
+
+        self.num_iterations = fit.num_iterations
+        self.num_arclength_steps_exceeded = fit.num_arclength_steps_exceeded
+        self.num_solves = fit.num_solves
+        self.stop_reason = fit.stop_reason
+        self.optimise_time = fit.optimise_time
+        self.projection_time = fit.projection_time
+
+        self.is_done = fit.is_done
+        self.is_cancelled = fit.is_cancelled
+
+
+class YoungLaplaceFitProgress:
+    """Decides which updates of a running `YoungLaplaceFit` are reported, and how much of the fit each one carries.
+    The fit calls back on every change of its parameters, but updates of a fit that is still running are only
+    reported at most `max_rate` times per second, and only carry scalars unless `detailed` is set (e.g. while someone
+    is looking at the fit). The final update is always reported with the fitted profile and residuals."""
+
+    def __init__(self, profile_samples: int, *, max_rate: Optional[float] = PROGRESS_RATE,
+                 detailed: bool = False) -> None:
+        self.profile_samples = profile_samples
+        self.detailed = detailed
+
+        self._min_interval = 1/max_rate if max_rate is not None else 0
+        self._last_report_time = -math.inf
+
+    def is_due(self, fit: YoungLaplaceFit) -> bool:
+        """Return True if this update of `fit` should be reported."""
+        if fit.is_done:
+            return True
+
+        now = time.monotonic()
+        if now - self._last_report_time < self._min_interval:
+            return False
+
+        self._last_report_time = now
+        return True
+
+    def snapshot(self, fit: YoungLaplaceFit) -> YoungLaplaceFitSnapshot:
+        if fit.is_done or self.detailed:
+            return YoungLaplaceFitSnapshot(fit, self.profile_samples)
+        else:
+            return YoungLaplaceFitSnapshot(fit)
+
+
 class _StopReason(IntEnum):
     CONVERGENCE_IN_PARAMETERS = 1
     CONVERGENCE_IN_GRADIENT = 2
@@ -381,9 +565,48 @@ class _StopReason(IntEnum):
         return ' | '.join(present_flag_names)
 
 
+def _arclength_subsample(profile: np.ndarray, num_points: int) -> np.ndarray:
+    """Return the indices of `num_points` points of `profile` (in any order), spaced evenly in arclength along the
+    drop outline, sorted by y-coordinate."""
+    order = _outline_order(profile)
+    arclength = _cumulative_arclength(profile[order])
+
+    indices = np.searchsorted(arclength, np.linspace(0, arclength[-1], num_points))
+    indices = order[np.unique(np.clip(indices, 0, len(profile) - 1))]
+
+    return indices[profile[indices, 1].argsort()]
+
+
+def _outline_order(profile: np.ndarray) -> np.ndarray:
+    """Return the order of the points of `profile` along the drop outline. Unless the points are already in an order
+    with a shorter path through them (e.g. as extracted), they are sorted by angle about their centroid, starting after
+    the widest gap in angle, where the outline is open (at the needle)."""
+    offsets = profile - profile.mean(axis=0)
+    angles = np.arctan2(offsets[:, 1], offsets[:, 0])
+    radii = np.hypot(offsets[:, 0], offsets[:, 1])
+
+    order = np.lexsort((radii, angles))
+    gaps = np.diff(np.append(angles[order], angles[order[0]] + 2*math.pi))
+    order = np.roll(order, -(gaps.argmax() + 1))
+
+    if _cumulative_arclength(profile)[-1] <= _cumulative_arclength(profile[order])[-1]:
+        return np.arange(len(profile))
+
+    return order
+
+
+def _cumulative_arclength(points: np.ndarray) -> np.ndarray:
+    return np.concatenate(([0], np.cumsum(np.linalg.norm(np.diff(points, axis=0), axis=1))))
+
+
+def _rotation_matrix(ω: float) -> np.ndarray:
+    return np.array([[cos(ω), -sin(ω)],
+                     [sin(ω),  cos(ω)]])
+
+
 # Check for convergence in parameters
-def _convergence_in_parameters(scaled_delta: np.ndarray) -> int:
-    if abs(scaled_delta).max() < tolerances.DELTA_TOL:
+def _convergence_in_parameters(scaled_delta: np.ndarray, tol: float = tolerances.DELTA_TOL) -> int:
+    if abs(scaled_delta).max() < tol:
         return _StopReason.CONVERGENCE_IN_PARAMETERS
 
     return 0
@@ -0,0 +1,441 @@
+"""Run `YoungLaplaceFit`'s in a bounded pool of worker processes, so that fitting many drops at once scales with the
+number of cores instead of being limited by the GIL. A sequence of drops (e.g. the frames of a time series) can also be
+submitted as a batch, which is split into one `YoungLaplaceSequentialFit` per worker instead of one task per drop.
+
+Progress updates and log messages from the workers are sent back through a managed queue and dispatched to the
+callbacks given to `YoungLaplaceFitPool.submit()` on a listener thread in the parent process.
+"""
+
+import functools
+import itertools
+import multiprocessing
+import os
+import threading
+import traceback
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Callable, Iterable, MutableMapping, MutableSequence, Optional, Sequence
+
+import numpy as np
+
+from .fit import PROGRESS_RATE, YoungLaplaceFit, YoungLaplaceFitProgress, YoungLaplaceFitSnapshot
+from .sequential import YoungLaplaceSequentialFit
+
+# Message kinds sent back from the workers.
+_UPDATE = 0
+_LOG = 1
+_DONE = 2
+
+
+class YoungLaplaceFitJob:
+    def __init__(self, job_id: int, cancelled: MutableMapping[int, bool], detailed: MutableMapping[int, bool],
+                 on_update: Callable[[YoungLaplaceFitSnapshot], Any], logger: Callable[[str], Any], *,
+                 batched: bool = False) -> None:
+        self._job_id = job_id
+        self._cancelled = cancelled
+        self._detailed = detailed
+
+        self._on_update = on_update
+        self._logger = logger
+
+        # Jobs of a batch share the future of the worker task that runs them.
+        self._batched = batched
+        self._future = None  # type: Optional[Future]
+
+        # Final state of the fit, sent back by the worker when the job finishes.
+        self._result = None  # type: Optional[YoungLaplaceFitSnapshot]
+        self._has_result = False
+
+        self._finished = threading.Event()
+        self._done_callbacks = []  # type: MutableSequence[Callable[[YoungLaplaceFitJob], Any]]
+        self._lock = threading.Lock()
+
+    # This method will be run on different threads, so make sure it stays thread-safe.
+    def cancel(self) -> None:
+        # Cancelling the future of a batch would cancel the other jobs in it too.
+        if not self._batched and self._future.cancel():
+            return
+
+        # Already running, ask the worker to stop at its next update.
+        try:
+            self._cancelled[self._job_id] = True
+        except (OSError, EOFError):
+            # Manager has shut down.
+            pass
+
+    # This method will be run on different threads, so make sure it stays thread-safe.
+    def set_detailed(self, detailed: bool) -> None:
+        """Set whether progress updates of the running fit carry the fitted profile and residuals (see
+        `YoungLaplaceFitProgress`)."""
+        if self._finished.is_set():
+            return
+
+        try:
+            self._detailed[self._job_id] = detailed
+        except (OSError, EOFError):
+            # Manager has shut down.
+            pass
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the job has finished and all its updates have been dispatched. Return False on timeout."""
+        return self._finished.wait(timeout)
+
+    # This method will be run on different threads, so make sure it stays thread-safe.
+    def add_done_callback(self, fn: Callable[['YoungLaplaceFitJob'], Any]) -> None:
+        """Call `fn` with the job once it has finished and all its updates have been dispatched (on the thread that
+        finishes the job), or straight away if it already has."""
+        with self._lock:
+            if not self._finished.is_set():
+                self._done_callbacks.append(fn)
+                return
+
+        fn(self)
+
+    def _set_finished(self) -> None:
+        with self._lock:
+            self._finished.set()
+            callbacks = tuple(self._done_callbacks)
+            self._done_callbacks.clear()
+
+        for fn in callbacks:
+            try:
+                fn(self)
+            except Exception:
+                traceback.print_exc()
+
+    def result(self) -> Optional[YoungLaplaceFitSnapshot]:
+        """Return the final state of the fit, or None if the job was cancelled before it started. Raises the exception
+        that stopped the worker, if it failed before finishing the job. Only valid once the job has finished."""
+        if self._has_result or self._future.cancelled():
+            return self._result
+
+        self._future.result()
+
+        return None
+
+
+class YoungLaplaceFitPool:
+    def __init__(self, max_workers: Optional[int] = None) -> None:
+        self._max_workers = max_workers
+
+        self._jobs = {}  # type: MutableMapping[int, YoungLaplaceFitJob]
+        self._job_ids = itertools.count()
+
+        # The executor, manager and listener thread are started on first use.
+        self._executor = None  # type: Optional[ProcessPoolExecutor]
+        self._manager = None  # type: Optional[multiprocessing.managers.SyncManager]
+        self._messages = None
+        self._cancelled = None  # type: Optional[MutableMapping[int, bool]]
+        self._detailed = None  # type: Optional[MutableMapping[int, bool]]
+        self._listener = None  # type: Optional[threading.Thread]
+
+        self._lock = threading.Lock()
+
+    @property
+    def max_workers(self) -> int:
+        return self._max_workers or os.cpu_count() or 1
+
+    def _start(self) -> None:
+        # Must be called with the lock held.
+        if self._executor is not None:
+            return
+
+        self._manager = multiprocessing.Manager()
+        self._messages = self._manager.Queue()
+        self._cancelled = self._manager.dict()
+        self._detailed = self._manager.dict()
+
+        self._executor = ProcessPoolExecutor(
+            max_workers=self._max_workers,
+            initializer=_init_worker,
+            initargs=(self._messages, self._cancelled, self._detailed),
+        )
+
+        self._listener = threading.Thread(target=self._listen, args=(self._messages,), daemon=True)
+        self._listener.start()
+
+    # This method will be run on different threads, so make sure it stays thread-safe.
+    def submit(self, drop_profile: np.ndarray, *, initial_params: Optional[Iterable[float]] = None,
+               profile_samples: int, progress_rate: Optional[float] = PROGRESS_RATE, detailed: bool = False,
+               on_update: Optional[Callable[[YoungLaplaceFitSnapshot], Any]] = None,
+               logger: Optional[Callable[[str], Any]] = None) -> YoungLaplaceFitJob:
+        """Submit a fit of `drop_profile`. Its progress is reported to `on_update` as throttled by a
+        `YoungLaplaceFitProgress` with the given `profile_samples`, `progress_rate` and `detailed` arguments."""
+        with self._lock:
+            self._start()
+
+            job_id = next(self._job_ids)
+            job = YoungLaplaceFitJob(
+                job_id=job_id,
+                cancelled=self._cancelled,
+                detailed=self._detailed,
+                on_update=on_update or (lambda x: None),
+                logger=logger or (lambda x: None),
+            )
+            self._jobs[job_id] = job
+
+            if detailed:
+                self._detailed[job_id] = True
+
+            future = self._executor.submit(
+                _run_fit,
+                job_id,
+                drop_profile,
+                tuple(initial_params) if initial_params is not None else None,
+                profile_samples,
+                progress_rate,
+            )
+            job._future = future
+
+        future.add_done_callback(lambda f: self._hdl_future_done((job_id,), f))
+
+        return job
+
+    # This method will be run on different threads, so make sure it stays thread-safe.
+    def submit_batch(self, drop_profiles: Sequence[np.ndarray], *, initial_params: Optional[Iterable[float]] = None,
+                     profile_samples: int, progress_rate: Optional[float] = PROGRESS_RATE, detailed: bool = False,
+                     on_update: Optional[Callable[[int, YoungLaplaceFitSnapshot], Any]] = None,
+                     logger: Optional[Callable[[int, str], Any]] = None) -> Sequence[YoungLaplaceFitJob]:
+        """Submit fits of a sequence of drop profiles, e.g. the frames of a time series, and return a job for each
+        drop. The sequence is split into contiguous runs, one for each worker, which are fitted as a
+        `YoungLaplaceSequentialFit` (each drop warm started from the one before it, the very first from `initial_params`).
+        `on_update` and `logger` are called with the index of the drop as the first argument, the other arguments are
+        the same as for `submit()`."""
+        on_update = on_update or (lambda i, x: None)
+        logger = logger or (lambda i, x: None)
+
+        num_chunks = min(self.max_workers, len(drop_profiles))
+        bounds = np.linspace(0, len(drop_profiles), num_chunks + 1).astype(int)
+
+        jobs = []
+
+        with self._lock:
+            self._start()
+
+            for chunk_start, chunk_stop in zip(bounds[:-1], bounds[1:]):
+                job_ids = []
+
+                for i in range(chunk_start, chunk_stop):
+                    job_id = next(self._job_ids)
+                    job = YoungLaplaceFitJob(
+                        job_id=job_id,
+                        cancelled=self._cancelled,
+                        detailed=self._detailed,
+                        on_update=functools.partial(on_update, i),
+                        logger=functools.partial(logger, i),
+                        batched=True,
+                    )
+                    self._jobs[job_id] = job
+
+                    if detailed:
+                        self._detailed[job_id] = True
+
+                    job_ids.append(job_id)
+                    jobs.append(job)
+
+                future = self._executor.submit(
+                    _run_batch,
+                    tuple(job_ids),
+                    drop_profiles[chunk_start:chunk_stop],
+                    tuple(initial_params) if initial_params is not None and chunk_start == 0 else None,
+                    profile_samples,
+                    progress_rate,
+                )
+
+                for job in jobs[chunk_start:chunk_stop]:
+                    job._future = future
+
+                future.add_done_callback(functools.partial(self._hdl_future_done, tuple(job_ids)))
+
+        return jobs
+
+    def _hdl_future_done(self, job_ids: Sequence[int], future: Future) -> None:
+        # A job that finishes normally is marked finished when its _DONE message arrives, after all of its updates
+        # have been dispatched. Jobs that never ran or whose worker died won't send that message.
+        if not (future.cancelled() or future.exception() is not None):
+            return
+
+        with self._lock:
+            detailed = self._detailed
+            unfinished = [job_id for job_id in job_ids if job_id in self._jobs]
+
+        # The worker didn't get to clean up after the jobs either.
+        try:
+            if detailed is not None:
+                for job_id in unfinished:
+                    detailed.pop(job_id, None)
+        except (OSError, EOFError):
+            # Manager has shut down.
+            pass
+
+        for job_id in unfinished:
+            self._finish(job_id)
+
+    def _finish(self, job_id: int) -> None:
+        with self._lock:
+            job = self._jobs.pop(job_id, None)
+
+        if job is not None:
+            job._set_finished()
+
+    def _listen(self, messages) -> None:
+        while True:
+            try:
+                message = messages.get()
+            except (OSError, EOFError):
+                # Manager has shut down.
+                return
+
+            if message is None:
+                return
+
+            job_id, kind, payload = message
+
+            job = self._jobs.get(job_id)
+            if job is None:
+                continue
+
+            try:
+                if kind == _UPDATE:
+                    job._on_update(payload)
+                elif kind == _LOG:
+                    job._logger(payload)
+                elif kind == _DONE:
+                    job._result = payload
+                    job._has_result = True
+                    self._finish(job_id)
+            except Exception:
+                # Don't let a bad callback take down the listener, the other jobs still need it.
+                traceback.print_exc()
+
+    def shutdown(self) -> None:
+        """Cancel all jobs and stop the worker processes. The pool will start up again if more jobs are submitted."""
+        with self._lock:
+            if self._executor is None:
+                return
+
+            executor, manager, messages, listener = self._executor, self._manager, self._messages, self._listener
+            jobs = tuple(self._jobs.values())
+
+            self._executor = None
+            self._manager = None
+            self._messages = None
+            self._cancelled = None
+            self._detailed = None
+            self._listener = None
+
+        # Release the lock first, done callbacks of the futures need it while the executor shuts down.
+        for job in jobs:
+            job.cancel()
+
+        executor.shutdown(wait=True)
+        messages.put(None)
+        listener.join()
+        manager.shutdown()
+
+        for job in jobs:
+            self._finish(job._job_id)
+
+
+# Proxies of the pool's managed queue and dicts, set once in each worker process by _init_worker().
+_messages = None
+_cancelled = None  # type: Optional[MutableMapping[int, bool]]
+_detailed = None  # type: Optional[MutableMapping[int, bool]]
+
+
+# Runs in a worker process.
+def _init_worker(messages, cancelled: MutableMapping[int, bool], detailed: MutableMapping[int, bool]) -> None:
+    # The proxies are kept for the life of the worker instead of being sent with every task. Proxies of the same
+    # manager share a connection, which is closed once they have all been garbage collected. With new proxies for each
+    # task, the last task's proxies could be collected in the middle of a call made through the current task's ones.
+    global _messages, _cancelled, _detailed
+    _messages, _cancelled, _detailed = messages, cancelled, detailed
+
+
+# Runs in a worker process.
+def _run_fit(job_id: int, drop_profile: np.ndarray, initial_params: Optional[Iterable[float]], profile_samples: int,
+             progress_rate: Optional[float]) -> None:
+    messages, cancelled, detailed = _messages, _cancelled, _detailed
+
+    progress = YoungLaplaceFitProgress(profile_samples, max_rate=progress_rate)
+
+    def on_update(fit: YoungLaplaceFit) -> None:
+        if cancelled.get(job_id, False):
+            fit.cancel()
+
+        if not progress.is_due(fit):
+            return
+
+        progress.detailed = detailed.get(job_id, False)
+        messages.put((job_id, _UPDATE, progress.snapshot(fit)))
+
+    def logger(message: str) -> None:
+        messages.put((job_id, _LOG, message))
+
+    result = None
+
+    try:
+        fit = YoungLaplaceFit(
+            drop_profile=drop_profile,
+            initial_params=initial_params,
+            on_update=on_update,
+            logger=logger,
+        )
+
+        result = YoungLaplaceFitSnapshot(fit, profile_samples)
+    finally:
+        cancelled.pop(job_id, None)
+        detailed.pop(job_id, None)
+        messages.put((job_id, _DONE, result))
+
+
+# Runs in a worker process.
+def _run_batch(job_ids: Sequence[int], drop_profiles: Sequence[np.ndarray], initial_params: Optional[Iterable[float]],
+               profile_samples: int, progress_rate: Optional[float]) -> None:
+    messages, cancelled, detailed = _messages, _cancelled, _detailed
+
+    progresses = [YoungLaplaceFitProgress(profile_samples, max_rate=progress_rate) for _ in job_ids]
+    finished = set()
+
+    def finish(index: int, result: Optional[YoungLaplaceFitSnapshot]) -> None:
+        job_id = job_ids[index]
+
+        cancelled.pop(job_id, None)
+        detailed.pop(job_id, None)
+        messages.put((job_id, _DONE, result))
+
+        finished.add(index)
+
+    def on_update(index: int, fit: YoungLaplaceFit) -> None:
+        progress = progresses[index]
+
+        if not progress.is_due(fit):
+            return
+
+        job_id = job_ids[index]
+        progress.detailed = detailed.get(job_id, False)
+        snapshot = progress.snapshot(fit)
+        messages.put((job_id, _UPDATE, snapshot))
+
+        # Let each drop finish as soon as it's done, not when the whole batch is.
+        if fit.is_done:
+            finish(index, snapshot)
+
+    def logger(index: int, message: str) -> None:
+        messages.put((job_ids[index], _LOG, message))
+
+    def is_cancelled(index: int) -> bool:
+        return cancelled.get(job_ids[index], False)
+
+    try:
+        YoungLaplaceSequentialFit(
+            drop_profiles,
+            initial_params=initial_params,
+            on_update=on_update,
+            logger=logger,
+            is_cancelled=is_cancelled,
+        )
+    finally:
+        # Drops that were skipped or failed.
+        for index in range(len(job_ids)):
+            if index not in finished:
+                finish(index, None)
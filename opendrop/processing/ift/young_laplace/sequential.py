@@ -0,0 +1,74 @@
+import io
+import math
+import traceback
+from typing import Any, Callable, Iterable, MutableSequence, Optional, Sequence
+
+import numpy as np
+
+from .fit import YoungLaplaceFit
+
+
+class YoungLaplaceSequentialFit:
+    """Fits a sequence of drop profiles (e.g. the frames of a time series) one after the other, each warm started from
+    the result of the last one that was fitted successfully, the first from `initial_params` if given.
+
+    The drops aren't evaluated together as one stacked problem: each has its own Bond number, so its own solution of
+    the Young-Laplace equation and closest points on it, and the work for a single drop is already vectorised over its
+    points. What fitting them in sequence saves is steps, since consecutive drops change little.
+
+    Each drop has its own `YoungLaplaceFit`, `on_update` and `logger` are called with the index of the drop as the
+    first argument. Drops are cancelled individually, `is_cancelled(index)` is checked before each drop is started
+    (cancelled drops are skipped) and on every update of its fit (which is then cancelled)."""
+
+    def __init__(self, drop_profiles: Sequence[np.ndarray], *,
+                 initial_params: Optional[Iterable[float]] = None,
+                 on_update: Optional[Callable[[int, YoungLaplaceFit], Any]] = None,
+                 logger: Optional[Callable[[int, str], Any]] = None,
+                 is_cancelled: Optional[Callable[[int], bool]] = None) -> None:
+        self._drop_profiles = drop_profiles
+        self._initial_params = tuple(initial_params) if initial_params is not None else None
+
+        self._on_update = on_update or (lambda i, x: None)
+        self._logger = logger or (lambda i, x: None)
+        self._is_cancelled = is_cancelled or (lambda i: False)
+
+        self._fits = [None] * len(drop_profiles)  # type: MutableSequence[Optional[YoungLaplaceFit]]
+
+        self._fit()
+
+    def _fit(self) -> None:
+        initial_params = self._initial_params
+
+        for i, drop_profile in enumerate(self._drop_profiles):
+            if self._is_cancelled(i):
+                continue
+
+            try:
+                fit = YoungLaplaceFit(
+                    drop_profile,
+                    initial_params=initial_params,
+                    on_update=lambda fit, i=i: self._hdl_fit_update(i, fit),
+                    logger=lambda message, i=i: self._logger(i, message),
+                )
+            except Exception as exc:
+                # Don't let one bad drop profile stop the rest of the sequence.
+                buffer = io.StringIO()
+                traceback.print_exception(type(exc), exc, tb=exc.__traceback__, file=buffer)
+                self._logger(i, '\n{}'.format(buffer.getvalue()))
+                continue
+
+            self._fits[i] = fit
+
+            if not fit.is_cancelled and math.isfinite(fit.bond_number):
+                initial_params = fit.params
+
+    def _hdl_fit_update(self, index: int, fit: YoungLaplaceFit) -> None:
+        if self._is_cancelled(index):
+            fit.cancel()
+
+        self._on_update(index, fit)
+
+    @property
+    def fits(self) -> Sequence[Optional[YoungLaplaceFit]]:
+        """The fit of each drop, or None for drops that were skipped (cancelled before they started, or failed)."""
+        return tuple(self._fits)
@@ -4,3 +4,11 @@ OBJECTIVE_TOL           = 1.e-4
 ARCLENGTH_TOL           = 1.e-6
 MAXIMUM_FITTING_STEPS   = 10
 MAXIMUM_ARCLENGTH_STEPS = 10
+
+# Coarse-to-fine schedule, the number of points fitted at each resolution before moving on to the full drop profile.
+# The points are sampled uniformly in arclength along the profile, and resolutions with more than half as many points
+# as the full profile are skipped. Empty to always fit the full profile. MAXIMUM_FITTING_STEPS counts the steps taken
+# at all resolutions together.
+RESOLUTION_SCHEDULE     = (200, 800)
+# Coarser resolutions move on to the next one once the parameters change by less than this (relative) in a step.
+RESOLUTION_DELTA_TOL    = 1.e-3
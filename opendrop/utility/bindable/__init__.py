@@ -1,4 +1,4 @@
 from .apply import apply
-from .bindable import Bindable, BoxBindable, AccessorBindable
+from .bindable import Bindable, BoxBindable, AccessorBindable, array_equality_check
 from .binding import Binding
 from .util import thread_safe_bindable_collection
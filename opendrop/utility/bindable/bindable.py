@@ -8,8 +8,15 @@ from opendrop.utility.events import Event
 
 _T = TypeVar('_T')
 
+# Number of elements, spread evenly through two arrays, that array_equality_check() compares before comparing the whole
+# arrays. Arrays that differ (e.g. two different frames) are then usually told apart without reading all of both.
+ARRAY_SAMPLE_SIZE = 1024
+
 
 def _general_purpose_equality_check(x: Any, y: Any) -> bool:
+    if x is y:
+        return True
+
     try:
         return np.allclose(x, y, atol=0, equal_nan=True)
     except (ValueError, TypeError):
@@ -20,6 +27,63 @@ def _general_purpose_equality_check(x: Any, y: Any) -> bool:
         return np.array_equal(x, y)
 
 
+def array_equality_check(x: Any, y: Any) -> bool:
+    """Equality check for bindables that hold large arrays (images, edge maps, drop profiles) or tuples of them. Cheap
+    checks are done first: the same object, or a view of the same memory, is always equal, and arrays of a different
+    shape or dtype never are. Then a sample of ARRAY_SAMPLE_SIZE elements is compared, which tells most different arrays
+    apart. Only arrays that pass all of these are compared in full, byte by byte, which is much faster than the
+    element-wise `np.allclose()` of the general purpose check.
+
+    Two arrays of floats that differ only in the sign of a zero or the payload of a NaN compare as not equal, which at
+    worst fires an unneeded change notification."""
+    if x is y:
+        return True
+
+    if isinstance(x, np.ndarray) and isinstance(y, np.ndarray):
+        if x.shape != y.shape or x.dtype != y.dtype:
+            return False
+
+        if x.dtype.hasobject:
+            return _general_purpose_equality_check(x, y)
+
+        if _is_same_memory(x, y):
+            return True
+
+        if not _samples_equal(x, y):
+            return False
+
+        return np.array_equal(_as_bytes(x), _as_bytes(y))
+
+    if isinstance(x, tuple) and isinstance(y, tuple):
+        return len(x) == len(y) and all(map(array_equality_check, x, y))
+
+    if isinstance(x, np.ndarray) or isinstance(y, np.ndarray):
+        # Only one of them is an array, e.g. None and an array.
+        return False
+
+    return _general_purpose_equality_check(x, y)
+
+
+def _as_bytes(x: np.ndarray) -> np.ndarray:
+    return np.ascontiguousarray(x).reshape(-1).view(np.uint8)
+
+
+def _is_same_memory(x: np.ndarray, y: np.ndarray) -> bool:
+    """Return True if `x` and `y` (of the same shape and dtype) are views of exactly the same elements in memory."""
+    return x.__array_interface__['data'][0] == y.__array_interface__['data'][0] and x.strides == y.strides
+
+
+def _samples_equal(x: np.ndarray, y: np.ndarray) -> bool:
+    """Return False if `x` and `y` (of the same shape and dtype) differ at any of ARRAY_SAMPLE_SIZE evenly spaced
+    elements. Returns True for small arrays, which may as well be compared in full."""
+    if x.size <= ARRAY_SAMPLE_SIZE:
+        return True
+
+    indices = np.linspace(0, x.size - 1, ARRAY_SAMPLE_SIZE).astype(np.intp)
+
+    return np.array_equal(_as_bytes(x.flat[indices]), _as_bytes(y.flat[indices]))
+
+
 class Bindable(Generic[_T]):
     def __init__(self, check_equals: Callable[[_T, _T], bool] = _general_purpose_equality_check) -> None:
         self.on_changed = Event()
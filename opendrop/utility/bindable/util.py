@@ -1,9 +1,80 @@
 import asyncio
+import math
 import threading
-from typing import Any, Iterable, Callable, Optional, Container
+import weakref
+from collections import OrderedDict
+from typing import Any, Iterable, Callable, Optional, Container, MutableMapping
 
 from opendrop.utility.bindable import AccessorBindable
 
+# Maximum number of times per second that changes committed to ThreadSafeBindableCollection's are notified on the
+# event loop.
+MAX_UPDATE_RATE = 30
+
+
+class ChangeNotifier:
+    """Pokes bindables on an event loop on behalf of other threads. Bindables notified before the loop gets around to
+    poking them are poked only once, and all the bindables notified in the meantime are poked in a single callback, so
+    many threads committing changes in quick succession don't flood the loop. Callbacks are also run at most
+    `max_rate` times per second on each loop (if `max_rate` is not None). A bindable's getter returns its latest value,
+    so the values seen when the bindables are poked are the latest ones."""
+
+    def __init__(self, max_rate: Optional[float] = MAX_UPDATE_RATE) -> None:
+        self._min_interval = 1/max_rate if max_rate is not None else 0
+
+        # Bindables waiting to be poked on each loop, the inner mappings are used as ordered sets.
+        self._pending = {}  # type: MutableMapping[asyncio.AbstractEventLoop, MutableMapping[AccessorBindable, None]]
+        self._dispatch_times = weakref.WeakKeyDictionary()  # type: MutableMapping[asyncio.AbstractEventLoop, float]
+        self._lock = threading.Lock()
+
+    # This method will be run on different threads, so make sure it stays thread-safe.
+    def notify(self, loop: asyncio.AbstractEventLoop, bindables: Iterable[AccessorBindable]) -> None:
+        with self._lock:
+            pending = self._pending.get(loop)
+            is_scheduled = pending is not None
+            if not is_scheduled:
+                pending = OrderedDict()
+                self._pending[loop] = pending
+
+            pending.update((bn, None) for bn in bindables)
+
+        if is_scheduled:
+            return
+
+        try:
+            loop.call_soon_threadsafe(self._dispatch, loop)
+        except RuntimeError:
+            # Event loop has been closed.
+            with self._lock:
+                del self._pending[loop]
+            raise
+
+    def _dispatch(self, loop: asyncio.AbstractEventLoop) -> None:
+        last_dispatch_time = self._dispatch_times.get(loop, -math.inf)
+        delay = last_dispatch_time + self._min_interval - loop.time()
+        if delay > 0:
+            loop.call_later(delay, self._dispatch, loop)
+            return
+
+        self.flush(loop)
+
+    def flush(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Poke the bindables waiting to be poked on `loop` right away. Must be called on the thread running `loop`."""
+        with self._lock:
+            pending = self._pending.pop(loop, None)
+
+        if pending is None:
+            return
+
+        self._dispatch_times[loop] = loop.time()
+
+        for bn in pending:
+            bn.poke()
+
+
+# ChangeNotifier shared by all ThreadSafeBindableCollection's by default.
+change_notifier = ChangeNotifier()
+
 
 class ThreadSafeBindableCollection:
     _fields = tuple()
@@ -29,9 +100,12 @@ class ThreadSafeBindableCollection:
         def discard(self) -> None:
             self._do_discard()
 
-    # The `_loop` parameter is preceded by an underscore to avoid naming conflicts with initial values.
-    def __init__(self, *, _loop: Optional[asyncio.AbstractEventLoop] = None, **initial_values) -> None:
+    # The `_loop` and `_notifier` parameters are preceded by an underscore to avoid naming conflicts with initial
+    # values.
+    def __init__(self, *, _loop: Optional[asyncio.AbstractEventLoop] = None,
+                 _notifier: Optional[ChangeNotifier] = None, **initial_values) -> None:
         self._loop = _loop or asyncio.get_event_loop()
+        self._notifier = _notifier if _notifier is not None else change_notifier
 
         self._accessors = {
             name: AccessorBindable(getter=lambda name=name: self._get_value(name))
@@ -70,10 +144,7 @@ class ThreadSafeBindableCollection:
 
         self._release_editor()
 
-        def do_pokes():
-            for name in changed:
-                getattr(self, name).poke()
-        self._loop.call_soon_threadsafe(do_pokes)
+        self._notifier.notify(self._loop, (self._accessors[name] for name in changed))
 
     def _discard_edit(self) -> None:
         editor = self._editor
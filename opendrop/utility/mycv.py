@@ -1,5 +1,7 @@
 # Some computer vision related functions
 
+from typing import Optional, Tuple
+
 import cv2
 import numpy as np
 
@@ -30,7 +32,8 @@ def find_contours(image):
         # modified image as the first, of the three, return values.
         _, contours, hierarchy = cv2.findContours(image, cv2.RETR_LIST, cv2.CHAIN_APPROX_TC89_KCOS)
     else:
-        contours, hierarchy = cv2.findContours(image, cv2.RETR_LIST, cv2.CHAIN_APPROX_TC89_KCOS)
+        # Older versions modify the passed image.
+        contours, hierarchy = cv2.findContours(image.copy(), cv2.RETR_LIST, cv2.CHAIN_APPROX_TC89_KCOS)
 
     # Each contour has shape (n, 1, 2) where 'n' is the number of points. Presumably this is so each
     # point is a size 2 column vector, we don't want this so reshape it to a (n, 2)
@@ -42,8 +45,120 @@ def find_contours(image):
     return contours
 
 
-# todo: add documentation
-def squish_contour(contour: np.ndarray) -> np.ndarray:
+# Contour ordering methods accepted by squish_contour().
+SQUISH_MERGE = 'merge'
+SQUISH_GREEDY = 'greedy'
+
+# A contour point where the direction turns back by more than this angle (cosine of the angle between the incoming
+# and outgoing segments below this value) may be one of the ends of a traced edge.
+_TURNAROUND_COS = -0.5
+
+
+def squish_contour(contour: np.ndarray, method: str = SQUISH_MERGE) -> np.ndarray:
+    """
+        Reorder the points of a closed contour returned by find_contours() into an open polyline.
+
+        When cv2.findContours() traces a one pixel wide edge (e.g. from Canny edge detection), it goes along one side
+        of the edge and comes back along the other, so consecutive points of the traced edge end up on opposite halves
+        of the contour. The returned polyline visits the points in their order along the edge, from one end to the
+        other, and is the shorter (in L1 length) of that and the contour cut open at its largest gap.
+
+        `method` is SQUISH_MERGE (default), which runs in O(n log n), or SQUISH_GREEDY, the original implementation
+        which inserts points one at a time and is roughly cubic in the number of points.
+    """
+    if method == SQUISH_MERGE:
+        return _squish_contour_merge(contour)
+    elif method == SQUISH_GREEDY:
+        return _squish_contour_greedy(contour)
+    else:
+        raise ValueError("Unknown method '{}'".format(method))
+
+
+def _squish_contour_merge(contour: np.ndarray) -> np.ndarray:
+    if len(contour) < 3:
+        return contour.copy()
+
+    loop = _realign_squished_contour(contour)
+
+    ends = _find_traced_edge_ends(contour)
+    if ends is None:
+        return loop
+
+    start, stop = ends
+
+    # The two passes along the edge, both going from `start` to `stop`.
+    rolled = np.roll(contour, shift=-start, axis=0)
+    stop = (stop - start) % len(contour)
+    out_pass = rolled[:stop + 1]
+    back_pass = np.flipud(np.concatenate((rolled[stop:], rolled[:1])))
+
+    # Interleave the passes by how far along the edge each point is. A stable sort keeps the order within each pass.
+    position = np.concatenate((_normalized_arclength(out_pass), _normalized_arclength(back_pass)))
+    merged = np.concatenate((out_pass, back_pass))[np.argsort(position, kind='mergesort')]
+
+    # The end points were included in both passes.
+    merged = merged[1:-1]
+
+    # Keep the same direction as the original contour.
+    if abs(merged[-1] - contour[0]).sum() < abs(merged[0] - contour[0]).sum():
+        merged = np.flipud(merged)
+
+    if _polyline_l1(loop, idx=slice(None)) < _polyline_l1(merged, idx=slice(None)):
+        # Contour doesn't double back on itself, e.g. the boundary of a filled region.
+        return loop
+
+    return merged
+
+
+def _find_traced_edge_ends(contour: np.ndarray) -> Optional[Tuple[int, int]]:
+    """Return the indices of the two points where `contour` most likely turns around at the ends of a traced edge, or
+    None if there are no such points."""
+    contour = contour.astype(float)
+
+    incoming = contour - np.roll(contour, shift=1, axis=0)
+    outgoing = np.roll(incoming, shift=-1, axis=0)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cos = (incoming * outgoing).sum(axis=1) \
+              / (np.linalg.norm(incoming, axis=1) * np.linalg.norm(outgoing, axis=1))
+
+    candidates = np.flatnonzero(cos < _TURNAROUND_COS)
+    if len(candidates) < 2:
+        return None
+
+    # The ends of the edge split the contour into two passes of roughly the same length, while the tips of any short
+    # spurs off the edge are close to each other along the contour. Pick the pair of candidates that are the furthest
+    # apart along the (closed) contour.
+    arclength = np.concatenate(([0], np.cumsum(np.linalg.norm(outgoing, axis=1))))
+    perimeter = arclength[-1]
+    position = arclength[candidates]
+
+    # For each candidate, find the other candidate closest to the opposite side of the contour.
+    opposite = (position + perimeter/2) % perimeter
+    order = np.argsort(position)
+    i = np.searchsorted(position[order], opposite) % len(candidates)
+    i = np.stack((order[i], order[i - 1]))
+
+    separation = abs(position[i] - position)
+    separation = np.minimum(separation, perimeter - separation)
+
+    best = np.unravel_index(separation.argmax(), separation.shape)
+    a, b = sorted((candidates[best[1]], candidates[i[best]]))
+    if a == b:
+        return None
+
+    return a, b
+
+
+def _normalized_arclength(polyline: np.ndarray) -> np.ndarray:
+    arclength = np.concatenate(([0], np.cumsum(np.linalg.norm(np.diff(polyline, axis=0), axis=1))))
+    if arclength[-1] == 0:
+        return arclength
+
+    return arclength/arclength[-1]
+
+
+def _squish_contour_greedy(contour: np.ndarray) -> np.ndarray:
     contour = _squish_contour_one_way(contour)
     contour = _squish_contour_one_way(np.flipud(contour))
     contour = np.flipud(contour)
@@ -0,0 +1,157 @@
+import heapq
+import itertools
+import os
+import threading
+import traceback
+from typing import Any, Callable, Hashable, MutableMapping, MutableSequence, Optional, Tuple
+
+# Priorities of scheduled tasks, tasks with a higher priority are run first.
+PRIORITY_DEFAULT = 0
+# For work done ahead of time that nobody is waiting on yet, e.g. reading the images next to the one being shown.
+PRIORITY_BACKGROUND = -10
+# For work whose result is being shown to the user, e.g. the preview image or the selected drop.
+PRIORITY_FOREGROUND = 10
+
+
+def _default_max_workers() -> int:
+    # Same default as concurrent.futures.ThreadPoolExecutor. Some tasks spend most of their time waiting (e.g. on a
+    # fit running in another process), so allow a few more threads than there are cores.
+    return min(32, (os.cpu_count() or 1) + 4)
+
+
+class UpdateScheduler:
+    """Runs tasks on a fixed number of worker threads, shared by everything that does work in the background (see
+    `UpdaterWorker`).
+
+    Tasks are identified by a key. Submitting a task whose key is already waiting to run just updates it, and
+    submitting one whose key is currently running makes it run once more after it finishes, so a task never runs on
+    two threads at once and repeated updates are coalesced. Waiting tasks are run in order of priority, then in the
+    order they were submitted."""
+
+    class _Task:
+        def __init__(self, key: Hashable, fn: Callable[[], Any], priority: int,
+                     on_done: Optional[Callable[[], Any]]) -> None:
+            self.key = key
+            self.fn = fn
+            self.priority = priority
+            self.on_done = on_done
+
+            # Sequence number of the task's current entry in the queue, or None if it's running.
+            self.entry = None  # type: Optional[int]
+            self.rerun = False
+
+    def __init__(self, max_workers: Optional[int] = None) -> None:
+        self._max_workers = max_workers or _default_max_workers()
+
+        self._tasks = {}  # type: MutableMapping[Hashable, UpdateScheduler._Task]
+        self._queue = []  # type: MutableSequence[Tuple[int, int, Hashable]]
+        self._seq = itertools.count()
+
+        self._workers = []  # type: MutableSequence[threading.Thread]
+        self._num_idle_workers = 0
+
+        self._cond = threading.Condition()
+
+    @property
+    def max_workers(self) -> int:
+        return self._max_workers
+
+    # This method will be run on different threads, so make sure it stays thread-safe.
+    def submit(self, key: Hashable, fn: Callable[[], Any], *, priority: int = PRIORITY_DEFAULT,
+               on_done: Optional[Callable[[], Any]] = None) -> None:
+        """Schedule `fn` to be run. `on_done` is called on the worker thread once the task has run and no more runs
+        for `key` are scheduled."""
+        with self._cond:
+            task = self._tasks.get(key)
+
+            if task is None:
+                task = self._Task(key, fn, priority, on_done)
+                self._tasks[key] = task
+                self._enqueue(task)
+                return
+
+            task.fn = fn
+            task.on_done = on_done
+
+            if task.entry is None:
+                # Currently running, run again afterwards.
+                task.rerun = True
+                task.priority = priority
+            elif task.priority != priority:
+                task.priority = priority
+                self._enqueue(task)
+
+    # This method will be run on different threads, so make sure it stays thread-safe.
+    def set_priority(self, key: Hashable, priority: int) -> None:
+        with self._cond:
+            task = self._tasks.get(key)
+            if task is None or task.priority == priority:
+                return
+
+            task.priority = priority
+            if task.entry is not None:
+                self._enqueue(task)
+
+    def is_scheduled(self, key: Hashable) -> bool:
+        """Return True if a task for `key` is waiting to run or running."""
+        with self._cond:
+            return key in self._tasks
+
+    # Must be called with the lock held. A task's older entries left in the queue are skipped when popped.
+    def _enqueue(self, task: _Task) -> None:
+        task.entry = next(self._seq)
+        heapq.heappush(self._queue, (-task.priority, task.entry, task.key))
+
+        if self._num_idle_workers > 0:
+            # Wake up an idle worker, and don't count it as idle anymore so the next task wakes up another one.
+            self._num_idle_workers -= 1
+            self._cond.notify()
+        elif len(self._workers) < self._max_workers:
+            worker = threading.Thread(target=self._work, daemon=True)
+            self._workers.append(worker)
+            worker.start()
+
+    # Must be called with the lock held.
+    def _dequeue(self) -> _Task:
+        while True:
+            while not self._queue:
+                self._num_idle_workers += 1
+                self._cond.wait()
+
+            _, entry, key = heapq.heappop(self._queue)
+
+            task = self._tasks.get(key)
+            if task is None or task.entry != entry:
+                # Stale entry.
+                continue
+
+            task.entry = None
+            return task
+
+    def _work(self) -> None:
+        while True:
+            with self._cond:
+                task = self._dequeue()
+                fn = task.fn
+
+            try:
+                fn()
+            except Exception:
+                # Don't let a failed task take down the worker, the other tasks still need it.
+                traceback.print_exc()
+
+            with self._cond:
+                if task.rerun:
+                    task.rerun = False
+                    self._enqueue(task)
+                    continue
+
+                del self._tasks[task.key]
+                on_done = task.on_done
+
+            if on_done is not None:
+                on_done()
+
+
+# Scheduler shared by all UpdaterWorker's by default.
+update_scheduler = UpdateScheduler()
@@ -0,0 +1,87 @@
+import math
+from typing import Hashable, MutableMapping, Tuple
+
+import numpy as np
+
+
+class TimeSeries:
+    """Points (t, y) sorted in ascending order of t, each belonging to a key (e.g. the analysis it was measured from),
+    so that one point can be added, moved or removed without rebuilding the whole series.
+
+    The arrays returned by `get_data()` are never modified afterwards, changes replace them with new arrays instead, so
+    they can be handed out (e.g. to a plot) without copying."""
+
+    def __init__(self) -> None:
+        self._t = _readonly(np.empty(0))
+        self._y = _readonly(np.empty(0))
+        self._keys = []
+
+        self._points = {}  # type: MutableMapping[Hashable, Tuple[float, float]]
+
+    def set(self, key: Hashable, t: float, y: float) -> bool:
+        """Set the point of `key` to (t, y), or remove it if either is None or not finite. Return True if the series
+        changed."""
+        if t is None or y is None or not (math.isfinite(t) and math.isfinite(y)):
+            return self.discard(key)
+
+        point = self._points.get(key)
+        if point == (t, y):
+            return False
+
+        if point is not None and point[0] == t:
+            # Only the value changed, the point stays where it is.
+            index = self._index_of(key, t)
+            new_y = self._y.copy()
+            new_y[index] = y
+            self._y = _readonly(new_y)
+        else:
+            if point is not None:
+                self._remove(key, point[0])
+
+            index = int(np.searchsorted(self._t, t, side='right'))
+            self._t = _readonly(np.insert(self._t, index, t))
+            self._y = _readonly(np.insert(self._y, index, y))
+            self._keys.insert(index, key)
+
+        self._points[key] = (t, y)
+
+        return True
+
+    def discard(self, key: Hashable) -> bool:
+        """Remove the point of `key`, if there is one. Return True if the series changed."""
+        point = self._points.pop(key, None)
+        if point is None:
+            return False
+
+        self._remove(key, point[0])
+
+        return True
+
+    def _remove(self, key: Hashable, t: float) -> None:
+        index = self._index_of(key, t)
+
+        self._t = _readonly(np.delete(self._t, index))
+        self._y = _readonly(np.delete(self._y, index))
+        del self._keys[index]
+
+    def _index_of(self, key: Hashable, t: float) -> int:
+        # Search the points with the same t for the one belonging to `key`.
+        start = int(np.searchsorted(self._t, t, side='left'))
+        stop = int(np.searchsorted(self._t, t, side='right'))
+
+        for index in range(start, stop):
+            if self._keys[index] == key:
+                return index
+
+        raise ValueError("No point found for key '{}'".format(key))
+
+    def get_data(self) -> Tuple[np.ndarray, np.ndarray]:
+        return self._t, self._y
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+
+def _readonly(x: np.ndarray) -> np.ndarray:
+    x.flags.writeable = False
+    return x
@@ -0,0 +1,41 @@
+import math
+import time
+from typing import NamedTuple
+
+# CPU time of the calling thread, so that a stage's CPU time isn't inflated by other threads working at the same time.
+# Falls back to the CPU time of the whole process where per-thread times aren't available.
+_cpu_time = getattr(time, 'thread_time', time.process_time)
+
+
+class StageTime(NamedTuple('StageTime', [('wall', float), ('cpu', float)])):
+    """Wall clock and CPU time (in seconds) spent in a stage of processing."""
+
+
+# Time of a stage that hasn't been run (or wasn't timed).
+NOT_TIMED = StageTime(math.nan, math.nan)
+
+
+class Stopwatch:
+    """Measures the wall clock and CPU time spent in `with` blocks. Times add up over repeated uses, e.g. to time every
+    call of something that is called many times. The CPU time is that of the thread the block runs on, so a stopwatch
+    shouldn't be used on more than one thread at once."""
+
+    def __init__(self) -> None:
+        self._wall = 0.0
+        self._cpu = 0.0
+
+        self._start_wall = math.nan
+        self._start_cpu = math.nan
+
+    def __enter__(self) -> 'Stopwatch':
+        self._start_wall = time.perf_counter()
+        self._start_cpu = _cpu_time()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._wall += time.perf_counter() - self._start_wall
+        self._cpu += _cpu_time() - self._start_cpu
+
+    @property
+    def elapsed(self) -> StageTime:
+        return StageTime(self._wall, self._cpu)
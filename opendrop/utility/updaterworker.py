@@ -1,93 +1,66 @@
 import asyncio
-import threading
 from typing import Callable, Any, Optional
 
+from .bindable.util import ChangeNotifier, change_notifier as shared_change_notifier
+from .scheduler import UpdateScheduler, update_scheduler, PRIORITY_DEFAULT
+
 
 class UpdaterWorker:
-    class _WorkerThread(threading.Thread):
-        def __init__(self, do_update: Callable[[], Any], do_shutdown: Callable[[], Any]) -> None:
-            super().__init__()
-            self._do_update = do_update
-            self._do_shutdown = do_shutdown
-
-            self._keep_alive = threading.Event()
-            self._is_dying = threading.Event()
-            self._busy = threading.Lock()
-
-        def run(self) -> None:
-            while True:
-                self._keep_alive.clear()
-                self._do_update()
-                with self._busy:
-                    if not self._keep_alive.is_set():
-                        self._is_dying.set()
-                        self._do_shutdown()
-                        break
-
-        def keep_alive(self) -> bool:
-            with self._busy:
-                if self._is_dying.is_set():
-                    return False
-
-                self._keep_alive.set()
-                return True
+    """Runs `do_update` in the background whenever an update is queued. Updates queued while one is already waiting or
+    running are coalesced into one more run. `on_idle` is called on the event loop once there are no more updates to
+    run, after the changes committed to ThreadSafeBindableCollection's (through `notifier`) have been notified.
+
+    Updates are run by an `UpdateScheduler` (by default, the one shared by the whole application), so the number of
+    threads stays bounded no matter how many workers there are."""
 
     def __init__(self, do_update: Callable[[], Any], on_idle: Callable[[], Any], *,
-                 loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
+                 priority: int = PRIORITY_DEFAULT, scheduler: Optional[UpdateScheduler] = None,
+                 notifier: Optional[ChangeNotifier] = None, loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
         self._loop = loop or asyncio.get_event_loop()
+        self._scheduler = scheduler if scheduler is not None else update_scheduler
+        self._notifier = notifier if notifier is not None else shared_change_notifier
 
         self._do_update = do_update
 
         self._on_idle = on_idle
 
-        self._worker = None  # type: self._WorkerThread
-        self._invoke_idle_handler_handle = None  # type: asyncio.Handle
+        self._priority = priority
+        self._invoke_idle_handler_handle = None  # type: Optional[asyncio.Handle]
 
     # Must be called on the main thread.
     def queue_update(self) -> None:
-        if self._worker is None:
-            self._spawn_worker()
-            return
-
-        kept_alive = self._keep_worker_alive()
-        if kept_alive:
-            return
-
-        self._shutdown_worker()
-        self.queue_update()
-
-    def _spawn_worker(self) -> None:
-        assert self._worker is None
-
         if self._invoke_idle_handler_handle is not None:
             self._invoke_idle_handler_handle.cancel()
             self._invoke_idle_handler_handle = None
 
-        self._worker = self._WorkerThread(do_update=self._do_update, do_shutdown=self._shutdown_worker)
-
-        self._worker.start()
-
-    def _keep_worker_alive(self) -> bool:
-        assert self._worker is not None
-        return self._worker.keep_alive()
-
-    # This method will be run on different threads (could be called by _WorkerThread), so make sure it stays
-    # thread-safe.
-    def _shutdown_worker(self) -> None:
-        assert self._worker is not None
-
-        if threading.current_thread() is not self._worker:
-            self._worker.join()
-
-        self._worker = None
+        self._scheduler.submit(self, self._do_update, priority=self._priority, on_done=self._hdl_done)
 
+    # This method will be run on a scheduler thread.
+    def _hdl_done(self) -> None:
         def _invoke_idle_handler():
             self._invoke_idle_handler_handle = None
+
+            # Change notifications may be held back to limit the update rate, don't let them arrive after the idle
+            # handler, which would otherwise see the object as idle before seeing its final changes.
+            self._notifier.flush(self._loop)
+
             self._on_idle()
 
-        if self._invoke_idle_handler_handle is None:
+        try:
             self._invoke_idle_handler_handle = self._loop.call_soon_threadsafe(_invoke_idle_handler)
+        except RuntimeError:
+            # Event loop has been closed.
+            pass
+
+    @property
+    def priority(self) -> int:
+        return self._priority
+
+    @priority.setter
+    def priority(self, value: int) -> None:
+        self._priority = value
+        self._scheduler.set_priority(self, value)
 
     @property
     def is_busy(self) -> bool:
-        return self._worker is not None
+        return self._scheduler.is_scheduled(self)
@@ -5,10 +5,16 @@ setup(
     version='3.1.6dev0',
     packages=find_packages(exclude=['tests', 'manual_tests', 'docs']),
     package_data={
-        'opendrop.res': ['images/*']
+        'opendrop.res': ['images/*'],
+        # Only included if it has been built with `python -m opendrop.processing.ift.young_laplace.atlas`, see
+        # docs/getting_started.
+        'opendrop.processing.ift.young_laplace': ['atlas.npy', 'atlas.json'],
     },
     entry_points={
-        'console_scripts': 'opendrop=opendrop.app:main'
+        'console_scripts': [
+            'opendrop=opendrop.app:main',
+            'opendrop-batch=opendrop.batch:main',
+        ]
     },
     install_requires=[
         'matplotlib',
@@ -19,5 +25,8 @@ setup(
         'pytest',
         'setuptools',
         'typing_extensions',
-    ]
+    ],
+    extras_require={
+        'test': ['pytest', 'pytest-benchmark'],
+    },
 )
@@ -0,0 +1,244 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+import pytest
+
+from opendrop.app.common.image_acquirer import local_storage
+from opendrop.app.common.image_acquirer.local_storage import FrameCache, LazyImageSequence, LocalStorageAcquirer
+
+
+def make_frame(value, nbytes=300):
+    return np.full(nbytes, value, dtype=np.uint8)
+
+
+@pytest.fixture
+def image_paths(tmp_path):
+    paths = []
+    for i in range(6):
+        path = tmp_path/'image{}.png'.format(i)
+        image = np.zeros((8, 10, 3), dtype=np.uint8)
+        image[..., 0] = i  # Blue channel, in OpenCV's BGR order.
+        cv2.imwrite(str(path), image)
+        paths.append(path)
+
+    return paths
+
+
+@pytest.fixture
+def reads(monkeypatch):
+    """Paths passed to `local_storage._read_image()`, in order."""
+    reads = []
+    read_image = local_storage._read_image
+
+    def counting_read_image(path):
+        reads.append(path)
+        return read_image(path)
+
+    monkeypatch.setattr(local_storage, '_read_image', counting_read_image)
+
+    return reads
+
+
+class TestFrameCache:
+    def test_get_and_put(self, tmp_path):
+        cache = FrameCache(max_bytes=1000)
+        frame = make_frame(1)
+
+        assert cache.get(tmp_path/'a') is None
+
+        cache.put(tmp_path/'a', frame)
+
+        assert cache.get(tmp_path/'a') is frame
+        assert tmp_path/'a' in cache
+        assert cache.nbytes == frame.nbytes
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        cache = FrameCache(max_bytes=1000)
+
+        cache.put(tmp_path/'a', make_frame(1))
+        cache.put(tmp_path/'b', make_frame(2))
+        cache.put(tmp_path/'c', make_frame(3))
+
+        # Use 'a' so that 'b' becomes the least recently used.
+        cache.get(tmp_path/'a')
+        cache.put(tmp_path/'d', make_frame(4))
+
+        assert tmp_path/'b' not in cache
+        assert all(tmp_path/name in cache for name in 'acd')
+        assert cache.nbytes == 900
+
+    def test_replace(self, tmp_path):
+        cache = FrameCache(max_bytes=1000)
+
+        cache.put(tmp_path/'a', make_frame(1))
+        cache.put(tmp_path/'a', make_frame(2, nbytes=500))
+
+        assert cache.get(tmp_path/'a')[0] == 2
+        assert cache.nbytes == 500
+
+    def test_frame_over_budget_is_not_cached(self, tmp_path):
+        cache = FrameCache(max_bytes=1000)
+        cache.put(tmp_path/'a', make_frame(1))
+
+        cache.put(tmp_path/'b', make_frame(2, nbytes=1001))
+
+        assert tmp_path/'b' not in cache
+        assert tmp_path/'a' in cache
+
+    def test_clear(self, tmp_path):
+        cache = FrameCache(max_bytes=1000)
+        cache.put(tmp_path/'a', make_frame(1))
+
+        cache.clear()
+
+        assert tmp_path/'a' not in cache
+        assert cache.nbytes == 0
+
+
+class TestLazyImageSequence:
+    @pytest.fixture(autouse=True)
+    def executor(self):
+        self.executor = ThreadPoolExecutor(max_workers=2)
+        yield
+        self.executor.shutdown(wait=True)
+
+    def make_sequence(self, paths, prefetch_frames=0):
+        return LazyImageSequence(
+            paths=paths,
+            cache=FrameCache(max_bytes=10**6),
+            prefetch_executor=self.executor,
+            prefetch_frames=prefetch_frames,
+        )
+
+    def test_decodes_on_demand(self, image_paths, reads):
+        images = self.make_sequence(image_paths)
+
+        assert len(images) == 6
+        assert reads == []
+
+        image = images[2]
+
+        assert reads == [image_paths[2]]
+        # Converted to RGB, and read-only since frames are shared.
+        assert image.shape == (8, 10, 3)
+        assert (image[..., 2] == 2).all()
+        assert not image.flags.writeable
+
+        # Decoded once.
+        assert images[2] is image
+        assert images[-4] is image
+        assert reads == [image_paths[2]]
+
+    def test_slice(self, image_paths, reads):
+        images = self.make_sequence(image_paths)
+
+        frames = images[1:3]
+
+        assert [frame[0, 0, 2] for frame in frames] == [1, 2]
+        assert reads == image_paths[1:3]
+
+    def test_prefetch(self, image_paths, reads):
+        images = self.make_sequence(image_paths, prefetch_frames=2)
+
+        images[1]
+        self.executor.shutdown(wait=True)
+
+        assert sorted(reads) == image_paths[1:4]
+        assert all(path in images._cache for path in image_paths[1:4])
+        assert images._pending == {}
+
+        # Taken from the cache.
+        images[2]
+        assert len(reads) == 3
+
+    def test_waits_for_pending_prefetch(self, image_paths, monkeypatch):
+        release = threading.Event()
+        reads = []
+        read_image = local_storage._read_image
+
+        def slow_read_image(path):
+            reads.append(path)
+            if path == image_paths[1]:
+                assert release.wait(timeout=10)
+            return read_image(path)
+
+        monkeypatch.setattr(local_storage, '_read_image', slow_read_image)
+
+        images = self.make_sequence(image_paths, prefetch_frames=1)
+
+        # Starts prefetching image 1, which blocks until released.
+        images[0]
+        assert image_paths[1] in images._pending
+
+        result = []
+        reader = threading.Thread(target=lambda: result.append(images[1]))
+        reader.start()
+
+        reader.join(timeout=0.2)
+        assert reader.is_alive()
+
+        release.set()
+        reader.join(timeout=10)
+
+        # Handed the prefetched image instead of decoding it again.
+        assert reads.count(image_paths[1]) == 1
+        assert result[0] is images._cache.get(image_paths[1])
+        assert image_paths[1] not in images._pending
+
+    def test_after_executor_shutdown(self, image_paths, reads):
+        images = self.make_sequence(image_paths, prefetch_frames=2)
+        self.executor.shutdown(wait=True)
+
+        image = images[0]
+
+        # Still decoded on demand, just not prefetched.
+        assert image[0, 0, 2] == 0
+        assert reads == [image_paths[0]]
+        assert images._pending == {}
+
+    def test_not_an_array(self, image_paths):
+        with pytest.raises(TypeError):
+            np.asarray(self.make_sequence(image_paths))
+
+    def test_equality(self, image_paths):
+        assert self.make_sequence(image_paths) == self.make_sequence(image_paths)
+        assert hash(self.make_sequence(image_paths)) == hash(self.make_sequence(image_paths))
+        assert self.make_sequence(image_paths) != self.make_sequence(image_paths[1:])
+
+
+class TestLocalStorageAcquirer:
+    @pytest.fixture(autouse=True)
+    def acquirer(self):
+        self.acquirer = LocalStorageAcquirer()
+        yield
+        self.acquirer.destroy()
+
+    def test_load_image_paths(self, image_paths, reads):
+        self.acquirer.load_image_paths(reversed(image_paths))
+
+        images = self.acquirer.bn_images.get()
+
+        # Sorted, and nothing decoded yet.
+        assert list(images.paths) == image_paths
+        assert reads == []
+
+    def test_unrecognised_file(self, image_paths, tmp_path):
+        path = tmp_path/'notes.txt'
+        path.write_text('not an image')
+
+        with pytest.raises(ValueError):
+            self.acquirer.load_image_paths([*image_paths, path])
+
+    def test_corrupt_file_fails_when_read(self, image_paths, tmp_path):
+        # Recognised as a PNG from its header, so it's only found to be corrupt when it's decoded.
+        path = tmp_path/'truncated.png'
+        path.write_bytes(image_paths[0].read_bytes()[:40])
+
+        self.acquirer.load_image_paths([image_paths[0], path])
+        images = self.acquirer.bn_images.get()
+
+        assert images[0] is not None
+        with pytest.raises(ValueError):
+            images[1]
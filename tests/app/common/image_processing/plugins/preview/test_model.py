@@ -0,0 +1,78 @@
+import asyncio
+import threading
+
+import numpy as np
+import pytest
+
+from opendrop.app.common.image_processing.plugins.preview.model import FeatureExtractorCache
+from opendrop.utility.scheduler import UpdateScheduler, PRIORITY_FOREGROUND
+
+IMAGE = np.zeros((8, 10, 3), dtype=np.uint8)
+
+
+@pytest.fixture
+def loop():
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    yield loop
+    loop.close()
+    asyncio.set_event_loop(None)
+
+
+def run_until(loop, predicate, timeout=5):
+    async def wait():
+        while not predicate():
+            await asyncio.sleep(0.001)
+
+    loop.run_until_complete(asyncio.wait_for(wait(), timeout))
+
+
+def test_prefetch_reads_image_in_background(loop):
+    scheduler = UpdateScheduler(max_workers=1)
+    image_boxes = []
+    cache = FeatureExtractorCache(lambda image_box: image_boxes.append(image_box) or image_box, scheduler=scheduler)
+
+    cache.prefetch('a', lambda: IMAGE)
+    run_until(loop, lambda: image_boxes[0].get() is not None)
+
+    assert image_boxes[0].get() is IMAGE
+
+    # Extractor is reused.
+    assert cache.get('a', IMAGE) is image_boxes[0]
+    assert len(image_boxes) == 1
+
+
+def test_prefetch_runs_after_image_being_shown(loop):
+    scheduler = UpdateScheduler(max_workers=1)
+    cache = FeatureExtractorCache(lambda image_box: image_box, scheduler=scheduler)
+    order = []
+
+    release = threading.Event()
+    started = threading.Event()
+    scheduler.submit('block', lambda: started.set() or release.wait())
+    assert started.wait(timeout=5)
+
+    cache.prefetch('a', lambda: order.append('prefetch') or IMAGE)
+    scheduler.submit('showing', lambda: order.append('showing'), priority=PRIORITY_FOREGROUND)
+
+    release.set()
+    run_until(loop, lambda: len(order) == 2)
+
+    assert order == ['showing', 'prefetch']
+
+
+def test_prefetch_ignores_failed_read(loop):
+    scheduler = UpdateScheduler(max_workers=1)
+    cache = FeatureExtractorCache(lambda image_box: image_box, scheduler=scheduler)
+    done = threading.Event()
+
+    def read_image():
+        done.set()
+        raise ValueError
+
+    cache.prefetch('a', read_image)
+    run_until(loop, lambda: done.is_set() and not scheduler.is_scheduled((cache, 'a')))
+
+    # Image is set once it's shown.
+    image_box = cache.get('a', IMAGE)
+    assert image_box.get() is IMAGE
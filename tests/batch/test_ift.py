@@ -0,0 +1,91 @@
+import argparse
+import csv
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from opendrop.batch.ift import parse_region, resolve_inputs
+from opendrop.utility.geometry import Rect2
+from tests import samples
+
+SAMPLE_IMAGES_DIR = Path(os.path.dirname(samples.__file__))/'images'
+
+
+def test_parse_region():
+    assert parse_region('290,200,730,690') == Rect2(x0=290, y0=200, x1=730, y1=690)
+
+
+@pytest.mark.parametrize('text', ['290,200,730', '290,200,730,690,1', 'a,b,c,d', '1.5,2,3,4', ''])
+def test_parse_region_invalid(text):
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_region(text)
+
+
+def test_resolve_inputs(tmp_path):
+    for name in ('b.png', 'a.png', 'c.jpg'):
+        (tmp_path/name).touch()
+    (tmp_path/'subdir').mkdir()
+
+    # Directories give their files (but not subdirectories), sorted.
+    assert resolve_inputs([str(tmp_path)]) == [tmp_path/'a.png', tmp_path/'b.png', tmp_path/'c.jpg']
+
+    assert resolve_inputs([str(tmp_path/'*.png')]) == [tmp_path/'a.png', tmp_path/'b.png']
+
+    # Overlapping inputs don't give duplicates.
+    assert resolve_inputs([str(tmp_path/'c.jpg'), str(tmp_path/'*')]) == \
+        [tmp_path/'a.png', tmp_path/'b.png', tmp_path/'c.jpg']
+
+    # A glob matching nothing isn't an error.
+    assert resolve_inputs([str(tmp_path/'*.tif')]) == []
+
+
+def test_resolve_inputs_missing(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        resolve_inputs([str(tmp_path/'missing.png')])
+
+
+def test_ift_without_gtk(tmp_path):
+    """Analyse the sample images the way a server without PyGObject would, with `gi` made unimportable."""
+    output = tmp_path/'drop'
+
+    script = (
+        'import sys\n'
+        'sys.modules["gi"] = None\n'
+        'from opendrop.batch import main\n'
+        'sys.exit(main(sys.argv[1:]))\n'
+    )
+
+    subprocess.run(
+        [
+            sys.executable, '-c', script, 'ift', str(SAMPLE_IMAGES_DIR),
+            '--drop-region', '290,200,730,690',
+            '--needle-region', '420,0,580,150',
+            '--inner-density', '1000',
+            '--outer-density', '1.2',
+            '--needle-width', '0.0007',
+            '--frame-interval', '1',
+            '--no-figures',
+            '-o', str(output),
+        ],
+        cwd=str(Path(__file__).parents[2]),
+        check=True,
+        timeout=300,
+    )
+
+    assert sorted(p.name for p in output.iterdir()) == ['drop1', 'drop2', 'drop3', 'drop4', 'drop5', 'timeline.csv']
+
+    with (output/'timeline.csv').open(newline='') as timeline_file:
+        rows = list(csv.DictReader(timeline_file))
+
+    assert [float(row['Time (s)']) for row in rows] == [0, 1, 2, 3, 4]
+    for row in rows:
+        # Water, roughly.
+        assert 0.05 < float(row['IFT (N/m)']) < 0.09
+        assert float(row['Needle width (px)']) == pytest.approx(108, abs=2)
+
+    for drop_dir in ('drop1', 'drop5'):
+        assert (output/drop_dir/'params.ini').is_file()
+        assert (output/drop_dir/'profile_fit.csv').is_file()
@@ -0,0 +1,160 @@
+"""Renders images of pendant and sessile drops with a known Bond number and apex radius, from `YoungLaplaceSolution`,
+for the benchmarks to run the processing pipeline on.
+
+Lengths are in pixels, so the apex radius sets the resolution: doubling it doubles the size of the image and the
+length of the drop's contour.
+
+The benchmarks need pytest-benchmark (they're skipped without it), run them with `python -m pytest tests/benchmarks`.
+Save a run with `--benchmark-autosave` and compare a later one against it with `--benchmark-compare` to catch
+regressions, e.g. before upgrading NumPy, SciPy or OpenCV."""
+
+import math
+from typing import NamedTuple, Tuple
+
+import cv2
+import numpy as np
+
+from opendrop.processing.ift.young_laplace.equation import YoungLaplaceSolution
+from opendrop.utility.geometry import Rect2
+
+# Grey levels of the drop (and needle) and the background.
+DROP_COLOR = 10
+BACKGROUND_COLOR = 230
+
+# Space around the drop, as a fraction of the apex radius.
+MARGIN = 0.5
+
+# Fixed point (`SUBPIXEL_BITS` fractional bits) coordinates for cv2.fillPoly(), so edges are drawn antialiased with
+# subpixel accuracy.
+SUBPIXEL_BITS = 4
+
+# The pendant drop is cut off where it meets the needle, at this arclength (in units of the apex radius).
+PENDANT_ARCLENGTH = 3.0
+
+# Number of points the drawn outline is sampled at, per pixel of apex radius.
+OUTLINE_DENSITY = 20
+
+
+class PendantDrop(NamedTuple('PendantDrop', [
+    ('image', np.ndarray),
+    ('drop_region', Rect2),
+    ('needle_region', Rect2),
+    ('drop_profile', np.ndarray),
+    ('bond_number', float),
+    ('apex_radius', float),
+    ('needle_width', float),
+])):
+    """A rendered pendant drop. `drop_profile` is the true outline of the drop in image coordinates, `needle_width`
+    the width of the needle in pixels."""
+
+
+class SessileDrop(NamedTuple('SessileDrop', [
+    ('image', np.ndarray),
+    ('drop_region', Rect2),
+    ('surface', np.poly1d),
+    ('drop_profile', np.ndarray),
+    ('bond_number', float),
+    ('apex_radius', float),
+    ('contact_angle', float),
+])):
+    """A rendered sessile drop, sitting on the horizontal line `surface` (y as a function of x, in image coordinates).
+    `contact_angle` is in radians."""
+
+
+def render_pendant_drop(bond_number: float, apex_radius: float, *, noise: float = 2.0, seed: int = 0) -> PendantDrop:
+    """Render a grayscale image of a drop hanging from a vertical needle. `noise` is the standard deviation of the
+    Gaussian noise added to the image, in grey levels."""
+    r, z = _outline(bond_number, apex_radius, PENDANT_ARCLENGTH)
+    needle_width = 2*abs(r[0])
+
+    margin = MARGIN*apex_radius
+    needle_length = 2*apex_radius
+    width = 2*abs(r).max() + 2*margin
+    height = needle_length + z.max() + margin
+
+    # Apex at the bottom, image y points down.
+    apex_x = width/2
+    apex_y = needle_length + z.max()
+    outline = np.column_stack((apex_x + r, apex_y - z))
+    neck_y = outline[0, 1]
+
+    needle = np.array([
+        [apex_x - needle_width/2, neck_y],
+        [apex_x - needle_width/2, 0],
+        [apex_x + needle_width/2, 0],
+        [apex_x + needle_width/2, neck_y],
+    ])
+
+    image = _render((int(math.ceil(height)), int(math.ceil(width))), np.concatenate((outline, needle)), noise, seed)
+
+    drop_region = Rect2(x0=0, y0=int(neck_y + margin/2), x1=image.shape[1], y1=image.shape[0])
+    needle_region = Rect2(x0=0, y0=0, x1=image.shape[1], y1=int(needle_length/2))
+
+    return PendantDrop(image, drop_region, needle_region, outline, bond_number, apex_radius, needle_width)
+
+
+def render_sessile_drop(bond_number: float, apex_radius: float, contact_angle: float, *, noise: float = 2.0,
+                        seed: int = 0) -> SessileDrop:
+    """Render a grayscale image of a drop sitting on a horizontal surface, with a contact angle of `contact_angle`
+    radians. The drop is cut off where the tangent of its profile first reaches the contact angle, which for larger
+    Bond numbers may be never (the profile stops turning short of 180°)."""
+    # Arclength where the tangent angle of the profile reaches the contact angle.
+    s = np.linspace(0, 4.0, 4000)
+    φ = YoungLaplaceSolution(bond_number, apex_radius)(s)[:, 2]
+    arclength = s[min(np.searchsorted(φ, contact_angle), len(s) - 1)]
+
+    r, z = _outline(bond_number, apex_radius, arclength)
+
+    margin = MARGIN*apex_radius
+    width = 2*abs(r).max() + 2*margin
+    height = z.max() + 2*margin
+
+    # Apex at the top, the profile is deformed downwards (in the direction of positive image y).
+    apex_x = width/2
+    apex_y = margin
+    outline = np.column_stack((apex_x + r, apex_y + z))
+    surface_y = outline[0, 1]
+
+    image = _render((int(math.ceil(height)), int(math.ceil(width))), outline, noise, seed)
+
+    drop_region = Rect2(x0=0, y0=0, x1=image.shape[1], y1=int(surface_y))
+    surface = np.poly1d((0, surface_y))
+
+    return SessileDrop(image, drop_region, surface, outline, bond_number, apex_radius, contact_angle)
+
+
+def pendant_drop_profile(bond_number: float, apex_radius: float, num_points: int, *,
+                         apex_pos: Tuple[float, float] = (0.0, 0.0), noise: float = 0.1, seed: int = 0) -> np.ndarray:
+    """Return `num_points` points sampled uniformly in arclength along the outline of a pendant drop with its apex at
+    `apex_pos`, as extracted from an image and flipped for `YoungLaplaceFit`, plus Gaussian noise with standard
+    deviation `noise` pixels."""
+    profile = YoungLaplaceSolution(bond_number, apex_radius)
+    r, z = profile(np.linspace(-PENDANT_ARCLENGTH, PENDANT_ARCLENGTH, num_points))[:, :2].T
+
+    drop_profile = np.column_stack((r, z)) + apex_pos
+
+    rng = np.random.RandomState(seed)
+    drop_profile += rng.normal(scale=noise, size=drop_profile.shape)
+
+    return drop_profile
+
+
+def _outline(bond_number: float, apex_radius: float, arclength: float):
+    # Both sides of the profile, from one end to the other through the apex.
+    num_points = int(OUTLINE_DENSITY*apex_radius)
+    r, z = YoungLaplaceSolution(bond_number, apex_radius)(np.linspace(-arclength, arclength, num_points))[:, :2].T
+
+    return r, z
+
+
+def _render(shape, polygon: np.ndarray, noise: float, seed: int) -> np.ndarray:
+    image = np.full(shape, BACKGROUND_COLOR, dtype=np.uint8)
+
+    points = np.round(polygon * (1 << SUBPIXEL_BITS)).astype(np.int32)
+    cv2.fillPoly(image, [points], DROP_COLOR, lineType=cv2.LINE_AA, shift=SUBPIXEL_BITS)
+
+    if noise > 0:
+        rng = np.random.RandomState(seed)
+        image = np.clip(image + rng.normal(scale=noise, size=shape), 0, 255).astype(np.uint8)
+
+    return image
@@ -0,0 +1,53 @@
+import math
+
+import pytest
+
+pytest.importorskip('pytest_benchmark')
+
+from opendrop.processing.conan.contact_angle import ContactAngle
+from opendrop.processing.conan.extract import apply_foreground_detection, extract_drop_profile
+
+from synthetic_drops import render_sessile_drop
+
+BOND_NUMBER = 0.3
+
+CONTACT_ANGLES = [math.radians(a) for a in (30, 60, 90, 120)]
+
+
+def sessile_drop_profile(sessile_drop):
+    """Extract the profile of `sessile_drop` as the contact angle analysis does, return it with the surface line, both
+    mirrored in y so that the drop is above the surface, as `ContactAngle` expects."""
+    region = sessile_drop.drop_region
+
+    foreground = apply_foreground_detection(sessile_drop.image)
+    drop_profile = extract_drop_profile(foreground[region.y0:region.y1, region.x0:region.x1])
+    drop_profile = drop_profile + (region.x0, region.y0)
+    drop_profile[:, 1] *= -1
+
+    return drop_profile, -sessile_drop.surface
+
+
+@pytest.mark.parametrize('apex_radius', [50, 200, 400])
+def test_extract_drop_profile(benchmark, apex_radius):
+    sessile_drop = render_sessile_drop(BOND_NUMBER, apex_radius, math.radians(90))
+    region = sessile_drop.drop_region
+    foreground = apply_foreground_detection(sessile_drop.image)
+
+    drop_profile = benchmark(extract_drop_profile, foreground[region.y0:region.y1, region.x0:region.x1])
+
+    benchmark.extra_info['image_size'] = sessile_drop.image.size
+    benchmark.extra_info['contour_length'] = len(drop_profile)
+
+
+@pytest.mark.parametrize('contact_angle', CONTACT_ANGLES, ids=lambda a: '{:.0f}deg'.format(math.degrees(a)))
+@pytest.mark.parametrize('apex_radius', [50, 200, 400])
+def test_contact_angle(benchmark, apex_radius, contact_angle):
+    sessile_drop = render_sessile_drop(BOND_NUMBER, apex_radius, contact_angle)
+    drop_profile, surface = sessile_drop_profile(sessile_drop)
+
+    conan = benchmark(ContactAngle, drop_profile, surface)
+
+    benchmark.extra_info['contour_length'] = len(drop_profile)
+    benchmark.extra_info['left_angle_error'] = math.degrees(conan.left_angle - contact_angle)
+    benchmark.extra_info['right_angle_error'] = math.degrees(conan.right_angle - contact_angle)
+
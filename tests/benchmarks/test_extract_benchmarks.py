@@ -0,0 +1,85 @@
+import pytest
+
+pytest.importorskip('pytest_benchmark')
+
+from opendrop.processing.ift.extract import apply_edge_detection, extract_drop_profile, extract_needle_profile
+from opendrop.processing.ift.needle_width import calculate_width_from_needle_profile
+from opendrop.processing.ift.young_laplace import YoungLaplaceFit
+from opendrop.processing.ift.young_laplace.cache import solution_cache
+from opendrop.utility import mycv
+
+from synthetic_drops import render_pendant_drop
+
+BOND_NUMBER = 0.25
+
+# Apex radii (in pixels) of the rendered drops, i.e. the resolution of the images.
+APEX_RADII = [50, 200, 400]
+
+
+def crop(image, region):
+    return image[region.y0:region.y1, region.x0:region.x1]
+
+
+@pytest.fixture(scope='module', params=APEX_RADII, ids=lambda r: 'apex_radius={}'.format(r))
+def pendant_drop(request):
+    return render_pendant_drop(BOND_NUMBER, request.param)
+
+
+def test_apply_edge_detection(benchmark, pendant_drop):
+    benchmark(apply_edge_detection, pendant_drop.image)
+
+    benchmark.extra_info['image_size'] = pendant_drop.image.size
+
+
+def test_find_contours(benchmark, pendant_drop):
+    edges = crop(apply_edge_detection(pendant_drop.image), pendant_drop.drop_region)
+
+    contours = benchmark(mycv.find_contours, edges)
+
+    benchmark.extra_info['contour_length'] = len(contours[0])
+
+
+@pytest.mark.parametrize('method', [mycv.SQUISH_MERGE, mycv.SQUISH_GREEDY])
+def test_squish_contour(benchmark, pendant_drop, method):
+    edges = crop(apply_edge_detection(pendant_drop.image), pendant_drop.drop_region)
+    contour = mycv.find_contours(edges)[0]
+
+    benchmark(mycv.squish_contour, contour, method)
+
+    benchmark.extra_info['contour_length'] = len(contour)
+
+
+def test_calculate_width_from_needle_profile(benchmark, pendant_drop):
+    edges = crop(apply_edge_detection(pendant_drop.image), pendant_drop.needle_region)
+    needle_profile = extract_needle_profile(edges)
+
+    width = benchmark(calculate_width_from_needle_profile, needle_profile)
+
+    # Edges are found on pixel boundaries, so allow a couple of pixels.
+    assert width == pytest.approx(pendant_drop.needle_width, abs=2)
+
+    benchmark.extra_info['width_error'] = width - pendant_drop.needle_width
+
+
+@pytest.mark.parametrize('apex_radius', [200, 400])
+def test_pendant_drop_pipeline(benchmark, apex_radius):
+    """Edge detection, drop profile extraction and the Young-Laplace fit of one frame, as done by the IFT analysis."""
+    # At lower resolutions the contours found are too coarse for the initial guess of the fit to be reliable.
+    pendant_drop = render_pendant_drop(BOND_NUMBER, apex_radius)
+    region = pendant_drop.drop_region
+
+    def analyse():
+        edges = apply_edge_detection(pendant_drop.image)
+        drop_profile = extract_drop_profile(crop(edges, region)) + (region.x0, region.y0)
+
+        # YoungLaplaceFit takes in a drop profile where the drop is deformed in the negative y-direction.
+        drop_profile[:, 1] *= -1
+
+        return YoungLaplaceFit(drop_profile)
+
+    fit = benchmark.pedantic(analyse, setup=solution_cache.clear, rounds=5)
+
+    assert fit.bond_number == pytest.approx(BOND_NUMBER, rel=2e-2)
+
+    benchmark.extra_info['bond_number_error'] = fit.bond_number - BOND_NUMBER
+    benchmark.extra_info['apex_radius_error'] = fit.apex_radius - pendant_drop.apex_radius
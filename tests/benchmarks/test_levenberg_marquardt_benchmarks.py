@@ -0,0 +1,95 @@
+import functools
+
+import numpy as np
+import pytest
+
+pytest.importorskip('pytest_benchmark')
+
+from scipy import optimize as sp_optimize
+
+from opendrop.processing.ift.levenberg_marquardt import LevenbergMarquardt
+from opendrop.processing.ift.young_laplace import YoungLaplaceFit, tolerances
+
+from synthetic_drops import pendant_drop_profile
+
+BOND_NUMBER = 0.25
+APEX_RADIUS = 100
+
+# Starting point of the fits, relative to the true parameters (apex_x, apex_y, apex_radius, bond_number, rotation).
+START_OFFSET = (3.0, -2.0, 8.0, 0.05, 0.02)
+
+
+def drop_profile_problem(num_points):
+    """Return the residuals of the Young-Laplace fit of a drop profile, as an `evaluate(x, residuals_out,
+    jacobian_out)` function, with a starting point near the solution."""
+    drop_profile = pendant_drop_profile(BOND_NUMBER, APEX_RADIUS, num_points, apex_pos=(300, 40))
+
+    # Only used for its residuals and Jacobian. Closest points are searched for from scratch on every evaluation.
+    fit = YoungLaplaceFit(drop_profile)
+    fit._known_arclengths = None
+
+    evaluate = functools.partial(fit._evaluate, indices=np.arange(num_points), log_warnings=False)
+    x0 = np.array(fit.params) + START_OFFSET
+
+    return evaluate, x0
+
+
+@pytest.mark.parametrize('num_points', [500, 2000, 8000])
+def test_levenberg_marquardt(benchmark, num_points):
+    evaluate, x0 = drop_profile_problem(num_points)
+
+    def solve():
+        lm = LevenbergMarquardt(evaluate, x0, num_points)
+
+        # Stop like YoungLaplaceFit does at the full resolution.
+        steps = 0
+        while (abs(lm.next_delta) / np.maximum(abs(lm.x), 1) >= tolerances.DELTA_TOL).any() and steps < 100:
+            lm.step()
+            steps += 1
+
+        return lm, steps
+
+    lm, steps = benchmark(solve)
+
+    assert lm.x[3] == pytest.approx(BOND_NUMBER, rel=1e-2)
+
+    benchmark.extra_info['steps'] = steps
+    benchmark.extra_info['evaluations'] = lm.num_evaluations
+    benchmark.extra_info['ssr'] = lm.ssr
+
+
+@pytest.mark.parametrize('num_points', [500, 2000, 8000])
+def test_scipy_least_squares(benchmark, num_points):
+    """The same problem solved by MINPACK's Levenberg-Marquardt, for comparison with `test_levenberg_marquardt`."""
+    evaluate, x0 = drop_profile_problem(num_points)
+
+    def solve():
+        # MINPACK asks for the residuals and the Jacobian separately, evaluate both at once.
+        last = {}
+
+        def residuals_and_jacobian(x):
+            if last.get('x') is None or not np.array_equal(last['x'], x):
+                residuals = np.empty(num_points)
+                jacobian = np.empty((num_points, len(x0)))
+                evaluate(x, residuals, jacobian)
+                last.update(x=x.copy(), residuals=residuals, jacobian=jacobian, count=last.get('count', 0) + 1)
+
+            return last['residuals'], last['jacobian']
+
+        result = sp_optimize.least_squares(
+            lambda x: residuals_and_jacobian(x)[0],
+            x0,
+            jac=lambda x: residuals_and_jacobian(x)[1],
+            method='lm',
+            xtol=tolerances.DELTA_TOL,
+        )
+
+        return result, last['count']
+
+    result, evaluations = benchmark(solve)
+
+    assert result.x[3] == pytest.approx(BOND_NUMBER, rel=1e-2)
+
+    benchmark.extra_info['steps'] = result.njev
+    benchmark.extra_info['evaluations'] = evaluations
+    benchmark.extra_info['ssr'] = 2*result.cost
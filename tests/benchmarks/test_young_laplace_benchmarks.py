@@ -0,0 +1,83 @@
+import pytest
+
+pytest.importorskip('pytest_benchmark')
+
+from opendrop.processing.ift.young_laplace import YoungLaplaceFit, YoungLaplaceSequentialFit, tolerances
+from opendrop.processing.ift.young_laplace.cache import solution_cache
+from opendrop.processing.ift.young_laplace.equation import YoungLaplaceSolution
+
+from synthetic_drops import pendant_drop_profile
+
+BOND_NUMBER = 0.25
+APEX_RADIUS = 100
+
+
+@pytest.mark.parametrize('bond_number', [0.05, 0.25, 0.45])
+def test_solve(benchmark, bond_number):
+    benchmark(YoungLaplaceSolution._solve, bond_number, YoungLaplaceSolution.INITIAL_SIZE)
+
+
+def test_closest(benchmark):
+    profile = YoungLaplaceSolution(BOND_NUMBER, APEX_RADIUS)
+    point = pendant_drop_profile(BOND_NUMBER, APEX_RADIUS, 9)[6]
+
+    benchmark(profile.closest, point, 1.0, tolerances.MAXIMUM_ARCLENGTH_STEPS, tolerances.ARCLENGTH_TOL)
+
+
+@pytest.mark.parametrize('warm', [False, True], ids=['cold', 'warm'])
+@pytest.mark.parametrize('num_points', [500, 2000, 8000])
+def test_closest_many(benchmark, num_points, warm):
+    profile = YoungLaplaceSolution(BOND_NUMBER, APEX_RADIUS)
+    points = pendant_drop_profile(BOND_NUMBER, APEX_RADIUS, num_points)
+
+    # Warm starts from the arclengths found by a cold start, as a fit does after its first step.
+    s_0 = profile.closest_many(points, None, tolerances.MAXIMUM_ARCLENGTH_STEPS, tolerances.ARCLENGTH_TOL)[0] \
+        if warm else None
+
+    _, _, steps_exceeded = benchmark(
+        profile.closest_many, points, s_0, tolerances.MAXIMUM_ARCLENGTH_STEPS, tolerances.ARCLENGTH_TOL
+    )
+
+    benchmark.extra_info['steps_exceeded'] = int(steps_exceeded.sum())
+
+
+@pytest.mark.parametrize('schedule', [tolerances.RESOLUTION_SCHEDULE, ()], ids=['coarse_to_fine', 'full'])
+@pytest.mark.parametrize('num_points', [500, 2000, 8000])
+def test_fit(benchmark, monkeypatch, num_points, schedule):
+    monkeypatch.setattr(tolerances, 'RESOLUTION_SCHEDULE', schedule)
+
+    drop_profile = pendant_drop_profile(BOND_NUMBER, APEX_RADIUS, num_points, apex_pos=(300, 40))
+    log = []
+
+    def fit():
+        log.clear()
+        return YoungLaplaceFit(drop_profile, logger=log.append)
+
+    # Solutions are cached between fits, time each fit from an empty cache.
+    result = benchmark.pedantic(fit, setup=solution_cache.clear, rounds=5)
+
+    assert result.bond_number == pytest.approx(BOND_NUMBER, rel=1e-2)
+
+    benchmark.extra_info['steps'] = sum(1 for message in log if message[:4].strip().isdigit())
+    benchmark.extra_info['stop_reason'] = log[-1].strip()
+
+
+@pytest.mark.parametrize('num_drops', [10, 40])
+def test_sequential_fit(benchmark, num_drops):
+    # A slowly changing drop, like the frames of a time series.
+    drop_profiles = [
+        pendant_drop_profile(BOND_NUMBER + 0.001*i, APEX_RADIUS, 1000, apex_pos=(300, 40), seed=i)
+        for i in range(num_drops)
+    ]
+
+    def setup():
+        solution_cache.clear()
+        return (drop_profiles,), {}
+
+    sequence = benchmark.pedantic(YoungLaplaceSequentialFit, setup=setup, rounds=3)
+
+    assert all(fit.is_done for fit in sequence.fits)
+
+    # No stats when benchmarks are disabled (--benchmark-disable).
+    if benchmark.stats:
+        benchmark.extra_info['seconds_per_drop'] = benchmark.stats.stats.mean/num_drops
@@ -0,0 +1,44 @@
+import math
+
+import numpy as np
+import pytest
+
+from opendrop.processing.conan.contact_angle import ContactAngle, _subarc_of_curve_mask
+
+
+def spherical_cap(contact_angle, radius=400, num_points=1000):
+    """Return the profile of a drop, sitting on the line y=0, that is the cap of a circle."""
+    t = np.linspace(-contact_angle, contact_angle, num_points)
+    profile = np.stack((radius*np.sin(t), radius*(np.cos(t) - math.cos(contact_angle))), axis=1)
+    return np.round(profile).astype(int)
+
+
+@pytest.mark.parametrize('length, expected_end', [
+    (0, 1),
+    (1, 1),
+    (1.5, 2),
+    (2, 2),
+    (2.5, 3),
+    (100, 3),
+])
+def test_subarc_of_curve_mask(length, expected_end):
+    curve = np.array([[0, 0], [1, 0], [2, 0], [3, 0]])
+
+    mask = _subarc_of_curve_mask(curve, length)
+
+    assert (mask == (np.arange(len(curve)) <= expected_end)).all()
+
+
+def test_subarc_of_curve_mask_with_short_curve():
+    assert len(_subarc_of_curve_mask(np.empty((0, 2)), 1)) == 0
+    assert _subarc_of_curve_mask(np.array([[0, 0]]), 1).tolist() == [True]
+
+
+@pytest.mark.parametrize('contact_angle', [math.radians(60), math.radians(90), math.radians(120)])
+def test_contact_angle_of_spherical_cap(contact_angle):
+    conan = ContactAngle(spherical_cap(contact_angle), np.poly1d((0, 0)))
+
+    assert conan.left_angle == pytest.approx(contact_angle, abs=math.radians(5))
+    assert conan.right_angle == pytest.approx(contact_angle, abs=math.radians(5))
+    assert conan.left_point.x < 0 < conan.right_point.x
+
@@ -0,0 +1,22 @@
+import numpy as np
+import pytest
+
+from opendrop.processing.ift.extract import apply_edge_detection, edge_detection_margin
+
+
+@pytest.mark.parametrize('gaussian_size', [1, 3, 5, 9])
+def test_edge_detection_margin(gaussian_size):
+    rng = np.random.RandomState(0)
+    image = rng.randint(0, 256, size=(60, 80), dtype=np.uint8)
+    # Region of the image, padded by the margin.
+    y0, y1, x0, x1 = 20, 40, 25, 55
+    margin = edge_detection_margin(gaussian_size)
+
+    # With equal thresholds there are no weak edges, so hysteresis doesn't link up edges from further away.
+    edges = apply_edge_detection(image, gaussian_size, canny_min=100, canny_max=100)
+    cropped_edges = apply_edge_detection(
+        image[y0 - margin:y1 + margin, x0 - margin:x1 + margin], gaussian_size, canny_min=100, canny_max=100,
+    )
+
+    assert edges[y0:y1, x0:x1].any()
+    assert (cropped_edges[margin:-margin, margin:-margin] == edges[y0:y1, x0:x1]).all()
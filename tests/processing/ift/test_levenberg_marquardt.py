@@ -0,0 +1,93 @@
+import math
+
+import numpy as np
+import pytest
+
+from opendrop.processing.ift.levenberg_marquardt import LevenbergMarquardt, minimise
+
+
+def exponential_decay(t, y):
+    def evaluate(x, residuals_out, jacobian_out):
+        a, b = x
+        model = a*np.exp(-b*t)
+
+        residuals_out[:] = model - y
+        jacobian_out[:, 0] = model/a
+        jacobian_out[:, 1] = -t*model
+
+        return model
+
+    return evaluate
+
+
+def test_converges():
+    t = np.linspace(0, 5, 50)
+    y = 3.0*np.exp(-1.3*t)
+
+    lm = LevenbergMarquardt(exponential_decay(t, y), np.array([1.0, 0.5]), len(t))
+    for _ in range(50):
+        lm.step()
+
+    assert lm.x == pytest.approx([3.0, 1.3])
+    assert lm.ssr == pytest.approx(0, abs=1e-20)
+    assert lm.aux == pytest.approx(y)
+    assert lm.gradient == pytest.approx([0, 0], abs=1e-10)
+
+
+def test_rejected_step_keeps_current_point():
+    t = np.linspace(0, 5, 50)
+    y = 3.0*np.exp(-1.3*t)
+    evaluate = exponential_decay(t, y)
+
+    def evaluate_or_fail(x, residuals_out, jacobian_out):
+        # Can't evaluate anywhere far from the initial guess.
+        if abs(x[1] - 1.2) > 0.01:
+            raise ValueError
+        return evaluate(x, residuals_out, jacobian_out)
+
+    lm = LevenbergMarquardt(evaluate_or_fail, np.array([2.9, 1.2]), len(t))
+    ssr = lm.ssr
+    residuals = lm.residuals.copy()
+
+    assert not lm.step()
+
+    assert lm.x.tolist() == [2.9, 1.2]
+    assert lm.ssr == ssr
+    assert lm.residuals.tolist() == residuals.tolist()
+    assert lm.num_evaluations == 2
+
+    # Retried with more damping, until the step is small enough.
+    while not lm.step():
+        pass
+
+    assert lm.ssr < ssr
+    assert abs(lm.x[1] - 1.2) <= 0.01
+
+
+def test_non_finite_initial_residuals():
+    def evaluate(x, residuals_out, jacobian_out):
+        residuals_out[:] = math.nan
+        jacobian_out[:] = 0
+
+    with pytest.raises(ValueError):
+        LevenbergMarquardt(evaluate, np.array([1.0]), 2)
+
+
+def test_too_few_residuals():
+    with pytest.raises(ValueError):
+        LevenbergMarquardt(exponential_decay(np.array([0.0]), np.array([1.0])), np.array([1.0, 1.0]), 1)
+
+
+def test_minimise_linear():
+    rng = np.random.RandomState(0)
+    a = rng.normal(size=(20, 3))
+    b = rng.normal(size=20)
+
+    def evaluate(x, residuals_out, jacobian_out):
+        residuals_out[:] = a @ x - b
+        jacobian_out[:] = a
+
+    x, steps = minimise(evaluate, np.ones(3), len(b), max_steps=10, xtol=1e-8)
+
+    assert x == pytest.approx(np.linalg.lstsq(a, b, rcond=None)[0])
+    assert steps <= 2
@@ -0,0 +1,83 @@
+import math
+from unittest.mock import Mock
+
+import numpy as np
+import pytest
+
+from opendrop.processing.ift.needle_width import (
+    NeedleCache,
+    calculate_width_from_needle_profile,
+    _build_resids_jac,
+    _initial_needle_guess,
+    _optimise_needle,
+)
+
+
+def make_needle_profile(width, angle, length=200, num_points=100, noise=0.5, seed=0):
+    rng = np.random.RandomState(seed)
+
+    direction = np.array([math.cos(angle), math.sin(angle)])
+    normal = np.array([math.sin(angle), -math.cos(angle)])
+
+    t = np.linspace(0, length, num_points)[:, np.newaxis]
+    edge0 = [100, 0] + t*direction + rng.normal(scale=noise, size=(num_points, 2))
+    edge1 = [100, 0] + t*direction + width*normal + rng.normal(scale=noise, size=(num_points, 2))
+
+    return np.round(edge0).astype(int), np.round(edge1).astype(int)
+
+
+@pytest.mark.parametrize('angle', [math.radians(80), math.radians(90), math.radians(97)])
+def test_calculate_width_from_needle_profile(angle):
+    needle_profile = make_needle_profile(width=60, angle=angle)
+
+    width = calculate_width_from_needle_profile(needle_profile)
+
+    assert width == pytest.approx(60, abs=0.5)
+
+
+def test_calculate_width_from_needle_profile_with_missing_edge():
+    needle_profile = (np.array([[0, 0], [0, 10]]), np.empty((0, 2)))
+
+    assert math.isnan(calculate_width_from_needle_profile(needle_profile))
+
+
+def test_initial_needle_guess_is_least_squares_fit():
+    edge0, edge1 = make_needle_profile(width=45, angle=math.radians(85))
+
+    guess = _initial_needle_guess(edge0, edge1)
+    params = _optimise_needle((edge0, edge1))
+
+    assert guess == pytest.approx(params)
+
+    # Jacobian agrees with finite differences.
+    residuals, jac = _build_resids_jac((edge0, edge1), *params)
+    for i in range(3):
+        step = np.zeros(3)
+        step[i] = 1e-6
+        residuals_step, _ = _build_resids_jac((edge0, edge1), *(params + step))
+        assert (residuals_step - residuals)/1e-6 == pytest.approx(jac[:, i], abs=1e-4)
+
+
+def test_needle_cache():
+    cache = NeedleCache(max_entries=2)
+    calculate = Mock(side_effect=lambda image: image.sum())
+
+    image0 = np.zeros((10, 10), dtype=np.uint8)
+    image1 = image0.copy()
+    image1[5, 5] = 255
+
+    assert cache.get_or_calculate(image0, calculate) == 0
+    assert cache.get_or_calculate(image0.copy(), calculate) == 0
+    assert calculate.call_count == 1
+    assert cache.hits == 1
+    assert cache.misses == 1
+
+    # Same content but different shape is a different entry.
+    cache.get_or_calculate(image0.reshape(5, 20), calculate)
+    assert calculate.call_count == 2
+
+    # Least recently used entry is evicted.
+    cache.get_or_calculate(image1, calculate)
+    assert len(cache) == 2
+    cache.get_or_calculate(image0, calculate)
+    assert calculate.call_count == 4
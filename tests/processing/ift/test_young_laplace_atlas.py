@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from opendrop.processing.ift.young_laplace.atlas import Atlas, build_atlas
+from opendrop.processing.ift.young_laplace.cache import SolutionCache
+from opendrop.processing.ift.young_laplace.equation import YoungLaplaceSolution
+
+
+@pytest.fixture(scope='module')
+def atlas():
+    return build_atlas(bond_number_start=0.2, bond_number_stop=0.3, arclength_stop=4.5)
+
+
+@pytest.mark.parametrize('bond_number', [0.2, 0.2137, 0.2999])
+def test_interpolate_agrees_with_solve(atlas, bond_number):
+    expected = YoungLaplaceSolution._solve(bond_number, 4.0)
+    interpolated = atlas.interpolate(bond_number, 4.0)
+
+    s = np.linspace(0, 4.0, 500)
+    assert interpolated(s)[:, :3] == pytest.approx(expected(s)[:, :3], abs=1e-6)
+
+
+@pytest.mark.parametrize('bond_number, size', [(0.1, 4.0), (0.35, 4.0), (0.25, 6.0), (float('nan'), 4.0)])
+def test_interpolate_outside_of_atlas(atlas, bond_number, size):
+    assert not atlas.covers(bond_number, size)
+    assert atlas.interpolate(bond_number, size) is None
+
+
+def test_save_and_load(atlas, tmp_path):
+    path = tmp_path/'atlas.npy'
+    atlas.save(path)
+
+    loaded = Atlas.load(path)
+
+    assert isinstance(loaded._values, np.memmap)
+    assert loaded.interpolate(0.25, 4.0)(2.0) == pytest.approx(atlas.interpolate(0.25, 4.0)(2.0))
+
+
+def test_solution_falls_back_to_integration_outside_of_atlas(atlas):
+    cache = SolutionCache(max_bytes=0)
+
+    profile = YoungLaplaceSolution(0.25, 1, cache=cache, atlas=atlas)
+    s = profile._solved_region_size
+    profile.evaluate(s * 1.1)
+
+    expected = YoungLaplaceSolution(0.25, 1, cache=cache, atlas=False)
+    expected.evaluate(s * 1.1)
+
+    s = np.linspace(0, 4.5, 500)
+    assert profile(s)[:, :3] == pytest.approx(expected(s)[:, :3], abs=1e-6)
+
+
+def test_cache_keeps_atlas_and_integrated_solutions_apart(atlas):
+    cache = SolutionCache()
+
+    interpolated = YoungLaplaceSolution(0.25, 1, cache=cache, atlas=atlas)
+    assert interpolated.num_solves == 0
+
+    # Integrated, not taken from the cache.
+    integrated = YoungLaplaceSolution(0.25, 1, cache=cache, atlas=False)
+    assert integrated.num_solves == 1
+    assert integrated._solution is not interpolated._solution
+
+    # Both are cached.
+    assert YoungLaplaceSolution(0.25, 1, cache=cache, atlas=atlas)._solution is interpolated._solution
+    assert YoungLaplaceSolution(0.25, 1, cache=cache, atlas=False)._solution is integrated._solution
@@ -0,0 +1,74 @@
+from unittest.mock import Mock
+
+import numpy as np
+from scipy import interpolate as sp_interpolate
+
+from opendrop.processing.ift.young_laplace.cache import SolutionCache
+
+
+def make_solution(bond_number, size):
+    x = np.linspace(0, size, 11)
+    return sp_interpolate.CubicSpline(x, np.zeros((11, 6)))
+
+
+def test_get_or_solve_hits_and_misses():
+    cache = SolutionCache(max_bytes=10**9, bond_number_quantum=1e-3)
+    solve = Mock(side_effect=make_solution)
+
+    bond_number_0, solution_0 = cache.get_or_solve(0.2001, 4.0, solve)
+    bond_number_1, solution_1 = cache.get_or_solve(0.2002, 4.0, solve)
+
+    assert bond_number_0 == bond_number_1 == cache.quantise(0.2)
+    assert solution_0 is solution_1
+    solve.assert_called_once_with(bond_number_0, 4.0)
+    assert cache.hits == 1
+    assert cache.misses == 1
+
+    # Different size is a different entry.
+    cache.get_or_solve(0.2, 4.8, solve)
+    assert cache.misses == 2
+    assert len(cache) == 2
+
+
+def test_lru_eviction():
+    entry_nbytes = make_solution(0, 1).c.nbytes + make_solution(0, 1).x.nbytes
+    cache = SolutionCache(max_bytes=2*entry_nbytes, bond_number_quantum=1e-3)
+
+    cache.get_or_solve(0.1, 4.0, make_solution)
+    cache.get_or_solve(0.2, 4.0, make_solution)
+
+    # Use 0.1 so 0.2 becomes the least recently used entry.
+    cache.get_or_solve(0.1, 4.0, make_solution)
+    cache.get_or_solve(0.3, 4.0, make_solution)
+
+    assert len(cache) == 2
+    assert cache.nbytes <= cache.max_bytes
+
+    misses = cache.misses
+    cache.get_or_solve(0.1, 4.0, make_solution)
+    assert cache.misses == misses
+    cache.get_or_solve(0.2, 4.0, make_solution)
+    assert cache.misses == misses + 1
+
+
+def test_zero_budget_disables_caching():
+    cache = SolutionCache(max_bytes=0)
+    solve = Mock(side_effect=make_solution)
+
+    cache.get_or_solve(0.2, 4.0, solve)
+    cache.get_or_solve(0.2, 4.0, solve)
+
+    assert solve.call_count == 2
+    assert len(cache) == 0
+
+
+def test_sources_are_cached_apart():
+    cache = SolutionCache(max_bytes=10**9)
+    solve = Mock(side_effect=make_solution)
+
+    _, solution_0 = cache.get_or_solve(0.2, 4.0, solve, source='a')
+    _, solution_1 = cache.get_or_solve(0.2, 4.0, solve, source='b')
+
+    assert solution_0 is not solution_1
+    assert solve.call_count == 2
+    assert cache.get_or_solve(0.2, 4.0, solve, source='a')[1] is solution_0
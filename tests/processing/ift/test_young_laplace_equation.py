@@ -0,0 +1,106 @@
+from math import cos, pi, sin
+
+import numpy as np
+import pytest
+from scipy import integrate as sp_integrate
+
+from opendrop.processing.ift.young_laplace.cache import SolutionCache
+from opendrop.processing.ift.young_laplace.equation import YoungLaplaceSolution
+
+
+def reference_volsur(bond_number, s):
+    """Volume and surface area of the dimensionless drop between the apex and arclength `s`, integrated along with the
+    profile."""
+    def deriv(x_vec, t):
+        x, y, phi, vol, sur = x_vec
+        return [cos(phi), sin(phi), 2 - bond_number*y - sin(phi)/x, pi * x**2 * sin(phi), 2 * pi * x]
+
+    return sp_integrate.odeint(deriv, [.000001, 0., 0., 0., 0.], t=[0, s])[-1][-2:]
+
+
+@pytest.mark.parametrize('bond_number', [0.1, 0.25, 0.4])
+def test_closest_many_agrees_with_closest(bond_number):
+    apex_radius = 100
+    profile = YoungLaplaceSolution(bond_number, apex_radius)
+
+    s_true = np.linspace(-3, 3, 51)
+    normals = np.array([1, 0.5]) * np.linspace(-2, 2, 51)[:, np.newaxis]
+    points = profile(s_true)[:, :2] + normals
+
+    s_many, e_many, steps_exceeded_many = profile.closest_many(points, s_0=None, max_steps=10, tol=1e-6)
+
+    for i, p in enumerate(points):
+        s, e, steps_exceeded = profile.closest(p, s_0=s_many[i], max_steps=10, tol=1e-6)
+
+        assert s == pytest.approx(s_many[i], abs=1e-5)
+        assert np.linalg.norm(e) == pytest.approx(np.linalg.norm(e_many[i]), abs=1e-3)
+
+    assert not steps_exceeded_many.any()
+
+
+def test_closest_many_with_no_points():
+    profile = YoungLaplaceSolution(0.2, 100)
+
+    s, e, steps_exceeded = profile.closest_many(np.empty((0, 2)), s_0=None, max_steps=10, tol=1e-6)
+
+    assert s.shape == (0,)
+    assert e.shape == (0, 2)
+    assert steps_exceeded.shape == (0,)
+
+
+def test_expand_solved_region_agrees_with_full_solve():
+    profile = YoungLaplaceSolution(0.3, 1, cache=SolutionCache(max_bytes=0))
+    initial_size = profile._solved_region_size
+
+    profile._expand_solved_region(factor=1.2)
+    profile._expand_solved_region(factor=1.2)
+
+    size = profile._solved_region_size
+    assert size == pytest.approx(initial_size * 1.2**2)
+
+    expected = YoungLaplaceSolution._solve(0.3, size)
+
+    s = np.linspace(0, size, 1000, endpoint=False)
+    assert profile._solution(s) == pytest.approx(expected(s), abs=1e-4)
+
+
+def test_evaluate_far_outside_of_solved_region():
+    profile = YoungLaplaceSolution(0.1, 1, cache=SolutionCache(max_bytes=0), atlas=False)
+    s = np.array([-7.0, 0.5, 7.0])
+
+    data = profile(s)
+
+    assert np.isfinite(data).all()
+    assert profile._solved_region_size >= 7.0
+
+    expected = YoungLaplaceSolution._solve(0.1, profile._solved_region_size)(abs(s))
+    expected[0, [0, 2, 3, 5]] *= -1
+    assert data == pytest.approx(expected, abs=1e-4)
+
+
+def test_num_solves():
+    cache = SolutionCache()
+
+    profile = YoungLaplaceSolution(0.3, 1, cache=cache, atlas=False)
+    assert profile.num_solves == 1
+
+    profile._expand_solved_region(factor=1.2)
+    assert profile.num_solves == 2
+
+    # Taken from the cache.
+    profile = YoungLaplaceSolution(0.3, 1, cache=cache, atlas=False)
+    assert profile.num_solves == 0
+
+
+@pytest.mark.parametrize('bond_number, s', [(0.25, 0.5), (0.25, 2.0), (0.25, 3.9), (0.25, 4.5), (0.1, 5.5)])
+def test_volsur(bond_number, s):
+    apex_radius = 2
+
+    # s = 4.5 is outside of the initial solved region, s = 5.5 outside of it expanded once.
+    profile = YoungLaplaceSolution(bond_number, apex_radius, cache=SolutionCache(max_bytes=0), atlas=False)
+    vol, sur = profile.volsur(s)
+
+    expected_vol, expected_sur = reference_volsur(bond_number, s)
+
+    assert vol == pytest.approx(expected_vol * apex_radius**3, rel=1e-6)
+    assert sur == pytest.approx(expected_sur * apex_radius**2, rel=1e-6)
@@ -0,0 +1,195 @@
+import numpy as np
+import pytest
+
+from opendrop.processing.ift.young_laplace import YoungLaplaceFit, YoungLaplaceFitProgress, tolerances
+from opendrop.processing.ift.young_laplace.equation import YoungLaplaceSolution
+from opendrop.processing.ift.young_laplace.fit import _arclength_subsample
+
+
+def make_drop_profile(bond_number, apex_radius, apex_pos, num_points=1000, noise=0.1):
+    profile = YoungLaplaceSolution(bond_number, apex_radius)
+    r, z = profile(np.linspace(-3.2, 3.2, num_points))[:, :2].T
+    drop_profile = np.stack((r, z), axis=1) + apex_pos
+
+    rng = np.random.RandomState(0)
+    drop_profile += rng.normal(scale=noise, size=drop_profile.shape)
+
+    return drop_profile
+
+
+def test_fit():
+    drop_profile = make_drop_profile(0.25, 100, (300, 40))
+
+    fit = YoungLaplaceFit(drop_profile)
+
+    assert fit.bond_number == pytest.approx(0.25, rel=1e-2)
+    assert fit.apex_radius == pytest.approx(100, rel=1e-2)
+    assert (fit.apex_x, fit.apex_y) == pytest.approx((300, 40), abs=0.5)
+
+
+def test_warm_start():
+    drop_profile = make_drop_profile(0.25, 100, (300, 40))
+    log = []
+
+    fit = YoungLaplaceFit(drop_profile, initial_params=(300, 40, 100, 0.25, 0.), logger=log.append)
+
+    assert 'Warm started from previous fit.\n' in log
+    assert fit.bond_number == pytest.approx(0.25, rel=1e-2)
+
+
+def test_bad_warm_start_is_rejected():
+    drop_profile = make_drop_profile(0.25, 100, (300, 40))
+    log = []
+
+    fit = YoungLaplaceFit(drop_profile, initial_params=(500, -100, 20, 0.6, 1.), logger=log.append)
+
+    assert 'Warm start rejected, fitting from initial guess.\n' in log
+    assert fit.bond_number == pytest.approx(0.25, rel=1e-2)
+
+
+@pytest.mark.parametrize('detailed', [False, True])
+def test_progress(detailed):
+    drop_profile = make_drop_profile(0.25, 100, (300, 40))
+    progress = YoungLaplaceFitProgress(50, max_rate=None, detailed=detailed)
+    snapshots = []
+
+    def on_update(fit):
+        if progress.is_due(fit):
+            snapshots.append(progress.snapshot(fit))
+
+    YoungLaplaceFit(drop_profile, on_update=on_update)
+
+    assert len(snapshots) > 2
+    for snapshot in snapshots[:-1]:
+        assert not snapshot.is_done
+        assert (snapshot.profile_fit is not None) == detailed
+        if not detailed:
+            assert snapshot.residuals is None
+
+    assert snapshots[-1].is_done
+    assert snapshots[-1].profile_fit.shape == (50, 2)
+    assert snapshots[-1].residuals is not None
+
+
+def test_progress_max_rate():
+    drop_profile = make_drop_profile(0.25, 100, (300, 40))
+    progress = YoungLaplaceFitProgress(50, max_rate=1e-3)
+    updates = []
+
+    def on_update(fit):
+        updates.append(progress.is_due(fit))
+
+    YoungLaplaceFit(drop_profile, on_update=on_update)
+
+    # Only the first update and the final one are due.
+    assert len(updates) > 2
+    assert updates[0] and updates[-1]
+    assert not any(updates[1:-1])
+
+
+@pytest.mark.parametrize('bond_number, apex_radius', [(0.1, 80), (0.25, 100), (0.45, 150)])
+def test_fit_converges(bond_number, apex_radius):
+    drop_profile = make_drop_profile(bond_number, apex_radius, (300, 40), num_points=2000)
+    log = []
+
+    fit = YoungLaplaceFit(drop_profile, logger=log.append)
+
+    assert 'CONVERGENCE_IN_PARAMETERS' in log[-1]
+    assert fit.bond_number == pytest.approx(bond_number, rel=1e-2)
+
+
+@pytest.mark.parametrize('order', ['by_y', 'shuffled'])
+def test_fit_unordered(order):
+    drop_profile = make_drop_profile(0.25, 100, (300, 40), num_points=2000)
+    if order == 'by_y':
+        drop_profile = drop_profile[drop_profile[:, 1].argsort()]
+    else:
+        drop_profile = drop_profile[np.random.RandomState(1).permutation(len(drop_profile))]
+
+    fit = YoungLaplaceFit(drop_profile)
+
+    assert 'CONVERGENCE' in fit.stop_reason
+    assert fit.bond_number == pytest.approx(0.25, rel=1e-2)
+    assert fit.apex_radius == pytest.approx(100, rel=1e-2)
+
+
+def test_coarse_to_fine(monkeypatch):
+    monkeypatch.setattr(tolerances, 'RESOLUTION_SCHEDULE', (100, 400))
+    drop_profile = make_drop_profile(0.25, 100, (300, 40), num_points=2000)
+    log = []
+
+    fit = YoungLaplaceFit(drop_profile, logger=log.append)
+
+    # Number of points fitted at each step.
+    resolutions = [int(line.split()[1]) for line in log if line[:4].strip().isdigit()]
+    assert resolutions[0] == 100
+    assert resolutions == sorted(resolutions)
+    assert set(resolutions) == {100, 400, 2000}
+
+    assert fit.bond_number == pytest.approx(0.25, rel=1e-2)
+    assert len(fit.residuals) == 2000
+
+
+def test_maximum_steps_over_all_resolutions(monkeypatch):
+    monkeypatch.setattr(tolerances, 'RESOLUTION_SCHEDULE', (100, 400))
+    monkeypatch.setattr(tolerances, 'MAXIMUM_FITTING_STEPS', 5)
+    # Never converge in parameters.
+    monkeypatch.setattr(tolerances, 'RESOLUTION_DELTA_TOL', 0)
+    monkeypatch.setattr(tolerances, 'DELTA_TOL', 0)
+    drop_profile = make_drop_profile(0.25, 100, (300, 40), num_points=2000)
+    log = []
+
+    fit = YoungLaplaceFit(drop_profile, logger=log.append)
+
+    steps = [int(line.split()[0]) for line in log if line[:4].strip().isdigit()]
+    assert steps == list(range(len(steps)))
+    assert len(steps) <= tolerances.MAXIMUM_FITTING_STEPS + 1
+
+    assert 'MAXIMUM_STEPS_EXCEEDED' in fit.stop_reason
+    assert len(fit.residuals) == 2000
+
+
+def test_telemetry():
+    drop_profile = make_drop_profile(0.25, 100, (300, 40))
+    log = []
+
+    fit = YoungLaplaceFit(drop_profile, logger=log.append)
+
+    assert fit.num_iterations == sum(1 for line in log if line[:4].strip().isdigit())
+    assert fit.num_arclength_steps_exceeded == sum(1 for line in log if line.startswith('Warning'))
+    assert fit.stop_reason in log[-1]
+
+    assert 0 < fit.projection_time.wall <= fit.optimise_time.wall
+    assert 0 < fit.projection_time.cpu <= fit.optimise_time.cpu
+
+
+def test_telemetry_cancelled():
+    drop_profile = make_drop_profile(0.25, 100, (300, 40))
+
+    fit = YoungLaplaceFit(drop_profile, on_update=lambda fit: fit.cancel())
+
+    assert fit.stop_reason == 'CANCELLED'
+
+
+def test_arclength_subsample():
+    t = np.linspace(0, 1, 1000)**2
+    profile = np.stack((np.zeros_like(t), 100*t), axis=1)
+
+    subsample = profile[_arclength_subsample(profile, 11)]
+
+    assert subsample[:, 1] == pytest.approx(np.linspace(0, 100, 11), abs=0.5)
+
+
+@pytest.mark.parametrize('order', ['by_y', 'shuffled'])
+def test_arclength_subsample_unordered(order):
+    profile = make_drop_profile(0.25, 100, (300, 40), num_points=2000)
+    if order == 'by_y':
+        unordered = profile[profile[:, 1].argsort()]
+    else:
+        unordered = profile[np.random.RandomState(1).permutation(len(profile))]
+
+    subsample = profile[_arclength_subsample(profile, 200)]
+    unordered_subsample = unordered[_arclength_subsample(unordered, 200)]
+
+    assert len(subsample) == 200
+    assert sorted(map(tuple, unordered_subsample)) == sorted(map(tuple, subsample))
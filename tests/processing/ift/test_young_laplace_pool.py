@@ -0,0 +1,122 @@
+import threading
+
+import numpy as np
+import pytest
+
+from opendrop.processing.ift.young_laplace import YoungLaplaceFitPool
+from opendrop.processing.ift.young_laplace.equation import YoungLaplaceSolution
+
+
+def make_drop_profile(bond_number, apex_radius, apex_pos, num_points=1000, noise=0.1):
+    profile = YoungLaplaceSolution(bond_number, apex_radius)
+    r, z = profile(np.linspace(-3.2, 3.2, num_points))[:, :2].T
+    drop_profile = np.stack((r, z), axis=1) + apex_pos
+
+    rng = np.random.RandomState(0)
+    drop_profile += rng.normal(scale=noise, size=drop_profile.shape)
+
+    return drop_profile
+
+
+@pytest.fixture
+def pool():
+    pool = YoungLaplaceFitPool(max_workers=2)
+    yield pool
+    pool.shutdown()
+
+
+def test_fit_in_pool(pool):
+    updates = []
+    log = []
+
+    job = pool.submit(
+        make_drop_profile(0.25, 100, (300, 40)),
+        profile_samples=50,
+        on_update=updates.append,
+        logger=log.append,
+    )
+
+    assert job.wait(timeout=60)
+
+    result = job.result()
+    assert result.is_done
+    assert result.bond_number == pytest.approx(0.25, rel=1e-2)
+    assert result.apex_radius == pytest.approx(100, rel=1e-2)
+    assert result.profile_fit.shape == (50, 2)
+
+    # Telemetry of the fit comes back from the worker process too.
+    assert result.num_iterations > 0
+    assert result.stop_reason == 'CONVERGENCE_IN_PARAMETERS'
+    assert result.optimise_time.wall > 0
+
+    # Progress was streamed back before the job finished.
+    assert len(updates) > 1
+    assert updates[-1].params == result.params
+    assert any('Fitting finished' in message for message in log)
+
+
+def test_cancel_running_fit(pool):
+    jobs = []
+
+    # Cancel as soon as the first update (the initial guess) comes back.
+    def on_update(snapshot):
+        jobs[0].cancel()
+
+    jobs.append(pool.submit(
+        make_drop_profile(0.25, 100, (300, 40)),
+        profile_samples=50,
+        on_update=on_update,
+    ))
+
+    assert jobs[0].wait(timeout=60)
+    assert jobs[0].result().is_cancelled
+
+
+def test_fit_batch_in_pool(pool):
+    drop_profiles = [make_drop_profile(0.25 + 0.01*i, 100 - i, (300, 40)) for i in range(5)]
+    updates = []
+    logs = [[] for _ in drop_profiles]
+
+    jobs = pool.submit_batch(
+        drop_profiles,
+        profile_samples=50,
+        on_update=lambda i, snapshot: updates.append(i),
+        logger=lambda i, message: logs[i].append(message),
+    )
+
+    assert len(jobs) == 5
+
+    done = threading.Semaphore(0)
+    for job in jobs:
+        job.add_done_callback(lambda job: done.release())
+
+    for i, job in enumerate(jobs):
+        assert job.wait(timeout=60)
+        assert done.acquire(timeout=1)
+
+        result = job.result()
+        assert result.is_done
+        assert result.bond_number == pytest.approx(0.25 + 0.01*i, rel=1e-2)
+        assert result.profile_fit.shape == (50, 2)
+
+    assert set(updates) == set(range(5))
+
+    # Drops after the first of each worker's chunk are offered the fit of the drop before as a warm start.
+    assert any(any(message.startswith('Warm start') for message in log) for log in logs)
+    assert all(any('Fitting finished' in message for message in log) for log in logs)
+
+
+def test_cancel_batch_job(pool):
+    drop_profiles = [make_drop_profile(0.25, 100, (300, 40)) for _ in range(6)]
+
+    jobs = pool.submit_batch(drop_profiles, profile_samples=50)
+    jobs[-1].cancel()
+
+    for job in jobs:
+        assert job.wait(timeout=60)
+
+    # Other jobs in the same batch are unaffected.
+    assert jobs[-2].result().is_done and not jobs[-2].result().is_cancelled
+
+    result = jobs[-1].result()
+    assert result is None or result.is_cancelled
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from opendrop.processing.ift.young_laplace import YoungLaplaceSequentialFit
+from opendrop.processing.ift.young_laplace.equation import YoungLaplaceSolution
+
+
+def make_drop_profile(bond_number, apex_radius, apex_pos, num_points=1000, noise=0.1):
+    profile = YoungLaplaceSolution(bond_number, apex_radius)
+    r, z = profile(np.linspace(-3.2, 3.2, num_points))[:, :2].T
+    drop_profile = np.stack((r, z), axis=1) + apex_pos
+
+    rng = np.random.RandomState(0)
+    drop_profile += rng.normal(scale=noise, size=drop_profile.shape)
+
+    return drop_profile
+
+
+def test_sequential_fit():
+    drop_profiles = [make_drop_profile(0.2 + 0.01*i, 100 + i, (300, 40)) for i in range(4)]
+    logs = [[] for _ in drop_profiles]
+    updated = set()
+
+    sequence = YoungLaplaceSequentialFit(
+        drop_profiles,
+        on_update=lambda i, fit: updated.add(i),
+        logger=lambda i, message: logs[i].append(message),
+    )
+
+    for i, fit in enumerate(sequence.fits):
+        assert fit.is_done
+        assert fit.bond_number == pytest.approx(0.2 + 0.01*i, rel=1e-2)
+        assert fit.apex_radius == pytest.approx(100 + i, rel=1e-2)
+
+    assert updated == {0, 1, 2, 3}
+
+    # Each drop after the first is offered the fit of the one before it as a warm start.
+    assert not any(message.startswith('Warm start') for message in logs[0])
+    for log in logs[1:]:
+        assert any(message.startswith('Warm start') for message in log)
+
+
+def test_cancel():
+    drop_profiles = [make_drop_profile(0.25, 100, (300, 40)) for _ in range(3)]
+
+    sequence = YoungLaplaceSequentialFit(drop_profiles, is_cancelled=lambda i: i > 0)
+
+    assert sequence.fits[0].is_done and not sequence.fits[0].is_cancelled
+    assert sequence.fits[1] is None
+    assert sequence.fits[2] is None
+
+
+def test_bad_drop_profile_is_skipped():
+    drop_profiles = [make_drop_profile(0.25, 100, (300, 40)), np.empty((0, 2)), make_drop_profile(0.25, 100, (300, 40))]
+    logs = [[] for _ in drop_profiles]
+
+    sequence = YoungLaplaceSequentialFit(drop_profiles, logger=lambda i, message: logs[i].append(message))
+
+    # The failed drop logs its error, and the rest of the sequence carries on.
+    assert any('Error' in message for message in logs[1])
+    assert sequence.fits[2].bond_number == pytest.approx(0.25, rel=1e-2)
+    assert any(message.startswith('Warm start') for message in logs[2])
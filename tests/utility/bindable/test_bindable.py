@@ -1,8 +1,9 @@
 from unittest.mock import Mock
 
+import numpy as np
 import pytest
 
-from opendrop.utility.bindable.bindable import Bindable, BoxBindable, AccessorBindable
+from opendrop.utility.bindable.bindable import Bindable, BoxBindable, AccessorBindable, array_equality_check
 
 
 class TestBindable:
@@ -176,6 +177,62 @@ class TestAccessorBindable_WriteOnly:
             self.my_bindable.get()
 
 
+class TestArrayEqualityCheck:
+    def test_same_object(self):
+        x = np.array([1.0, np.nan])
+        assert array_equality_check(x, x)
+
+    @pytest.mark.parametrize('x, y', [
+        (np.zeros((3, 2)), np.zeros((3, 2))),
+        (np.array([1.0, np.nan]), np.array([1.0, np.nan])),
+        (np.arange(6)[::2], np.array([0, 2, 4])),
+        (np.empty((0, 2)), np.empty((0, 2))),
+        ((np.ones(2), np.zeros(3)), (np.ones(2), np.zeros(3))),
+        (None, None),
+        (1.5, 1.5),
+    ])
+    def test_equal(self, x, y):
+        assert array_equality_check(x, y)
+
+    @pytest.mark.parametrize('x, y', [
+        (np.zeros((3, 2)), np.zeros((2, 3))),
+        (np.zeros(3, dtype=int), np.zeros(3, dtype=float)),
+        (np.array([1, 2, 3]), np.array([1, 2, 4])),
+        (None, np.zeros(3)),
+        (np.zeros(3), None),
+        ((np.ones(2), np.zeros(3)), (np.ones(2), np.ones(3))),
+        ((np.ones(2),), (np.ones(2), np.ones(2))),
+        (1.5, 2.5),
+    ])
+    def test_not_equal(self, x, y):
+        assert not array_equality_check(x, y)
+
+    def test_large_arrays(self):
+        x = np.arange(100000, dtype=float).reshape(100, 1000)
+
+        assert array_equality_check(x, x.copy())
+        assert array_equality_check(x, x[:])
+        assert array_equality_check(x[::2], x.copy()[::2])
+
+        # Differ only between the sampled elements.
+        y = x.copy()
+        y[50, 501] = -1
+        assert not array_equality_check(x, y)
+
+        # Views of different parts of the same memory.
+        assert not array_equality_check(x[:50], x[50:])
+
+    def test_box_bindable(self):
+        bn = BoxBindable(None, check_equals=array_equality_check)
+        on_changed_callback = Mock()
+        bn.on_changed.connect(on_changed_callback)
+
+        bn.set(np.zeros((10, 10)))
+        bn.set(np.zeros((10, 10)))
+
+        on_changed_callback.assert_called_once_with()
+
+
 class StubBindable(Bindable):
     def _get_value(self):
         """stub"""
@@ -0,0 +1,112 @@
+import asyncio
+import threading
+from unittest.mock import Mock
+
+import pytest
+
+from opendrop.utility.bindable.util import ChangeNotifier, thread_safe_bindable_collection
+
+MyCollection = thread_safe_bindable_collection(fields=['bn_a', 'bn_b'])
+
+
+@pytest.fixture
+def loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+def commit(collection, **values):
+    editor = collection.edit()
+    for name, value in values.items():
+        editor.set_value(name, value)
+    editor.commit()
+
+
+def run_briefly(loop, delay=0.0):
+    loop.run_until_complete(asyncio.sleep(delay))
+
+
+def test_commits_are_coalesced(loop):
+    collection = MyCollection(_loop=loop, _notifier=ChangeNotifier(max_rate=None), bn_a=0, bn_b=0)
+
+    seen = []
+    collection.bn_a.on_changed.connect(lambda: seen.append(collection.bn_a.get()), weak_ref=False)
+    cb_b = Mock()
+    collection.bn_b.on_changed.connect(cb_b)
+
+    threads = [threading.Thread(target=commit, args=(collection,), kwargs={'bn_a': i}) for i in range(1, 11)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    commit(collection, bn_a=11)
+
+    run_briefly(loop)
+
+    assert seen == [11]
+    cb_b.assert_not_called()
+
+
+def test_notifications_are_dispatched_together(loop):
+    loop.call_soon_threadsafe = Mock(wraps=loop.call_soon_threadsafe)
+    notifier = ChangeNotifier(max_rate=None)
+    collections = [MyCollection(_loop=loop, _notifier=notifier, bn_a=0, bn_b=0) for _ in range(50)]
+
+    callbacks = []
+    for collection in collections:
+        commit(collection, bn_a=1, bn_b=2)
+
+        cb = Mock()
+        collection.bn_a.on_changed.connect(cb)
+        collection.bn_b.on_changed.connect(cb)
+        callbacks.append(cb)
+
+    # Only one callback is queued on the loop.
+    loop.call_soon_threadsafe.assert_called_once()
+
+    run_briefly(loop)
+
+    for cb in callbacks:
+        assert cb.call_count == 2
+
+
+def test_max_rate(loop):
+    collection = MyCollection(_loop=loop, _notifier=ChangeNotifier(max_rate=10), bn_a=0, bn_b=0)
+
+    cb = Mock()
+    collection.bn_a.on_changed.connect(cb)
+
+    commit(collection, bn_a=1)
+    run_briefly(loop)
+    assert cb.call_count == 1
+
+    commit(collection, bn_a=2)
+    run_briefly(loop)
+    # Too soon after the last notification.
+    assert cb.call_count == 1
+
+    run_briefly(loop, 0.15)
+    assert cb.call_count == 2
+    assert collection.bn_a.get() == 2
+
+
+def test_flush(loop):
+    collection = MyCollection(_loop=loop, _notifier=ChangeNotifier(max_rate=10), bn_a=0, bn_b=0)
+    notifier = collection._notifier
+
+    cb = Mock()
+    collection.bn_a.on_changed.connect(cb)
+
+    commit(collection, bn_a=1)
+    run_briefly(loop)
+    commit(collection, bn_a=2)
+    run_briefly(loop)
+    assert cb.call_count == 1
+
+    notifier.flush(loop)
+    assert cb.call_count == 2
+
+    # Nothing left to notify when the held back dispatch runs.
+    run_briefly(loop, 0.15)
+    assert cb.call_count == 2
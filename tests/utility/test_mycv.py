@@ -0,0 +1,69 @@
+import cv2
+import numpy as np
+import pytest
+
+from opendrop.utility import mycv
+
+
+def draw_arc(shape=(400, 400), center=(200, 200), axes=(150, 120), start_angle=30, end_angle=330):
+    image = np.zeros(shape, dtype=np.uint8)
+    cv2.ellipse(image, center, axes, 0, start_angle, end_angle, 255, 1)
+    return image
+
+
+def polyline_l1(polyline):
+    return abs(np.diff(polyline, axis=0)).sum()
+
+
+@pytest.mark.parametrize('method', [mycv.SQUISH_MERGE, mycv.SQUISH_GREEDY])
+def test_squish_contour_of_traced_edge(method):
+    contour = mycv.find_contours(draw_arc())[0]
+
+    squished = mycv.squish_contour(contour, method=method)
+
+    # The open polyline is about half as long as the contour traced around both sides of the edge.
+    assert polyline_l1(squished) < 0.6 * polyline_l1(np.concatenate((contour, contour[:1])))
+
+
+def test_squish_contour_ends():
+    contour = mycv.find_contours(draw_arc())[0]
+
+    squished = mycv.squish_contour(contour)
+
+    # Ends of the polyline are the ends of the arc.
+    ends = {tuple(squished[0]), tuple(squished[-1])}
+    expected_ends = {
+        tuple(np.round(np.array([200, 200]) + [150*np.cos(np.radians(a)), 120*np.sin(np.radians(a))]).astype(int))
+        for a in (30, 330)
+    }
+    for end in ends:
+        assert min(abs(np.subtract(end, e)).sum() for e in expected_ends) <= 2
+
+
+def test_squish_contour_merge_same_as_greedy():
+    contour = mycv.find_contours(draw_arc(start_angle=-60, end_angle=240))[0]
+
+    merged = mycv.squish_contour(contour, method=mycv.SQUISH_MERGE)
+    greedy = mycv.squish_contour(contour, method=mycv.SQUISH_GREEDY)
+
+    # Merge method returns a permutation of the contour points.
+    assert sorted(map(tuple, merged)) == sorted(map(tuple, contour))
+
+    assert polyline_l1(merged) == pytest.approx(polyline_l1(greedy), rel=0.01)
+
+
+def test_squish_contour_of_filled_region():
+    image = np.zeros((100, 100), dtype=np.uint8)
+    cv2.circle(image, (50, 50), 30, 255, -1)
+    contour = mycv.find_contours(image)[0]
+
+    squished = mycv.squish_contour(contour)
+
+    # Contour is just cut open at its largest gap.
+    assert sorted(map(tuple, squished)) == sorted(map(tuple, contour))
+    assert polyline_l1(squished) <= polyline_l1(np.concatenate((contour, contour[:1])))
+
+
+def test_squish_contour_unknown_method():
+    with pytest.raises(ValueError):
+        mycv.squish_contour(np.zeros((3, 2), dtype=int), method='foo')
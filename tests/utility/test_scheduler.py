@@ -0,0 +1,144 @@
+import asyncio
+import threading
+import time
+from unittest.mock import Mock
+
+from opendrop.utility.scheduler import UpdateScheduler
+from opendrop.utility.updaterworker import UpdaterWorker
+
+
+def block_scheduler(scheduler):
+    """Occupy all of the workers of `scheduler` until the returned event is set."""
+    release = threading.Event()
+    started = threading.Semaphore(0)
+
+    def task():
+        started.release()
+        release.wait()
+
+    for i in range(scheduler.max_workers):
+        scheduler.submit(('block', i), task)
+    for i in range(scheduler.max_workers):
+        assert started.acquire(timeout=5)
+
+    return release
+
+
+def wait_until_idle(scheduler, keys, timeout=5):
+    deadline = time.time() + timeout
+    while any(scheduler.is_scheduled(key) for key in keys):
+        assert time.time() < deadline
+        time.sleep(0.001)
+
+
+def test_pending_submits_are_coalesced():
+    scheduler = UpdateScheduler(max_workers=1)
+    release = block_scheduler(scheduler)
+
+    fn = Mock()
+    for _ in range(5):
+        scheduler.submit('key', fn)
+
+    release.set()
+    wait_until_idle(scheduler, ['key'])
+
+    fn.assert_called_once_with()
+
+
+def test_submit_while_running_runs_once_more():
+    scheduler = UpdateScheduler(max_workers=2)
+
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def fn():
+        calls.append(threading.current_thread())
+        if len(calls) == 1:
+            started.set()
+            release.wait()
+
+    scheduler.submit('key', fn)
+    assert started.wait(timeout=5)
+
+    on_done = Mock()
+    scheduler.submit('key', fn, on_done=on_done)
+    scheduler.submit('key', fn, on_done=on_done)
+
+    # Never runs twice at the same time.
+    assert len(calls) == 1
+
+    release.set()
+    wait_until_idle(scheduler, ['key'])
+
+    assert len(calls) == 2
+    on_done.assert_called_once_with()
+
+
+def test_higher_priority_runs_first():
+    scheduler = UpdateScheduler(max_workers=1)
+    release = block_scheduler(scheduler)
+
+    order = []
+    scheduler.submit('a', lambda: order.append('a'))
+    scheduler.submit('b', lambda: order.append('b'))
+    scheduler.submit('c', lambda: order.append('c'), priority=1)
+    scheduler.submit('d', lambda: order.append('d'))
+    scheduler.set_priority('d', 2)
+
+    release.set()
+    wait_until_idle(scheduler, 'abcd')
+
+    assert order == ['d', 'c', 'a', 'b']
+
+
+def test_number_of_threads_is_bounded():
+    scheduler = UpdateScheduler(max_workers=3)
+
+    lock = threading.Lock()
+    running = [0]
+    max_running = [0]
+
+    def fn():
+        with lock:
+            running[0] += 1
+            max_running[0] = max(max_running[0], running[0])
+        time.sleep(0.001)
+        with lock:
+            running[0] -= 1
+
+    threads_before = threading.active_count()
+
+    for i in range(100):
+        scheduler.submit(i, fn)
+
+    assert threading.active_count() - threads_before <= 3
+
+    wait_until_idle(scheduler, range(100))
+
+    assert max_running[0] <= 3
+
+
+def test_updater_worker():
+    loop = asyncio.new_event_loop()
+    try:
+        scheduler = UpdateScheduler(max_workers=2)
+        do_update = Mock()
+        on_idle = Mock()
+
+        worker = UpdaterWorker(do_update=do_update, on_idle=on_idle, scheduler=scheduler, loop=loop)
+        worker.queue_update()
+
+        assert worker.is_busy
+
+        loop.run_until_complete(asyncio.wait_for(_wait_for_call(on_idle), timeout=5))
+
+        assert not worker.is_busy
+        do_update.assert_called_once_with()
+    finally:
+        loop.close()
+
+
+async def _wait_for_call(mock):
+    while not mock.called:
+        await asyncio.sleep(0.001)
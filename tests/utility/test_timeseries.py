@@ -0,0 +1,93 @@
+import math
+
+import numpy as np
+import pytest
+
+from opendrop.utility.timeseries import TimeSeries
+
+
+def test_points_are_sorted():
+    series = TimeSeries()
+
+    assert series.set('c', 3.0, 30.0)
+    assert series.set('a', 1.0, 10.0)
+    assert series.set('b', 2.0, 20.0)
+
+    t, y = series.get_data()
+    assert t.tolist() == [1.0, 2.0, 3.0]
+    assert y.tolist() == [10.0, 20.0, 30.0]
+    assert len(series) == 3
+
+
+def test_update_point():
+    series = TimeSeries()
+    series.set('a', 1.0, 10.0)
+    series.set('b', 2.0, 20.0)
+
+    old_t, old_y = series.get_data()
+
+    assert series.set('a', 1.0, 11.0)
+    assert series.set('b', 0.5, 20.0)
+    assert not series.set('b', 0.5, 20.0)
+
+    t, y = series.get_data()
+    assert t.tolist() == [0.5, 1.0]
+    assert y.tolist() == [20.0, 11.0]
+
+    # Data handed out earlier is left untouched.
+    assert old_t.tolist() == [1.0, 2.0]
+    assert old_y.tolist() == [10.0, 20.0]
+    with pytest.raises(ValueError):
+        old_y[0] = 0
+
+
+@pytest.mark.parametrize('t, y', [(None, 1.0), (1.0, None), (math.nan, 1.0), (1.0, math.nan), (1.0, math.inf)])
+def test_invalid_point_is_removed(t, y):
+    series = TimeSeries()
+    series.set('a', 2.0, 20.0)
+    series.set('b', 1.0, 10.0)
+
+    assert series.set('a', t, y)
+    assert not series.set('a', t, y)
+
+    assert series.get_data()[0].tolist() == [1.0]
+
+
+def test_equal_times():
+    series = TimeSeries()
+    for key in 'abcd':
+        series.set(key, 1.0, float(ord(key)))
+
+    series.set('b', 1.0, 0.0)
+    series.discard('c')
+
+    t, y = series.get_data()
+    assert t.tolist() == [1.0, 1.0, 1.0]
+    assert sorted(y.tolist()) == [0.0, ord('a'), ord('d')]
+
+
+def test_discard():
+    series = TimeSeries()
+    series.set('a', 1.0, 10.0)
+
+    assert series.discard('a')
+    assert not series.discard('a')
+    assert len(series) == 0
+    assert series.get_data()[0].shape == (0,)
+
+
+def test_many_points():
+    rng = np.random.RandomState(0)
+    series = TimeSeries()
+
+    expected = {}
+    for i in rng.permutation(200):
+        series.set(i, float(i//2), float(i))
+        expected[i] = float(i)
+    for i in rng.permutation(200)[:50]:
+        series.set(i, float(i//2), -float(i))
+        expected[i] = -float(i)
+
+    t, y = series.get_data()
+    assert (np.diff(t) >= 0).all()
+    assert sorted(y.tolist()) == sorted(expected.values())
@@ -0,0 +1,27 @@
+import math
+import time
+
+from opendrop.utility.timing import NOT_TIMED, Stopwatch
+
+
+def test_stopwatch():
+    stopwatch = Stopwatch()
+    assert stopwatch.elapsed == (0, 0)
+
+    with stopwatch:
+        time.sleep(0.05)
+
+    first = stopwatch.elapsed
+    assert first.wall >= 0.05
+    # Sleeping doesn't use the CPU.
+    assert first.cpu < first.wall
+
+    # Times add up.
+    with stopwatch:
+        time.sleep(0.05)
+
+    assert stopwatch.elapsed.wall >= first.wall + 0.05
+
+
+def test_not_timed():
+    assert math.isnan(NOT_TIMED.wall) and math.isnan(NOT_TIMED.cpu)